@@ -1,85 +1,111 @@
 import requests
+import os
 import sys
 import json
 from datetime import datetime
 import pytz
 
-URL = "https://site.api.espn.com/apis/site/v2/sports/football/nfl/scoreboard"
+# ESPN_BASE_URL=http://127.0.0.1:8799 points this at a local replay_server.py
+ESPN_BASE_URL = os.environ.get("ESPN_BASE_URL", "https://site.api.espn.com")
+SCOREBOARD_PATH = "/apis/site/v2/sports/football/nfl/scoreboard"
+URL = ESPN_BASE_URL.rstrip("/") + SCOREBOARD_PATH
 
-# ------------------------------------------------------------
-# Timezone-aware timestamp
-# ------------------------------------------------------------
 eastern = pytz.timezone("America/New_York")
-now_et = datetime.now(eastern)
-weekday = now_et.strftime("%a")  # e.g. 'Mon'
-hour_et = now_et.hour
+
 
 # ------------------------------------------------------------
 # Fetch API
 # ------------------------------------------------------------
-try:
-    resp = requests.get(URL, timeout=10)
+def fetch_scoreboard(session=requests, url=URL):
+    resp = session.get(url, timeout=10)
     resp.raise_for_status()
-    data = resp.json()
-except Exception as e:
-    print(f"⚠️ Error fetching game status: {e}")
-    sys.exit(2)
+    return resp.json()
 
-# ------------------------------------------------------------
-# Extract week number
-# ------------------------------------------------------------
-week_number = data.get("week", {}).get("number")
-if not week_number:
-    print("⚠️ Could not determine current NFL week.")
-    sys.exit(2)
 
 # ------------------------------------------------------------
-# Check if any games are active
+# Game status from a scoreboard payload
 # ------------------------------------------------------------
-games_active = any(
-    event.get("status", {}).get("type", {}).get("state", "").lower() == "in"
-    for event in data.get("events", [])
-)
+def game_status(data, now_et=None):
+    """Week number, whether any game is in progress and the suggested refresh interval."""
+    now_et = now_et or datetime.now(eastern)  # Timezone-aware timestamp
+    weekday = now_et.strftime("%a")  # e.g. 'Mon'
+    hour_et = now_et.hour
 
-# ------------------------------------------------------------
-# Determine refresh interval
-# ------------------------------------------------------------
-refresh_interval = 15  # default
+    # Extract week number
+    week_number = data.get("week", {}).get("number")
 
-# Monday Night Football → faster refresh
-if (weekday == "Mon" and hour_et >= 20) or (weekday == "Tue" and hour_et < 1):
-    refresh_interval = 5
+    # Check if any games are active
+    games_active = any(
+        event.get("status", {}).get("type", {}).get("state", "").lower() == "in"
+        for event in data.get("events", [])
+    )
 
-if not games_active:
-    refresh_interval = 15
+    # Determine refresh interval
+    refresh_interval = 15  # default
 
-# ------------------------------------------------------------
-# Output summary
-# ------------------------------------------------------------
-print(f"📅 Current NFL Week: {week_number}")
-print(f"🕒 Local ET time: {now_et.strftime('%Y-%m-%d %I:%M %p')}")
-print(f"🏈 Games active: {'YES' if games_active else 'NO'}")
-print(f"🔁 Suggested refresh interval: {refresh_interval} min")
+    # Monday Night Football → faster refresh
+    if (weekday == "Mon" and hour_et >= 20) or (weekday == "Tue" and hour_et < 1):
+        refresh_interval = 5
 
-# ------------------------------------------------------------
-# Save to JSON
-# ------------------------------------------------------------
-with open("nfl_status.json", "w") as f:
-    json.dump(
-        {
-            "week_number": week_number,
-            "games_active": games_active,
-            "refresh_interval": refresh_interval,
-            "timestamp_et": now_et.strftime("%Y-%m-%d %H:%M:%S %Z"),
-        },
-        f,
-        indent=2,
-    )
+    if not games_active:
+        refresh_interval = 15
 
-# ------------------------------------------------------------
-# Exit codes
-# ------------------------------------------------------------
-if games_active:
-    sys.exit(0)
-else:
-    sys.exit(1)
+    return {
+        "week_number": week_number,
+        "games_active": games_active,
+        "refresh_interval": refresh_interval,
+        "timestamp_et": now_et.strftime("%Y-%m-%d %H:%M:%S %Z"),
+    }
+
+
+def next_kickoff(data, now=None):
+    """Earliest kickoff (UTC datetime) of a game that has not started yet, or None."""
+    now = now or datetime.now(pytz.utc)
+    kickoffs = []
+    for event in data.get("events", []):
+        if event.get("status", {}).get("type", {}).get("state", "").lower() != "pre":
+            continue
+        try:  # ESPN dates are UTC, e.g. 2025-09-07T17:00Z
+            kickoff = datetime.fromisoformat(event["date"].replace("Z", "+00:00"))
+        except (KeyError, AttributeError, ValueError):
+            continue
+        if kickoff >= now:
+            kickoffs.append(kickoff)
+    return min(kickoffs, default=None)
+
+
+if __name__ == "__main__":
+    now_et = datetime.now(eastern)
+
+    try:
+        data = fetch_scoreboard()
+    except Exception as e:
+        print(f"⚠️ Error fetching game status: {e}")
+        sys.exit(2)
+
+    status = game_status(data, now_et)
+    if not status["week_number"]:
+        print("⚠️ Could not determine current NFL week.")
+        sys.exit(2)
+
+    # ------------------------------------------------------------
+    # Output summary
+    # ------------------------------------------------------------
+    print(f"📅 Current NFL Week: {status['week_number']}")
+    print(f"🕒 Local ET time: {now_et.strftime('%Y-%m-%d %I:%M %p')}")
+    print(f"🏈 Games active: {'YES' if status['games_active'] else 'NO'}")
+    print(f"🔁 Suggested refresh interval: {status['refresh_interval']} min")
+
+    # ------------------------------------------------------------
+    # Save to JSON
+    # ------------------------------------------------------------
+    with open("nfl_status.json", "w") as f:
+        json.dump(status, f, indent=2)
+
+    # ------------------------------------------------------------
+    # Exit codes
+    # ------------------------------------------------------------
+    if status["games_active"]:
+        sys.exit(0)
+    else:
+        sys.exit(1)
@@ -1,49 +1,150 @@
-import pandas as pd
+from profiling import mark, phase
+import argparse
+import hashlib
+import json
 import os
+import pandas as pd
+from schema import read_table, write_table
+
+# -------------------------
+# CONFIG
+# -------------------------
+# Content hash of each (Year, LeagueID) group of Matchups as of the last run;
+# only groups whose hash moved are recomputed.
+STATE_FILE = "store/results/matchup_hashes.json"
+GROUP_KEYS = ['Year', 'LeagueID']
+
+parser = argparse.ArgumentParser(description="Cumulative regular-season standings by week.")
+parser.add_argument("--full", action="store_true", help="Recompute every league-season from scratch")
+args = parser.parse_args()
+
+
+# -------------------------
+# STANDINGS
+# -------------------------
+@phase("transform")
+def compute_metrics(matchups):
+    # Filter regular season (weeks 1-11)
+    regular_season = matchups[(matchups['IsRegularSeason'] == True) & (matchups['Week'].between(1, 11))]
+    regular_season = regular_season[~((regular_season['PointsFor'] == 0) & (regular_season['PointsAgainst'] == 0))].copy()
+
+    # Compute outcomes
+    regular_season['Win'] = regular_season['PointsFor'] > regular_season['PointsAgainst']
+    regular_season['Loss'] = regular_season['PointsFor'] < regular_season['PointsAgainst']
+    regular_season['Tie'] = (regular_season['PointsFor'] == regular_season['PointsAgainst']) & (regular_season['PointsFor'] > 0)
+
+    # Sort by Year, League, Week to prepare for cumulative metrics
+    regular_season = regular_season.sort_values(['Year','LeagueID','Week','OwnerID','RosterID'])
+
+    # Cumulative team metrics by week
+    weekly_metrics = regular_season.groupby(['Year','LeagueID','LeagueName','OwnerID','OwnerName','RosterID','Week'], observed=True).agg(
+        Wins=('Win','sum'),
+        Losses=('Loss','sum'),
+        Ties=('Tie','sum'),
+        PointsFor=('PointsFor','sum'),
+        PointsAgainst=('PointsAgainst','sum')
+    ).groupby(level=[0,1,2,3,4,5], observed=True).cumsum().reset_index()
+
+    # Games played and averages
+    weekly_metrics['GamesPlayed'] = weekly_metrics['Wins'] + weekly_metrics['Losses'] + weekly_metrics['Ties']
+    weekly_metrics['WinPct'] = weekly_metrics['Wins'] / weekly_metrics['GamesPlayed']
+    weekly_metrics['PointDiff'] = weekly_metrics['PointsFor'] - weekly_metrics['PointsAgainst']
+    weekly_metrics['AvgPointsFor'] = weekly_metrics['PointsFor'] / weekly_metrics['GamesPlayed']
+    weekly_metrics['AvgPointsAgainst'] = weekly_metrics['PointsAgainst'] / weekly_metrics['GamesPlayed']
+
+    # Playoff rank per week (Wins + PointsFor/10000)
+    weekly_metrics['PlayoffScore'] = weekly_metrics['Wins'] + weekly_metrics['PointsFor']/10000
+    weekly_metrics['PlayoffRank'] = weekly_metrics.groupby(['Year','LeagueID','Week'], observed=True)['PlayoffScore']\
+                                                 .rank(method='min', ascending=False).astype(int)
+    return weekly_metrics
 
-# Make path relative to the script location
-script_dir = os.path.dirname(os.path.abspath(__file__))
-csv_path = os.path.join(script_dir, 'data', 'Matchups_AllYears.csv')
 
-matchups = pd.read_csv(csv_path)
+def sort_metrics(weekly_metrics):
+    # Same row order whether a league-season was recomputed now or kept from an earlier run
+    weekly_metrics = weekly_metrics.sort_values(['Year','LeagueID','LeagueName','OwnerID','OwnerName','RosterID','Week'])
+    return weekly_metrics.sort_values(['Year','LeagueName','Week','PlayoffRank'], kind='stable')
 
-# Filter regular season (weeks 1-11)
-regular_season = matchups[(matchups['IsRegularSeason'] == True) & (matchups['Week'].between(1, 11))]
-regular_season = regular_season[~((regular_season['PointsFor'] == 0) & (regular_season['PointsAgainst'] == 0))]
 
-# Compute outcomes
-regular_season['Win'] = regular_season['PointsFor'] > regular_season['PointsAgainst']
-regular_season['Loss'] = regular_season['PointsFor'] < regular_season['PointsAgainst']
-regular_season['Tie'] = (regular_season['PointsFor'] == regular_season['PointsAgainst']) & (regular_season['PointsFor'] > 0)
+# -------------------------
+# CHANGE DETECTION
+# -------------------------
+def group_key(year, league_id):
+    return f"{year}/{league_id}"
 
-# Sort by Year, League, Week to prepare for cumulative metrics
-regular_season = regular_season.sort_values(['Year','LeagueID','Week','OwnerID','RosterID'])
 
-# Cumulative team metrics by week
-weekly_metrics = regular_season.groupby(['Year','LeagueID','LeagueName','OwnerID','OwnerName','RosterID','Week']).agg(
-    Wins=('Win','sum'),
-    Losses=('Loss','sum'),
-    Ties=('Tie','sum'),
-    PointsFor=('PointsFor','sum'),
-    PointsAgainst=('PointsAgainst','sum')
-).groupby(level=[0,1,2,3,4,5]).cumsum().reset_index()
+@phase("merge")
+def group_hashes(matchups):
+    """(Year, LeagueID) -> sha256 of that league-season's Matchups rows."""
+    matchups = matchups.sort_values(['Year','LeagueID','Week','RosterID'])
+    row_hashes = pd.util.hash_pandas_object(matchups, index=False)
+    return {
+        group_key(year, league_id): hashlib.sha256(group.values.tobytes()).hexdigest()
+        for (year, league_id), group in row_hashes.groupby([matchups['Year'], matchups['LeagueID']])
+    }
 
-# Games played and averages
-weekly_metrics['GamesPlayed'] = weekly_metrics['Wins'] + weekly_metrics['Losses'] + weekly_metrics['Ties']
-weekly_metrics['WinPct'] = weekly_metrics['Wins'] / weekly_metrics['GamesPlayed']
-weekly_metrics['PointDiff'] = weekly_metrics['PointsFor'] - weekly_metrics['PointsAgainst']
-weekly_metrics['AvgPointsFor'] = weekly_metrics['PointsFor'] / weekly_metrics['GamesPlayed']
-weekly_metrics['AvgPointsAgainst'] = weekly_metrics['PointsAgainst'] / weekly_metrics['GamesPlayed']
 
-# Playoff rank per week (Wins + PointsFor/10000)
-weekly_metrics['PlayoffScore'] = weekly_metrics['Wins'] + weekly_metrics['PointsFor']/10000
-weekly_metrics['PlayoffRank'] = weekly_metrics.groupby(['Year','LeagueID','Week'])['PlayoffScore']\
-                                             .rank(method='min', ascending=False).astype(int)
+def load_state():
+    try:
+        with open(STATE_FILE, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
 
-# Optional: sort nicely
-weekly_metrics = weekly_metrics.sort_values(['Year','LeagueName','Week','PlayoffRank'])
+
+def save_state(state):
+    os.makedirs(os.path.dirname(STATE_FILE), exist_ok=True)
+    with open(STATE_FILE, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=1, sort_keys=True)
+
+
+# -------------------------
+# INCREMENTAL RUN
+# -------------------------
+state = {} if args.full else load_state()
+results = read_table('Results_RegularSeason')
+if results.empty:
+    state = {}
+
+# Completed league-seasons never change; only re-read the years that are still open
+# (or that have never been hashed). Without any state, every year is read.
+years = None
+if state:
+    league_df = read_table('LeagueIDs_AllYears')
+    closed = league_df['Status'] == 'complete' if 'Status' in league_df.columns else False
+    seen = league_df.apply(lambda r: group_key(r['Year'], r['LeagueID']) in state, axis=1)
+    years = sorted(league_df.loc[~(closed & seen), 'Year'].unique())
+    if not years:
+        print("✅ Every league-season is complete — Results_RegularSeason.csv unchanged")
+        exit()
+
+# Columnar Matchups (data/parquet) when available, else the CSV
+matchups = read_table('Matchups_AllYears', years=years)
+hashes = group_hashes(matchups)
+
+scanned = {str(y) for y in matchups['Year'].unique()} if years is not None else None
+removed = [k for k in state if k not in hashes and (scanned is None or k.split('/')[0] in scanned)]
+changed = [k for k, h in hashes.items() if state.get(k) != h]
+print(f"🔎 {len(hashes)} league-seasons checked: {len(changed)} changed, {len(removed)} removed")
+
+if not changed and not removed:
+    print("✅ Results_RegularSeason.csv unchanged")
+    exit()
+
+# Recompute only the changed league-seasons and keep everything else as stored
+mark("merge")
+keys = matchups[GROUP_KEYS].astype(str).agg('/'.join, axis=1)
+weekly_metrics = compute_metrics(matchups[keys.isin(changed)])
+
+result_keys = results[GROUP_KEYS].astype(str).agg('/'.join, axis=1)
+kept = results[~result_keys.isin(changed + removed)]
+weekly_metrics = sort_metrics(pd.concat([kept, weekly_metrics], ignore_index=True))
 
 # Save for Power BI
-weekly_metrics.to_csv('data/Results_RegularSeason.csv', index=False)
+write_table(weekly_metrics, 'Results_RegularSeason')
+
+for k in removed:
+    state.pop(k)
+state.update({k: hashes[k] for k in changed})
+save_state(state)
 
-print("Weekly metrics with Playoff rank calculated and saved to Results_RegularSeason.csv")
+print(f"Weekly metrics with Playoff rank recalculated for {len(changed)} league-seasons and saved to Results_RegularSeason.csv")
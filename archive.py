@@ -0,0 +1,236 @@
+"""Append-only archive of raw Sleeper responses.
+
+Every response a fetch stage receives is kept, compressed, so derived
+tables can be rebuilt from the original JSON without going back to the
+API (``--offline`` / SLEEPER_OFFLINE=1, see sleeper_client.py):
+
+    .cache/archive/<season>/<endpoint>.jsonl.gz   one gzip member per response
+    .cache/archive/<season>/index.json            path -> file, offset, length, sha256,
+                                                  league_id, week, fetched_at
+
+A gzip file made of several members is still one valid gzip stream, so the
+archives can be read end to end with ``zcat``; the index lets a single
+response be read with one seek. A response is appended only when its body
+differs from the latest archived one, so daily runs add just what changed.
+Season is the league's season (from LeagueIDs_AllYears.csv) for league
+endpoints, the path's season for ``/user/.../leagues/nfl/<season>`` and
+``global`` for everything else.
+
+The archive grows with every run, so it is kept out of git: the workflow
+persists .cache/archive/ with its own actions/cache entry. Parallel stages
+archive the same endpoints (``/users``, rosters, ...), so a season is
+flushed under a file lock (see locks.py) and its index is re-read from disk
+before it is extended.
+
+    python archive.py            # sizes and response counts per season and endpoint
+"""
+import argparse
+import csv
+import gzip
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import defaultdict
+
+from instrumentation import endpoint
+from locks import atomic_open, locked
+
+# -------------------------
+# CONFIG
+# -------------------------
+ARCHIVE_DIR = os.environ.get("SLEEPER_ARCHIVE_DIR", ".cache/archive")
+ENABLED = os.environ.get("SLEEPER_ARCHIVE", "on").lower() not in ("0", "off", "false", "no")
+LEAGUE_FILE = "data/LeagueIDs_AllYears.csv"
+GLOBAL = "global"
+
+LEAGUE_RE = re.compile(r"^/league/(\d+)")
+USER_SEASON_RE = re.compile(r"^/user/\d+/leagues/nfl/(\d{4})$")
+
+
+def load_league_years(league_file=LEAGUE_FILE):
+    try:
+        with open(league_file, newline="", encoding="utf-8") as f:
+            return {row["LeagueID"]: row["Year"] for row in csv.DictReader(f)}
+    except OSError:
+        return {}
+
+
+def archive_name(template):
+    """``/league/{league_id}/matchups/{week}`` -> ``league_matchups``."""
+    return "_".join(p for p in template.strip("/").split("/") if not p.startswith("{")) or "root"
+
+
+class Archive:
+    def __init__(self, archive_dir=ARCHIVE_DIR, league_years=None):
+        self.archive_dir = archive_dir
+        self.league_years = league_years if league_years is not None else load_league_years()
+        self._indexes = {}
+        self._pending = []
+        self._lock = threading.Lock()
+
+    # -------------------------
+    # LAYOUT
+    # -------------------------
+    def season(self, path):
+        match = LEAGUE_RE.match(path)
+        if match:
+            return self.league_years.get(match.group(1), GLOBAL)
+        match = USER_SEASON_RE.match(path)
+        return match.group(1) if match else GLOBAL
+
+    def seasons(self):
+        try:
+            return sorted(d for d in os.listdir(self.archive_dir) if os.path.isdir(os.path.join(self.archive_dir, d)))
+        except OSError:
+            return []
+
+    def index_path(self, season):
+        return os.path.join(self.archive_dir, season, "index.json")
+
+    def index(self, season, reload=False):
+        if reload or season not in self._indexes:
+            try:
+                with open(self.index_path(season), encoding="utf-8") as f:
+                    self._indexes[season] = json.load(f)
+            except (OSError, ValueError):
+                self._indexes[season] = {}
+        return self._indexes[season]
+
+    def _save_index(self, season):
+        with atomic_open(self.index_path(season), encoding="utf-8") as f:
+            json.dump(self.index(season), f, indent=0, sort_keys=True)
+
+    def entry(self, path):
+        """Index entry of the latest archived response for ``path``, or None."""
+        for season in dict.fromkeys([self.season(path), GLOBAL]):
+            found = self.index(season).get(path)
+            if found:
+                return season, found
+        return None, None
+
+    # -------------------------
+    # READ
+    # -------------------------
+    def read(self, path):
+        """``(body, compressed size)`` of the latest archived response; KeyError if there is none."""
+        season, found = self.entry(path)
+        if not found:
+            raise KeyError(f"{path} is not in the archive")
+        with open(os.path.join(self.archive_dir, season, found["file"]), "rb") as f:
+            f.seek(found["offset"])
+            record = json.loads(gzip.decompress(f.read(found["length"])))
+        return record["body"], found["length"]
+
+    def records(self, season, name):
+        """Every archived response of one season and endpoint, oldest first."""
+        with gzip.open(os.path.join(self.archive_dir, season, f"{name}.jsonl.gz"), "rt", encoding="utf-8") as f:
+            for line in f:
+                yield json.loads(line)
+
+    def select(self, season=None, league_id=None, week=None, template=None):
+        """``(path, entry)`` of the latest responses matching every given filter."""
+        for s in ([str(season)] if season is not None else self.seasons()):
+            for path, found in sorted(self.index(s).items()):
+                if league_id is not None and found["league_id"] != str(league_id):
+                    continue
+                if week is not None and found["week"] != int(week):
+                    continue
+                if template is not None and found["endpoint"] != template:
+                    continue
+                yield path, found
+
+    # -------------------------
+    # WRITE
+    # -------------------------
+    def add(self, path, body):
+        """Queue a response for the next ``flush`` (thread-safe; called from fetch workers)."""
+        with self._lock:
+            self._pending.append((path, body, hashlib.sha256(body).hexdigest(), time.time()))
+
+    def add_file(self, path, body_path, digest):
+        """Queue a response whose body is in a file (large payloads are copied, not loaded)."""
+        with self._lock:
+            self._pending.append((path, body_path, digest, time.time()))
+
+    def flush(self):
+        """Append the queued responses whose bodies changed; returns how many were written.
+
+        Each season is appended to and re-indexed under its lock, starting
+        from the index on disk, so other processes' records are kept.
+        """
+        with self._lock:
+            pending, self._pending = self._pending, []
+
+        seasons = defaultdict(list)
+        for path, body, digest, fetched_at in pending:
+            seasons[self.season(path)].append((path, body, digest, fetched_at))
+
+        written = 0
+        for season, records in sorted(seasons.items()):
+            os.makedirs(os.path.join(self.archive_dir, season), exist_ok=True)
+            with locked(self.index_path(season)):
+                index = self.index(season, reload=True)
+                groups = defaultdict(list)
+                for path, body, digest, fetched_at in records:
+                    if index.get(path, {}).get("sha256") == digest:
+                        continue
+                    template, league_id, week = endpoint(path)
+                    groups[archive_name(template)].append((path, body, fetched_at, digest, template, league_id, week))
+                if not groups:
+                    continue
+
+                for name, group in sorted(groups.items()):
+                    file = f"{name}.jsonl.gz"
+                    with open(os.path.join(self.archive_dir, season, file), "ab") as f:
+                        for path, body, fetched_at, digest, template, league_id, week in group:
+                            offset = f.tell()
+                            write_record(f, path, fetched_at, body)
+                            index[path] = {"file": file, "offset": offset, "length": f.tell() - offset,
+                                           "sha256": digest, "endpoint": template, "league_id": league_id,
+                                           "week": week, "fetched_at": round(fetched_at, 3)}
+                            written += 1
+                self._save_index(season)
+        return written
+
+
+def write_record(f, path, fetched_at, body, chunk_size=1 << 20):
+    """Append one JSONL record as its own gzip member; ``body`` is bytes or a file path.
+
+    Bodies are embedded as they arrived. A raw newline in JSON can only be
+    whitespace (newlines inside strings are escaped), so it becomes a space.
+    """
+    head = json.dumps({"path": path, "fetched_at": round(fetched_at, 3)}, separators=(",", ":"))[:-1]
+    with gzip.GzipFile(fileobj=f, mode="wb", mtime=0) as member:
+        member.write(head.encode("utf-8") + b',"body":')
+        if isinstance(body, bytes):
+            member.write(body.replace(b"\n", b" ").replace(b"\r", b" "))
+        else:
+            with open(body, "rb") as src:
+                for chunk in iter(lambda: src.read(chunk_size), b""):
+                    member.write(chunk.replace(b"\n", b" ").replace(b"\r", b" "))
+        member.write(b"}\n")
+
+
+# -------------------------
+# SUMMARY
+# -------------------------
+def summary(archive_dir=ARCHIVE_DIR):
+    archive = Archive(archive_dir, league_years={})
+    for season in archive.seasons():
+        counts = defaultdict(int)
+        for found in archive.index(season).values():
+            counts[found["file"]] += 1
+        for file, count in sorted(counts.items()):
+            size = os.path.getsize(os.path.join(archive_dir, season, file))
+            print(f"  {season:<7} {file:<32} {count:6d} paths {size / 2**20:8.2f} MiB")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Summarise the raw Sleeper response archive.")
+    parser.add_argument("--dir", default=ARCHIVE_DIR)
+    args = parser.parse_args()
+    print(f"🗄️ {args.dir}")
+    summary(args.dir)
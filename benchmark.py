@@ -0,0 +1,349 @@
+"""End-to-end benchmark of every pipeline stage against a fixed fixture set.
+
+Fixtures are built from the committed data/ CSVs (fixtures.py) and served
+by an in-process replay_server, so every run sees identical responses and
+no request leaves the machine. Each stage script runs in a scratch copy of
+the repo layout, one after another in pipeline order, and is measured for:
+
+    seconds   wall time of the stage process
+    requests  HTTP requests the replay server answered (incl. 429/304)
+    bytes     response bytes sent by the replay server
+    rss_mb    peak resident set size of the stage process
+    rows      rows in the data/*.csv files the stage (re)wrote
+    mismatches  key rows (IDs, seasons, weeks) that differ from the CSVs the
+              fixtures were built from (see verify.py)
+
+Results go to .cache/bench/<commit>.json (or --output). Any stage whose
+output does not match its source CSVs fails the run with exit 1. With
+--baseline a previous report is compared stage by stage; any stage slower
+than ``--threshold`` (and by more than --min-seconds) fails it too.
+
+    python benchmark.py                                # all stages
+    python benchmark.py rosters league_matchups        # just these
+    python benchmark.py --baseline .cache/bench/abc123.json --threshold 0.2
+    python benchmark.py Results_RegularSeason league_transactions league_matchups --scale 1 10 100 --years 4
+
+--scale runs the stages again on synthetic history (synth.py) with that
+many copies of every league, and --years adds earlier seasons; the run
+ends with a table of how each stage's time grows with the volume.
+"""
+import argparse
+import datetime
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+from fixtures import build_fixtures
+from pipeline import SCRIPT_DIR, STAGES
+from rate_limiter import RATE
+from replay_server import ReplayConfig, fetch_stats, start_server
+from synth import synth_dir, synthesize
+from verify import compare_stage
+
+# -------------------------
+# CONFIG
+# -------------------------
+FIXTURES_DIR = ".cache/fixtures"
+BENCH_DIR = ".cache/bench"
+DATA_DIR = "data"
+THRESHOLD = 0.20     # fractional slowdown that counts as a regression
+MIN_SECONDS = 0.5    # ...but only when it is also at least this many seconds
+METRICS = ("seconds", "requests", "bytes", "rss_mb", "rows")
+
+
+def stage_key(stage):
+    """Benchmark name of a stage: its script without the extension."""
+    return os.path.splitext(stage.script)[0]
+
+
+def commit_sha():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=SCRIPT_DIR, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+# -------------------------
+# WORKSPACE
+# -------------------------
+def make_workspace(data_dir, selected):
+    """Scratch directory with the reference CSVs plus committed inputs of stages not being run."""
+    workdir = tempfile.mkdtemp(prefix="bench-")
+    os.makedirs(os.path.join(workdir, "data"))
+    produced = {os.path.basename(p) for stage in STAGES for p in stage.outputs}
+    built = {os.path.basename(p) for stage in selected for p in stage.outputs}
+    needed = {os.path.basename(p) for stage in selected for p in stage.inputs} - built
+    for name in os.listdir(data_dir):
+        if name.endswith(".csv") and (name not in produced or name in needed):
+            shutil.copy2(os.path.join(data_dir, name), os.path.join(workdir, "data", name))
+    return workdir
+
+
+def csv_mtimes(workdir):
+    data = os.path.join(workdir, "data")
+    return {name: os.stat(os.path.join(data, name)).st_mtime_ns for name in os.listdir(data) if name.endswith(".csv")}
+
+
+def rows_written(workdir, before):
+    rows = 0
+    for name, mtime in csv_mtimes(workdir).items():
+        if name != "LastUpdate.csv" and before.get(name) != mtime:
+            rows += len(pd.read_csv(os.path.join(workdir, "data", name), usecols=[0]))
+    return rows
+
+
+# -------------------------
+# RUN
+# -------------------------
+# ru_maxrss survives exec, so a stage forked straight from this (large)
+# process would report at least our own RSS. The launcher is a bare
+# interpreter that forks the stage and writes the child's peak RSS.
+RSS_LAUNCHER = """\
+import os, sys
+pid = os.fork()
+if pid == 0:
+    os.execv(sys.executable, [sys.executable] + sys.argv[2:])
+_, status, usage = os.wait4(pid, 0)
+with open(sys.argv[1], "w") as f:
+    f.write(str(usage.ru_maxrss))
+sys.exit(os.waitstatus_to_exitcode(status))
+"""
+
+
+def run_stage(stage, workdir, env, base_url, data_dir=DATA_DIR):
+    """Run one stage script to completion and return its metrics."""
+    fetch_stats(base_url, reset=True)
+    before = csv_mtimes(workdir)
+    log_path = os.path.join(workdir, f"{stage_key(stage)}.log")
+
+    rss_path = os.path.join(workdir, ".rss")
+
+    started = time.monotonic()
+    with open(log_path, "w", encoding="utf-8") as log:
+        proc = subprocess.run([sys.executable, "-c", RSS_LAUNCHER, rss_path, os.path.join(SCRIPT_DIR, stage.script)],
+                              cwd=workdir, env=env, stdout=log, stderr=subprocess.STDOUT)
+    seconds = time.monotonic() - started
+    with open(rss_path, encoding="utf-8") as f:
+        rss_kb = int(f.read())
+
+    stats = fetch_stats(base_url)
+    checked = compare_stage(stage, data_dir, os.path.join(workdir, "data")) if proc.returncode == 0 else {}
+    return {
+        "exit": proc.returncode,
+        "seconds": round(seconds, 3),
+        "requests": stats["requests"],
+        "bytes": stats["bytes"],
+        "rss_mb": round(rss_kb / 1024, 1),  # ru_maxrss is KiB on Linux
+        "rows": rows_written(workdir, before),
+        "mismatches": sum(count for count, _ in checked.values()),
+        "examples": [f"{table}: {e}" for table, (_, examples) in checked.items() for e in examples],
+        "log": log_path,
+    }
+
+
+def benchmark(selected, base_url, data_dir=DATA_DIR, rate=RATE, cache=False, keep=False, start_year=None,
+              profile=False):
+    workdir = make_workspace(data_dir, selected)
+    env = dict(os.environ, SLEEPER_BASE_URL=f"{base_url}/v1", ESPN_BASE_URL=base_url,
+               SLEEPER_RATE=str(rate), SLEEPER_CACHE="on" if cache else "0",
+               SLEEPER_CACHE_DIR=os.path.join(workdir, ".cache", "sleeper"),
+               DELTA_MANIFEST=os.path.join(workdir, ".cache", "delta_manifest.json"))
+    if start_year:
+        env["SLEEPER_START_YEAR"] = str(min(start_year, 2020))
+    if profile:
+        # Profiles land next to the reports rather than in the scratch directory
+        env.update(SLEEPER_PROFILE="1", SLEEPER_PROFILE_DIR=os.path.abspath(os.path.join(BENCH_DIR, "profile")))
+    results = {}
+    try:
+        for stage in selected:
+            result = run_stage(stage, workdir, env, base_url, data_dir)
+            results[stage_key(stage)] = result
+            flag = "✅" if result["exit"] == 0 and not result["mismatches"] else "❌"
+            print(f"{flag} {stage_key(stage):<22} {result['seconds']:7.2f}s {result['requests']:6d} req "
+                  f"{result['bytes'] / 1e6:8.2f} MB {result['rss_mb']:7.1f} MB RSS {result['rows']:8d} rows"
+                  + (f" {result['mismatches']} mismatched key rows" if result["mismatches"] else ""))
+            for example in result["examples"]:
+                print(f"      {example}")
+            if result["exit"] != 0:
+                with open(result["log"], encoding="utf-8") as f:
+                    print(f.read()[-2000:])
+    finally:
+        if not keep:
+            shutil.rmtree(workdir, ignore_errors=True)
+    for result in results.values():
+        result.pop("log")
+        result.pop("examples")
+    return results
+
+
+def merge_repeats(runs):
+    """Median of each metric across repeated runs (exit is the worst)."""
+    merged = {}
+    for key in runs[0]:
+        samples = [run[key] for run in runs if key in run]
+        merged[key] = {"exit": max(s["exit"] for s in samples),
+                       "mismatches": max(s.get("mismatches", 0) for s in samples)}
+        for metric in METRICS:
+            values = sorted(s[metric] for s in samples)
+            merged[key][metric] = values[len(values) // 2]
+    return merged
+
+
+def totals(stages):
+    total = {metric: sum(s[metric] for s in stages.values()) for metric in METRICS}
+    total["rss_mb"] = max((s["rss_mb"] for s in stages.values()), default=0.0)
+    total["seconds"] = round(total["seconds"], 3)
+    return total
+
+
+# -------------------------
+# COMPARE
+# -------------------------
+def regressions(report, baseline, threshold=THRESHOLD, min_seconds=MIN_SECONDS):
+    """Stages whose wall time grew by more than ``threshold`` (and ``min_seconds``) vs ``baseline``."""
+    found = []
+    for name, now in report["stages"].items():
+        before = baseline.get("stages", {}).get(name)
+        if not before or not before["seconds"]:
+            continue
+        change = (now["seconds"] - before["seconds"]) / before["seconds"]
+        print(f"  {name:<22} {before['seconds']:7.2f}s → {now['seconds']:7.2f}s ({change:+.0%})"
+              f"  req {before['requests']} → {now['requests']}  rows {before['rows']} → {now['rows']}")
+        if change > threshold and now["seconds"] - before["seconds"] > min_seconds:
+            found.append(name)
+    return found
+
+
+def first_season(data_dir):
+    years = pd.read_csv(os.path.join(data_dir, "LeagueIDs_AllYears.csv"), usecols=["Year"])["Year"]
+    return int(years.min()), len(years)
+
+
+def run_scale(selected, args, scale):
+    """Benchmark one data volume; returns its report."""
+    data_dir, fixtures_dir = args.data, args.fixtures
+    if scale != 1 or args.years:
+        out_dir = synth_dir(scale, args.years)
+        data_dir, fixtures_dir = os.path.join(out_dir, "data"), os.path.join(out_dir, "fixtures")
+        if args.rebuild_fixtures or not os.path.isdir(fixtures_dir):
+            synthesize(scale, args.years, args.data, out_dir)
+    elif args.rebuild_fixtures or not os.path.isdir(fixtures_dir):
+        count = build_fixtures(data_dir, fixtures_dir)
+        print(f"📼 Built {count} fixtures in {fixtures_dir}")
+    start_year, leagues = first_season(data_dir)
+
+    server, base_url = start_server(ReplayConfig(fixtures_dir, latency_ms=args.latency_ms))
+    print(f"🏁 Benchmarking {len(selected)} stage(s) at {scale}× (+{args.years} seasons, {leagues} league-seasons) "
+          f"against {base_url}")
+    try:
+        runs = [benchmark(selected, base_url, data_dir, args.rate, args.cache, args.keep, start_year, args.profile)
+                for _ in range(args.repeat)]
+    finally:
+        server.shutdown()
+
+    stages = merge_repeats(runs)
+    return {
+        "commit": commit_sha(),
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "scale": scale,
+        "years": args.years,
+        "league_seasons": leagues,
+        "repeat": args.repeat,
+        "rate": args.rate,
+        "latency_ms": args.latency_ms,
+        "stages": stages,
+        "total": totals(stages),
+    }
+
+
+def print_scaling(reports):
+    """Seconds per stage at each scale, plus the growth factor from the smallest run."""
+    print("\n📈 --- SCALING (seconds) ---")
+    print(f"  {'stage':<22}" + "".join(f"{str(r['scale']) + '×':>10}" for r in reports) + "   growth")
+    for name in reports[0]["stages"]:
+        seconds = [r["stages"][name]["seconds"] for r in reports]
+        growth = f"{seconds[-1] / seconds[0]:7.1f}×" if seconds[0] else "      -"
+        print(f"  {name:<22}" + "".join(f"{s:10.2f}" for s in seconds) + "  " + growth)
+
+
+def main():
+    names = {stage_key(s): s for s in STAGES}
+    names.update({s.name: s for s in STAGES})
+
+    parser = argparse.ArgumentParser(description="Benchmark every pipeline stage against replayed fixtures.")
+    parser.add_argument("stages", nargs="*", help=f"Stages to run (default: all). Known: {', '.join(map(stage_key, STAGES))}")
+    parser.add_argument("--data", default=DATA_DIR, help="CSV directory the fixtures are built from")
+    parser.add_argument("--fixtures", default=FIXTURES_DIR, help="Fixture directory")
+    parser.add_argument("--rebuild-fixtures", action="store_true", help="Rebuild fixtures even if present")
+    parser.add_argument("--scale", type=int, nargs="+", default=[1],
+                        help="League multiple(s) to benchmark with synthetic history (synth.py), e.g. 1 10 100")
+    parser.add_argument("--years", type=int, default=0, help="Extra synthetic seasons before the first one")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per stage; the median is reported")
+    parser.add_argument("--rate", type=float, default=RATE, help="SLEEPER_RATE for the stages")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Simulated API latency")
+    parser.add_argument("--cache", action="store_true", help="Leave the response cache on (cold at the start of each run)")
+    parser.add_argument("--output", help=f"Report path (default: {BENCH_DIR}/<commit>[-x<scale>y<years>].json)")
+    parser.add_argument("--baseline", help="Previous report to compare against")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD, help="Allowed fractional slowdown per stage")
+    parser.add_argument("--min-seconds", type=float, default=MIN_SECONDS, help="Ignore slowdowns smaller than this")
+    parser.add_argument("--keep", action="store_true", help="Keep the scratch directory (stage logs)")
+    parser.add_argument("--profile", action="store_true", help="Profile each stage (skews the timings)")
+    args = parser.parse_args()
+
+    unknown = set(args.stages) - set(names) - {"all"}
+    if unknown:
+        parser.error(f"unknown stage(s): {', '.join(sorted(unknown))}")
+    if args.output and len(args.scale) > 1:
+        parser.error("--output takes a single --scale")
+    wanted = {names[n] for n in args.stages if n != "all"}
+    selected = [s for s in STAGES if not wanted or s in wanted]
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    reports, failed, slower = [], [], []
+    for scale in args.scale:
+        report = run_scale(selected, args, scale)
+        reports.append(report)
+        stages, total = report["stages"], report["total"]
+
+        suffix = "" if (scale, args.years) == (1, 0) else f"-x{scale}y{args.years}"
+        output = args.output or os.path.join(BENCH_DIR, f"{report['commit']}{suffix}.json")
+        os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+        slowest = max(stages, key=lambda k: stages[k]["seconds"], default=None)
+        print(f"\n⏱️ Total {total['seconds']:.2f}s, {total['requests']} requests, {total['bytes'] / 1e6:.2f} MB, "
+              f"{total['rows']} rows; slowest stage: {slowest}")
+        print(f"💾 Report written to {output}")
+
+        failed += [f"{k} ({scale}×)" for k, s in stages.items() if s["exit"] != 0]
+        wrong = [f"{k} ({scale}×)" for k, s in stages.items() if s["mismatches"]]
+        if baseline and (baseline.get("scale", 1), baseline.get("years", 0)) == (scale, args.years):
+            print(f"\n📊 Compared with {args.baseline} ({baseline.get('commit')})")
+            regressed = regressions(report, baseline, args.threshold, args.min_seconds)
+            slower += regressed
+            print(f"🐢 Regression over {args.threshold:.0%}: {', '.join(regressed)}" if regressed else "✅ No stage regressed")
+
+    if len(reports) > 1:
+        print_scaling(reports)
+    if failed:
+        print(f"❌ Stage(s) failed: {', '.join(failed)}")
+    if wrong:
+        print(f"❌ Output differs from the source CSVs: {', '.join(wrong)}")
+    sys.exit(1 if failed or wrong or slower else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""Content hashes per league-week partition and the run's delta manifest.
+
+``write_table`` hashes every (Year, LeagueID, Week) partition of a table
+(whichever of those columns the table has) and compares them with the
+hashes stored under store/hashes/ by the previous write. A write where no
+partition changed is skipped entirely: no CSV/Parquet rewrite, no
+LastUpdate stamp. Changed partitions are appended to the run's delta
+manifest, which the workflows read to decide whether to commit and whether
+to queue a Power BI refresh.
+
+    python delta.py --reset    # start of a run
+    python delta.py --check    # summary; exit 0 if anything changed, 1 if not
+"""
+import argparse
+import datetime
+import hashlib
+import json
+import os
+import sys
+
+import pandas as pd
+
+from locks import atomic_open, locked
+
+# -------------------------
+# CONFIG
+# -------------------------
+HASH_DIR = "store/hashes"
+MANIFEST_PATH = os.environ.get("DELTA_MANIFEST", ".cache/delta_manifest.json")
+
+# Partition columns, coarsest first; each table uses the ones it has
+PARTITION_COLUMNS = [("Year", "LeagueYear", "Season"), ("LeagueID", "league_id"), ("Week", "weekNum")]
+
+
+# -------------------------
+# HASHES
+# -------------------------
+def partition_columns(df):
+    cols = []
+    for options in PARTITION_COLUMNS:
+        cols += [c for c in options if c in df.columns][:1]
+    return cols
+
+
+def _digest(values):
+    return hashlib.sha256(values.tobytes()).hexdigest()
+
+
+def partition_hashes(df):
+    """"Year/LeagueID/Week" (or coarser) -> sha256 of that partition's rows."""
+    hashes = {"__columns__": hashlib.sha256("\x1f".join(map(str, df.columns)).encode()).hexdigest()}
+    row_hashes = pd.util.hash_pandas_object(df, index=False)
+    cols = partition_columns(df)
+    if not cols:
+        hashes["*"] = _digest(row_hashes.values)
+        return hashes
+    for key, group in row_hashes.groupby([df[c] for c in cols], dropna=False, observed=True):
+        key = key if isinstance(key, tuple) else (key,)
+        hashes["/".join(str(k) for k in key)] = _digest(group.values)
+    return hashes
+
+
+def hash_path(path):
+    return os.path.join(HASH_DIR, os.path.splitext(os.path.basename(path))[0] + ".json")
+
+
+def _load_json(path, default):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+
+def _save_json(path, data):
+    with atomic_open(path, encoding="utf-8") as f:
+        json.dump(data, f, indent=1, sort_keys=True)
+
+
+def diff(path, df):
+    """Partitions of ``df`` that differ from the last write of ``path`` (added, changed or removed)."""
+    old = _load_json(hash_path(path), {})
+    new = partition_hashes(df)
+    changed = sorted(k for k in new.keys() | old.keys() if old.get(k) != new.get(k))
+    return changed, new
+
+
+def save_hashes(path, hashes):
+    _save_json(hash_path(path), hashes)
+
+
+# -------------------------
+# MANIFEST
+# -------------------------
+def load_manifest():
+    return _load_json(MANIFEST_PATH, {"changed": {}})
+
+
+def reset_manifest():
+    with locked(MANIFEST_PATH):
+        _save_json(MANIFEST_PATH, {"started": datetime.datetime.now(datetime.timezone.utc).isoformat(), "changed": {}})
+
+
+def record(path, changed):
+    """Add one write's changed partitions to the run's manifest.
+
+    Parallel stages record into the same manifest, so the update is done
+    under a file lock (see locks.py).
+    """
+    with locked(MANIFEST_PATH):
+        manifest = load_manifest()
+        entries = set(manifest["changed"].get(path, []))
+        manifest["changed"][path] = sorted(entries | set(changed))
+        _save_json(MANIFEST_PATH, manifest)
+
+
+def has_changes():
+    return any(load_manifest()["changed"].values())
+
+
+def summary():
+    changed = load_manifest()["changed"]
+    if not changed:
+        return "Δ No data changed"
+    parts = [f"{os.path.basename(path)} ({len(keys)} partitions)" for path, keys in sorted(changed.items())]
+    return "Δ Changed: " + ", ".join(parts)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Delta manifest for the current run.")
+    parser.add_argument("--reset", action="store_true", help="Start a new, empty manifest")
+    parser.add_argument("--check", action="store_true", help="Exit 0 if anything changed, 1 otherwise")
+    args = parser.parse_args()
+
+    if args.reset:
+        reset_manifest()
+    print(summary())
+    if args.check:
+        sys.exit(0 if has_changes() else 1)
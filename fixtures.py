@@ -0,0 +1,278 @@
+"""Build a replay_server fixture set from the committed data/ CSVs.
+
+Every Sleeper endpoint the stages call is reconstructed from the tables it
+produced, so replaying the fixtures reproduces (close to) the same CSVs at
+the same scale as the real league history:
+
+    /user/{id}/leagues/nfl/{year}       LeagueIDs_AllYears
+    /league/{id}/rosters, /users        Users_AllYears + Rosters_Players_AllYears
+    /league/{id}/matchups/{week}        Matchups_AllYears (starters from the roster)
+    /league/{id}/transactions/{week}    Transactions_AllYears (+ the long tables)
+    /league/{id}/drafts, /draft/{id}/picks   Drafts_AllYears, DraftPicks_AllYears
+    /players/nfl                        Players
+    ESPN scoreboard                     current week, no games in progress
+
+Output is deterministic for a given data/ directory.
+
+    python fixtures.py --data data --out .cache/fixtures
+"""
+import argparse
+import ast
+import csv
+import json
+import os
+import shutil
+from collections import defaultdict
+
+from NFLgameStatus import SCOREBOARD_PATH
+
+# -------------------------
+# CONFIG
+# -------------------------
+USER_ID = "731808894699028480"  # league_ids.py / users.py
+START_YEAR = 2020
+WEEKS = range(1, 19)
+STARTERS = 9
+
+
+# -------------------------
+# IO
+# -------------------------
+def read_csv(data_dir, name):
+    """Rows of a data/ CSV as dicts of strings ([] if the file is missing)."""
+    path = os.path.join(data_dir, f"{name}.csv")
+    if not os.path.exists(path):
+        return []
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        return list(csv.DictReader(f))
+
+
+def group_by(rows, *columns):
+    groups = defaultdict(list)
+    for row in rows:
+        groups[tuple(row[c] for c in columns) if len(columns) > 1 else row[columns[0]]].append(row)
+    return groups
+
+
+def to_int(value):
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+def to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def literal(value, default):
+    try:
+        return ast.literal_eval(value) if value else default
+    except (ValueError, SyntaxError):
+        return default
+
+
+class FixtureWriter:
+    def __init__(self, out_dir):
+        self.out_dir = out_dir
+        self.count = 0
+
+    def sleeper(self, path, body):
+        self.write(os.path.join(self.out_dir, "sleeper", *path.strip("/").split("/")) + ".json", body)
+
+    def espn(self, path, body):
+        self.write(os.path.join(self.out_dir, "espn", *path.strip("/").split("/")) + ".json", body)
+
+    def write(self, file_path, body):
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        with open(file_path, "w", encoding="utf-8") as f:
+            f.write(json.dumps(body, separators=(",", ":")))
+        self.count += 1
+
+
+# -------------------------
+# PAYLOADS
+# -------------------------
+def league_payloads(leagues, writer, end_year):
+    last_year = max((to_int(row["Year"]) for row in leagues), default=end_year)
+    by_year = defaultdict(list)
+    for row in leagues:
+        year = to_int(row["Year"])
+        status = row.get("Status") or ("complete" if year < last_year else "in_season")
+        by_year[year].append({
+            "league_id": row["LeagueID"],
+            "name": row["LeagueName"],
+            "season": str(year),
+            "status": status,
+            "metadata": {"division_1": row.get("Division1") or None, "division_2": row.get("Division2") or None},
+        })
+    first_year = min([START_YEAR] + list(by_year))
+    for year in range(first_year, end_year + 1):
+        writer.sleeper(f"/user/{USER_ID}/leagues/nfl/{year}", by_year.get(year, []))
+
+
+def roster_payloads(users, roster_players, writer):
+    players = defaultdict(list)
+    for row in roster_players:
+        players[(row["LeagueID"], to_int(row["RosterID"]))].append(row["PlayerID"])
+
+    for league_id, group in group_by(users, "LeagueID").items():
+        rosters, members = [], []
+        for row in group:
+            roster_id = to_int(row["RosterID"])
+            owner_id = row["OwnerID"] or None
+            rosters.append({
+                "roster_id": roster_id,
+                "owner_id": owner_id,
+                "players": players.get((league_id, roster_id), []),
+                "settings": {
+                    "division": to_int(row["Division"]),
+                    "wins": to_int(row["Wins"]) or 0,
+                    "losses": to_int(row["Losses"]) or 0,
+                    "fpts": to_int(row["PointsFor"]) or 0,
+                    "fpts_against": to_int(row["PointsAgainst"]) or 0,
+                },
+            })
+            if owner_id:
+                members.append({"user_id": owner_id, "display_name": row["OwnerName"]})
+        writer.sleeper(f"/league/{league_id}/rosters", rosters)
+        writer.sleeper(f"/league/{league_id}/users", members)
+    return players
+
+
+def matchup_payloads(matchups, league_ids, players, writer):
+    by_week = group_by(matchups, "LeagueID", "Week")
+    for league_id in league_ids:
+        for week in WEEKS:
+            group = by_week.get((league_id, str(week)))
+            payload = []
+            if group:
+                pair_ids = {}
+                for row in group:
+                    roster_id = to_int(row["RosterID"])
+                    pair = tuple(sorted([roster_id or 0, to_int(row["OpponentRosterID"]) or 0]))
+                    matchup_id = pair_ids.setdefault(pair, len(pair_ids) + 1)
+                    points = to_float(row["PointsFor"])
+                    starters = players.get((league_id, roster_id), [])[:STARTERS]
+                    share = round(points / len(starters), 2) if starters else 0.0
+                    starter_points = [share] * len(starters)
+                    payload.append({
+                        "roster_id": roster_id,
+                        "matchup_id": matchup_id,
+                        "points": points,
+                        "starters": starters,
+                        "starters_points": starter_points,
+                        "players_points": dict(zip(starters, starter_points)),
+                    })
+            writer.sleeper(f"/league/{league_id}/matchups/{week}", payload)
+
+
+def transaction_payloads(data_dir, transactions, league_ids, writer):
+    # Long tables (current format) or the older repr columns
+    long_tables = {name: read_csv(data_dir, f"Transaction{name}_AllYears") for name in ("Rosters", "Adds", "Drops", "Picks")}
+    grouped = {name: group_by(rows, "TransactionID") for name, rows in long_tables.items()}
+
+    by_week = group_by(transactions, "LeagueID", "Week")
+    for league_id in league_ids:
+        for week in WEEKS:
+            payload = []
+            for row in by_week.get((league_id, str(week)), []):
+                tx_id = row["TransactionID"]
+                if "Adds" in row:
+                    roster_ids = literal(row["RosterIDs"], [])
+                    adds, drops = literal(row["Adds"], {}), literal(row["Drops"], {})
+                    picks = literal(row["Picks"], [])
+                else:
+                    def pairs(name):
+                        return {r["PlayerID"]: to_int(r["RosterID"]) for r in grouped[name].get(tx_id, [])}
+                    roster_ids = [to_int(r["RosterID"]) for r in grouped["Rosters"].get(tx_id, [])]
+                    adds, drops = pairs("Adds"), pairs("Drops")
+                    picks = [{
+                        "season": p["PickSeason"], "round": to_int(p["Round"]), "roster_id": to_int(p["RosterID"]),
+                        "previous_owner_id": to_int(p["PreviousOwnerRosterID"]), "owner_id": to_int(p["OwnerRosterID"]),
+                    } for p in grouped["Picks"].get(tx_id, [])]
+                payload.append({
+                    "transaction_id": tx_id,
+                    "type": row["Type"],
+                    "status": row["Status"],
+                    "created": to_int(row["Created"]),
+                    "roster_ids": roster_ids,
+                    "adds": adds or None,
+                    "drops": drops or None,
+                    "draft_picks": picks,
+                })
+            writer.sleeper(f"/league/{league_id}/transactions/{week}", payload)
+
+
+def draft_payloads(drafts, picks, league_ids, writer):
+    drafts_by_league = group_by(drafts, "LeagueID")
+    picks_by_draft = group_by(picks, "DraftID")
+    for league_id in league_ids:
+        payload = []
+        for row in drafts_by_league.get(league_id, []):
+            payload.append({
+                "draft_id": row["DraftID"],
+                "status": row["Status"],
+                "type": row["Type"],
+                "season": row["Season"],
+                "settings": {"rounds": to_int(row["Rounds"]), "teams": to_int(row["Teams"])},
+            })
+            writer.sleeper(f"/draft/{row['DraftID']}/picks", [{
+                "round": to_int(p["Round"]),
+                "pick_no": to_int(p["Pick_No"]),
+                "picked_by": p["Picked_By"] or None,
+                "roster_id": to_int(p["RosterID"]),
+                "metadata": {
+                    "player_id": p["PlayerID"], "first_name": p["FirstName"], "last_name": p["LastName"],
+                    "team": p["Team"], "position": p["Position"], "status": p["Status"], "years_exp": p["YearsExp"],
+                },
+            } for p in picks_by_draft.get(row["DraftID"], [])])
+        writer.sleeper(f"/league/{league_id}/drafts", payload)
+
+
+def player_payload(players, writer):
+    writer.sleeper("/players/nfl", {
+        row["player_id"]: {
+            "first_name": row["first_name"], "last_name": row["last_name"], "position": row["position"],
+            "status": row["status"] or None, "team": row["team"] or None,
+        }
+        for row in players
+    })
+
+
+# -------------------------
+# BUILD
+# -------------------------
+def build_fixtures(data_dir="data", out_dir=".cache/fixtures", end_year=None, week=1):
+    """Write the whole fixture tree to ``out_dir`` (replacing it); returns the number of files."""
+    leagues = read_csv(data_dir, "LeagueIDs_AllYears")
+    if not leagues:
+        raise FileNotFoundError(f"No LeagueIDs_AllYears.csv in {data_dir}")
+    end_year = end_year or max(to_int(row["Year"]) for row in leagues)
+
+    shutil.rmtree(out_dir, ignore_errors=True)
+    writer = FixtureWriter(out_dir)
+    league_ids = [row["LeagueID"] for row in leagues]
+
+    league_payloads(leagues, writer, end_year)
+    players = roster_payloads(read_csv(data_dir, "Users_AllYears"), read_csv(data_dir, "Rosters_Players_AllYears"), writer)
+    matchup_payloads(read_csv(data_dir, "Matchups_AllYears"), league_ids, players, writer)
+    transaction_payloads(data_dir, read_csv(data_dir, "Transactions_AllYears"), league_ids, writer)
+    draft_payloads(read_csv(data_dir, "Drafts_AllYears"), read_csv(data_dir, "DraftPicks_AllYears"), league_ids, writer)
+    player_payload(read_csv(data_dir, "Players"), writer)
+    writer.espn(SCOREBOARD_PATH, {"week": {"number": week}, "events": []})
+    return writer.count
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build replay fixtures from data/ CSVs.")
+    parser.add_argument("--data", default="data")
+    parser.add_argument("--out", default=".cache/fixtures")
+    parser.add_argument("--end-year", type=int, help="Last season to write (empty) league lists for")
+    args = parser.parse_args()
+
+    count = build_fixtures(args.data, args.out, args.end_year)
+    print(f"📼 Wrote {count} fixtures to {args.out}")
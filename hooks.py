@@ -0,0 +1,37 @@
+"""Post-write hooks: follow-up steps that run in-process after a stage writes a file.
+
+Hooks receive the path that was written and the DataFrame that was written
+to it, so follow-ups work on data already in memory instead of re-reading
+files, refetching, or starting another interpreter. A failing hook is
+reported but never fails the stage that wrote the data.
+
+    from hooks import post_write
+
+    @post_write
+    def my_follow_up(path, df):
+        ...
+"""
+from update_lastmodified import stamp_last_update
+
+_POST_WRITE = []
+
+
+def post_write(func):
+    """Register ``func(path, df)`` to run after every output write."""
+    if func not in _POST_WRITE:
+        _POST_WRITE.append(func)
+    return func
+
+
+def run_post_write(path, df=None):
+    for hook in _POST_WRITE:
+        try:
+            hook(path, df)
+        except Exception as e:
+            print(f"⚠️ Post-write hook {hook.__name__} failed for {path}: {e}")
+
+
+# -------------------------
+# DEFAULT HOOKS
+# -------------------------
+post_write(stamp_last_update)
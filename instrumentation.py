@@ -0,0 +1,209 @@
+"""Per-request instrumentation for the Sleeper client and the run report.
+
+Every call that goes through ``SleeperClient`` is recorded with its
+endpoint template (``/league/{league_id}/matchups/{week}``), league, week,
+final HTTP status, latency, payload size, retries and cache outcome
+(hit / revalidated / miss / off, or archive when offline). When the process exits, the calls are
+summarised into a JSON run report under .cache/runs/ (or
+SLEEPER_RUN_REPORT): totals, p50/p95 latency per endpoint and every
+failed call as a gap, with the league and week that must be re-pulled.
+
+    python instrumentation.py .cache/runs/league_matchups-<stamp>.json   # print a report
+"""
+import atexit
+import datetime
+import json
+import os
+import re
+import sys
+import threading
+from collections import defaultdict
+
+# -------------------------
+# CONFIG
+# -------------------------
+REPORT_DIR = os.environ.get("SLEEPER_RUN_REPORT_DIR", ".cache/runs")
+REPORT_PATH = os.environ.get("SLEEPER_RUN_REPORT")  # fixed path instead of one file per run
+ENABLED = os.environ.get("SLEEPER_INSTRUMENT", "on").lower() not in ("0", "off", "false", "no")
+LOCAL = ("hit", "archive")  # cache outcomes served without a request
+
+# Path segment patterns -> template placeholders, most specific first
+ENDPOINTS = [
+    (re.compile(r"^/league/(?P<league_id>\d+)/(?P<kind>matchups|transactions)/(?P<week>\d+)$"),
+     "/league/{league_id}/{kind}/{week}"),
+    (re.compile(r"^/league/(?P<league_id>\d+)/(?P<kind>[a-z_]+)$"), "/league/{league_id}/{kind}"),
+    (re.compile(r"^/league/(?P<league_id>\d+)$"), "/league/{league_id}"),
+    (re.compile(r"^/user/(?P<user_id>\d+)/leagues/nfl/(?P<season>\d+)$"), "/user/{user_id}/leagues/nfl/{season}"),
+    (re.compile(r"^/draft/(?P<draft_id>\d+)/picks$"), "/draft/{draft_id}/picks"),
+    (re.compile(r"^/state/nfl$"), "/state/nfl"),
+    (re.compile(r"^/players/nfl$"), "/players/nfl"),
+]
+
+
+def endpoint(path):
+    """``(template, league_id, week)`` for an API path; unknown paths are their own template."""
+    path = path.split("?", 1)[0]
+    for pattern, template in ENDPOINTS:
+        match = pattern.match(path)
+        if match:
+            fields = match.groupdict()
+            template = template.replace("{kind}", fields.get("kind") or "")
+            week = int(fields["week"]) if fields.get("week") else None
+            return template, fields.get("league_id"), week
+    return path, None, None
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not values:
+        return None
+    rank = max(1, -(-pct * len(values) // 100))
+    return values[int(rank) - 1]
+
+
+# -------------------------
+# RECORDER
+# -------------------------
+class RunRecorder:
+    """Thread-safe log of every client call in this process."""
+
+    def __init__(self, name=None):
+        self.name = name or os.path.splitext(os.path.basename(sys.argv[0]))[0].lstrip("-") or "python"
+        self.started = datetime.datetime.now(datetime.timezone.utc)
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def record(self, path, status=None, latency=0.0, size=0, retries=0, cache="off", wait=0.0, error=None):
+        template, league_id, week = endpoint(path)
+        call = {
+            "path": path,
+            "endpoint": template,
+            "league_id": league_id,
+            "week": week,
+            "status": status,
+            "latency_ms": round(latency * 1000, 1),
+            "wait_ms": round(wait * 1000, 1),
+            "bytes": size,
+            "retries": retries,
+            "cache": cache,
+            "error": error,
+        }
+        with self._lock:
+            self.calls.append(call)
+        return call
+
+    def failed(self):
+        return [c for c in self.calls if c["error"]]
+
+    def latency_summary(self, calls=None):
+        """p50/p95 of the calls that went to the network."""
+        network = sorted(c["latency_ms"] for c in (self.calls if calls is None else calls) if c["cache"] not in LOCAL)
+        return percentile(network, 50), percentile(network, 95)
+
+    def report(self):
+        with self._lock:
+            calls = list(self.calls)
+
+        by_endpoint = defaultdict(list)
+        for call in calls:
+            by_endpoint[call["endpoint"]].append(call)
+
+        endpoints = {}
+        for template, group in sorted(by_endpoint.items()):
+            p50, p95 = self.latency_summary(group)
+            latencies = [c["latency_ms"] for c in group if c["cache"] not in LOCAL]
+            endpoints[template] = {
+                "calls": len(group),
+                "network": len(latencies),
+                "errors": sum(1 for c in group if c["error"]),
+                "retries": sum(c["retries"] for c in group),
+                "bytes": sum(c["bytes"] for c in group),
+                "p50_ms": p50,
+                "p95_ms": p95,
+                "max_ms": max(latencies, default=None),
+                "cache": {k: sum(1 for c in group if c["cache"] == k) for k in ("hit", "revalidated", "miss", "off", "archive")},
+            }
+
+        p50, p95 = self.latency_summary(calls)
+        statuses = defaultdict(int)
+        for call in calls:
+            statuses[str(call["status"])] += 1
+        return {
+            "run": self.name,
+            "argv": sys.argv[1:],
+            "started": self.started.isoformat(timespec="seconds"),
+            "finished": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+            "totals": {
+                "calls": len(calls),
+                "network": sum(1 for c in calls if c["cache"] not in LOCAL),
+                "errors": sum(1 for c in calls if c["error"]),
+                "retries": sum(c["retries"] for c in calls),
+                "bytes": sum(c["bytes"] for c in calls),
+                "wait_s": round(sum(c["wait_ms"] for c in calls) / 1000, 2),
+                "p50_ms": p50,
+                "p95_ms": p95,
+                "statuses": dict(sorted(statuses.items())),
+            },
+            "endpoints": endpoints,
+            "gaps": [
+                {k: c[k] for k in ("path", "endpoint", "league_id", "week", "status", "retries", "error")}
+                for c in calls if c["error"]
+            ],
+        }
+
+    def write(self, path=None):
+        stamp = self.started.strftime("%Y%m%dT%H%M%S")
+        path = path or REPORT_PATH or os.path.join(REPORT_DIR, f"{self.name}-{stamp}-{os.getpid()}.json")
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.report(), f, indent=1)
+        return path
+
+
+# -------------------------
+# PROCESS-WIDE RECORDER
+# -------------------------
+_recorder = None
+
+
+def get_recorder():
+    """The process's recorder (created on first use; its report is written at exit)."""
+    global _recorder
+    if _recorder is None:
+        _recorder = RunRecorder()
+        if ENABLED:
+            atexit.register(_write_at_exit)
+    return _recorder
+
+
+def _write_at_exit():
+    if not _recorder or not _recorder.calls:
+        return
+    report = _recorder.report()
+    path = _recorder.write()
+    totals = report["totals"]
+    print(f"🧾 Run report: {totals['calls']} calls, {totals['errors']} errors, "
+          f"p50 {totals['p50_ms']} ms, p95 {totals['p95_ms']} ms → {path}")
+    for gap in report["gaps"][:10]:
+        where = gap["path"]
+        if gap["league_id"]:
+            where = f"league {gap['league_id']}" + (f" week {gap['week']}" if gap["week"] else "")
+        print(f"   gap: {gap['endpoint']} ({where}): {gap['error']}")
+    if len(report["gaps"]) > 10:
+        print(f"   … and {len(report['gaps']) - 10} more gaps in the report")
+
+
+def print_report(path):
+    with open(path, encoding="utf-8") as f:
+        report = json.load(f)
+    print(f"🧾 {report['run']} {report['started']} — {report['totals']}")
+    for template, stats in report["endpoints"].items():
+        print(f"  {template:<42} {stats['calls']:6d} calls {stats['errors']:4d} err "
+              f"p50 {stats['p50_ms']} ms p95 {stats['p95_ms']} ms")
+    for gap in report["gaps"]:
+        print(f"  gap: {gap['path']} ({gap['status']}): {gap['error']}")
+
+
+if __name__ == "__main__":
+    for report_path in sys.argv[1:]:
+        print_report(report_path)
@@ -0,0 +1,70 @@
+"""Checkpoint journal for long fetch-and-merge runs.
+
+A run that processes work units (for the historical rebuild: one
+league-season) records each unit here once its rows are safely in the
+store, together with the store partitions it changed. If the run is
+killed, the next one reads the journal and skips every finished unit, so
+it resumes after the last completed league instead of starting over.
+A run that finishes clears its journal; a journal older than ``max_age``
+is treated as abandoned and ignored.
+
+The file is rewritten atomically (``locks.atomic_open``) on every
+checkpoint, so a kill mid-write leaves the previous checkpoint intact.
+"""
+import datetime
+import json
+import os
+
+from locks import atomic_open
+
+# -------------------------
+# CONFIG
+# -------------------------
+JOURNAL_DIR = os.environ.get("SLEEPER_JOURNAL_DIR", ".cache/journal")
+MAX_AGE_HOURS = float(os.environ.get("SLEEPER_JOURNAL_MAX_AGE", "48"))
+
+
+def now():
+    return datetime.datetime.now(datetime.timezone.utc)
+
+
+class RunJournal:
+    def __init__(self, name, journal_dir=JOURNAL_DIR, max_age_hours=MAX_AGE_HOURS, fresh=False):
+        self.path = os.path.join(journal_dir, f"{name}.json")
+        self.max_age = datetime.timedelta(hours=max_age_hours)
+        state = None if fresh else self.load()
+        self.resumed = state is not None
+        state = state or {"started": now().isoformat(timespec="seconds"), "done": [], "changed": []}
+        self.started = state["started"]
+        self.done = set(state["done"])
+        self.changed = {tuple(p) for p in state["changed"]}
+
+    def load(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if now() - datetime.datetime.fromisoformat(state["started"]) > self.max_age:
+            print(f"🗑️ Ignoring stale journal {self.path} (started {state['started']})")
+            return None
+        return state
+
+    def save(self):
+        with atomic_open(self.path, encoding="utf-8") as f:
+            json.dump({"started": self.started, "done": sorted(self.done),
+                       "changed": sorted(self.changed)}, f, indent=1)
+
+    def is_done(self, unit):
+        return unit in self.done
+
+    def checkpoint(self, units, changed=()):
+        """Mark ``units`` finished (their rows are in the store) and remember ``changed`` partitions."""
+        self.done.update(units)
+        self.changed.update(tuple(p) for p in changed)
+        self.save()
+
+    def clear(self):
+        """The run completed; the next one starts from scratch."""
+        if os.path.exists(self.path):
+            os.remove(self.path)
@@ -1,8 +1,7 @@
+from profiling import mark
 import pandas as pd
-import time
-from sleeper_wrapper.league import League
-from sleeper_wrapper.drafts import Drafts
-import requests
+from sleeper_client import fetch_all
+from schema import read_table, write_table
 
 # -------------------------
 # CONFIG
@@ -14,50 +13,56 @@ OUTPUT_PICKS = "data/DraftPicks_AllYears.csv"
 # -------------------------
 # HELPER FUNCTIONS
 # -------------------------
-def safe_get_drafts(league_id, league_name):
-    """Safely fetch all drafts for a given league."""
-    try:
-        drafts = League(league_id).get_all_drafts()
-        if not drafts:
-            print(f"⚠️  No drafts found for {league_name} ({league_id})")
-        return drafts or []
-    except requests.exceptions.RequestException as e:
-        print(f"❌ Network error fetching drafts for {league_name} ({league_id}): {e}")
+def safe_get_drafts(responses, league_id, league_name):
+    """Safely read all drafts for a given league from the fetched responses."""
+    drafts = responses.get(f"/league/{league_id}/drafts")
+    if drafts is None:
+        print(f"❌ Error fetching drafts for {league_name} ({league_id})")
         return []
-    except Exception as e:
-        print(f"❌ Unexpected error fetching drafts for {league_name} ({league_id}): {e}")
-        return []
-
-def safe_get_picks(draft_id, league_name):
-    """Safely fetch all picks for a given draft."""
-    try:
-        picks = Drafts(draft_id).get_all_picks()
-        if isinstance(picks, dict) and "message" in picks:
-            # Sleeper sometimes returns {'message': 'Not Found'} instead of raising error
-            print(f"⚠️  Draft not available for {league_name} ({draft_id})")
-            return []
-        return picks or []
-    except requests.exceptions.RequestException as e:
-        print(f"⚠️  Network error fetching picks for draft {draft_id}: {e}")
+    if not drafts:
+        print(f"⚠️  No drafts found for {league_name} ({league_id})")
+    return drafts or []
+
+def safe_get_picks(responses, draft_id, league_name):
+    """Safely read all picks for a given draft from the fetched responses."""
+    picks = responses.get(f"/draft/{draft_id}/picks")
+    if picks is None:
+        print(f"⚠️  Error fetching picks for draft {draft_id}")
         return []
-    except Exception as e:
-        print(f"⚠️  Unexpected error fetching picks for draft {draft_id}: {e}")
+    if isinstance(picks, dict) and "message" in picks:
+        # Sleeper sometimes returns {'message': 'Not Found'} instead of raising error
+        print(f"⚠️  Draft not available for {league_name} ({draft_id})")
         return []
+    return picks or []
 
 # -------------------------
 # MAIN SCRIPT
 # -------------------------
-league_ids_df = pd.read_csv(INPUT_FILE)
+league_ids_df = read_table("LeagueIDs_AllYears", INPUT_FILE)
 all_drafts = []
 all_picks = []
 
+# Fan out: every league's drafts first, then every draft's picks
+draft_responses = fetch_all(f"/league/{league_id}/drafts" for league_id in league_ids_df["LeagueID"])
+all_league_drafts = [
+    draft
+    for drafts in draft_responses.values() if isinstance(drafts, list)
+    for draft in drafts
+]
+pick_responses = fetch_all(
+    (f"/draft/{draft.get('draft_id')}/picks" for draft in all_league_drafts),
+    # Picks of a finished draft never change
+    immutable={f"/draft/{draft.get('draft_id')}/picks" for draft in all_league_drafts if draft.get("status") == "complete"},
+)
+
+mark("transform")
 for _, row in league_ids_df.iterrows():
     league_id = row["LeagueID"]
     league_name = row["LeagueName"]
 
     print(f"\nFetching draft info for league {league_name} ({league_id})...")
 
-    drafts = safe_get_drafts(league_id, league_name)
+    drafts = safe_get_drafts(draft_responses, league_id, league_name)
     if not drafts:
         continue  # skip this league if no drafts available
 
@@ -77,7 +82,7 @@ for _, row in league_ids_df.iterrows():
             "Teams": num_teams
         })
 
-        picks = safe_get_picks(draft_id, league_name)
+        picks = safe_get_picks(pick_responses, draft_id, league_name)
         if not isinstance(picks, list):
             print(f"⚠️  Invalid pick data for {league_name} ({draft_id})")
             continue
@@ -109,17 +114,11 @@ for _, row in league_ids_df.iterrows():
                 "YearsExp": meta.get("years_exp")
             })
 
-        # Light rate limit buffer (Sleeper API friendly)
-        time.sleep(0.2)
-
 # -------------------------
 # SAVE OUTPUTS
 # -------------------------
-drafts_df = pd.DataFrame(all_drafts)
-picks_df = pd.DataFrame(all_picks)
-
-drafts_df.to_csv(OUTPUT_DRAFTS, index=False)
-picks_df.to_csv(OUTPUT_PICKS, index=False)
+drafts_df = write_table(pd.DataFrame(all_drafts), "Drafts_AllYears", OUTPUT_DRAFTS)
+picks_df = write_table(pd.DataFrame(all_picks), "DraftPicks_AllYears", OUTPUT_PICKS)
 
 print(f"\n✅ Drafts and picks exported successfully!")
 print(f"   • Drafts saved to: {OUTPUT_DRAFTS}")
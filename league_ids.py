@@ -1,32 +1,29 @@
 #!/usr/bin/env python3
-import requests
+from profiling import mark
 import pandas as pd
 import datetime
 import os
-import time
+from sleeper_client import fetch_all
+from schema import write_table
 
 USER_ID = "731808894699028480"
-BASE = "https://api.sleeper.app/v1"
-START_YEAR = 2020
+START_YEAR = int(os.environ.get("SLEEPER_START_YEAR", 2020))  # earlier for synthetic history (synth.py)
 END_YEAR = datetime.datetime.now().year
 
 OUTPUT_DIR = "data"
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
-session = requests.Session()
-session.headers.update({"User-Agent": "NCAA180-Sleeper/1.0"})
-
 all_leagues = []
 
-for year in range(START_YEAR, END_YEAR + 1):
-    url = f"{BASE}/user/{USER_ID}/leagues/nfl/{year}"
-    print(f"Fetching leagues for {year} -> {url}")
-    try:
-        resp = session.get(url, timeout=30)
-        resp.raise_for_status()
-        leagues = resp.json()
-    except Exception as e:
-        print(f"  ERROR fetching year {year}: {e}")
+years = range(START_YEAR, END_YEAR + 1)
+responses = fetch_all(f"/user/{USER_ID}/leagues/nfl/{year}" for year in years)
+
+mark("transform")
+for year in years:
+    leagues = responses[f"/user/{USER_ID}/leagues/nfl/{year}"]
+    print(f"Fetched leagues for {year}")
+    if leagues is None:
+        print(f"  ERROR fetching year {year}")
         leagues = []
 
     for league in leagues:
@@ -35,13 +32,11 @@ for year in range(START_YEAR, END_YEAR + 1):
             "LeagueID": league.get("league_id"),
             "LeagueName": league.get("name"),
             "Division1": league.get("metadata", {}).get("division_1"),
-            "Division2": league.get("metadata", {}).get("division_2")
+            "Division2": league.get("metadata", {}).get("division_2"),
+            "Status": league.get("status")  # 'complete' seasons are cached forever
         })
 
-    # polite pause to avoid hitting rate limits
-    time.sleep(1)
-
 df = pd.DataFrame(all_leagues)
 out_file = os.path.join(OUTPUT_DIR, "LeagueIDs_AllYears.csv")
-df.to_csv(out_file, index=False)
+df = write_table(df, "LeagueIDs_AllYears", out_file)
 print(f"✅ Saved {len(df)} league records to {out_file}")
@@ -1,13 +1,26 @@
+from profiling import mark
 import pandas as pd
-from sleeper_wrapper import League
-import time
+from sleeper_client import fetch_all, WEEKS
+from schema import columns, read_table, write_table
 
-league_df = pd.read_csv("data/LeagueIDs_AllYears.csv")
+league_df = read_table("LeagueIDs_AllYears")
 
 all_transactions = []
+all_rosters = []
+all_adds = []
+all_drops = []
+all_picks = []
 
 OBSERVER_IDS = [731808894699028480]
 
+# Fetch each league's rosters once plus every league × week of transactions in one fan-out
+paths = []
+for league_id in league_df['LeagueID']:
+    paths.append(f"/league/{league_id}/rosters")
+    paths += [f"/league/{league_id}/transactions/{week}" for week in WEEKS]
+responses = fetch_all(paths)
+
+mark("transform")
 for idx, row in league_df.iterrows():
     league_id = row['LeagueID']
     year = row['Year']
@@ -15,53 +28,69 @@ for idx, row in league_df.iterrows():
 
     print(f"Processing transactions for {league_name} ({year})")
 
-    league_api = League(league_id)
+    # roster_id -> owner_id, built once and shared by every week of this league
+    rosters = responses[f"/league/{league_id}/rosters"]
+    if rosters is None:
+        print(f"  ERROR fetching rosters for {league_id}")
+        rosters = []
+    roster_index = {r['roster_id']: r.get('owner_id') for r in rosters}
 
     # Loop through each week (1–18)
-    for week in range(1, 19):
-        try:
-            weekly_tx = league_api.get_transactions(week)
-        except Exception as e:
-            print(f"  ERROR fetching transactions for {league_id} week {week}: {e}")
+    for week in WEEKS:
+        weekly_tx = responses[f"/league/{league_id}/transactions/{week}"]
+        if weekly_tx is None:
+            print(f"  ERROR fetching transactions for {league_id} week {week}")
             continue
 
         if not weekly_tx:
             continue
 
         for tx in weekly_tx:
-            roster_ids = tx.get('roster_ids', [])
-            owner_ids = []
-            try:
-                rosters = league_api.get_rosters()
-            except:
-                rosters = []
-
-            for r_id in roster_ids:
-                owner_id = next((r['owner_id'] for r in rosters if r['roster_id'] == r_id), None)
-                if owner_id is None or owner_id in OBSERVER_IDS:
-                    owner_id = 0
-                owner_ids.append(owner_id)
+            tx_id = tx.get('transaction_id')
 
             all_transactions.append({
                 "Year": year,
                 "LeagueID": league_id,
                 "LeagueName": league_name,
                 "Week": week,
-                "TransactionID": tx.get('transaction_id'),
+                "TransactionID": tx_id,
                 "Type": tx.get('type'),
-                "RosterIDs": roster_ids,
-                "OwnerIDs": owner_ids,
-                "Picks": tx.get('draft_picks', []),
-                "Adds": tx.get('adds', {}),
-                "Drops": tx.get('drops', {}),
                 "Status": tx.get('status'),
                 "Created": tx.get('created')
             })
 
-        # Polite pause
-        time.sleep(0.5)
+            for r_id in tx.get('roster_ids') or []:
+                owner_id = roster_index.get(r_id)
+                if owner_id is None or owner_id in OBSERVER_IDS:
+                    owner_id = 0
+                all_rosters.append({"Year": year, "TransactionID": tx_id, "RosterID": r_id, "OwnerID": owner_id})
+
+            # adds/drops are {player_id: roster_id}
+            for player_id, r_id in (tx.get('adds') or {}).items():
+                all_adds.append({"Year": year, "TransactionID": tx_id, "PlayerID": player_id, "RosterID": r_id})
+            for player_id, r_id in (tx.get('drops') or {}).items():
+                all_drops.append({"Year": year, "TransactionID": tx_id, "PlayerID": player_id, "RosterID": r_id})
+
+            for pick in tx.get('draft_picks') or []:
+                all_picks.append({
+                    "Year": year,
+                    "TransactionID": tx_id,
+                    "PickSeason": pick.get('season'),
+                    "Round": pick.get('round'),
+                    "RosterID": pick.get('roster_id'),
+                    "PreviousOwnerRosterID": pick.get('previous_owner_id'),
+                    "OwnerRosterID": pick.get('owner_id')
+                })
 
-# Save CSV
-out_file = "data/Transactions_AllYears.csv"
-pd.DataFrame(all_transactions).to_csv(out_file, index=False)
-print(f"Saved {len(all_transactions)} transactions to {out_file}")
+# Save CSVs: one header row per transaction plus long tables keyed by TransactionID
+outputs = [
+    ("Transactions_AllYears", all_transactions),
+    ("TransactionRosters_AllYears", all_rosters),
+    ("TransactionAdds_AllYears", all_adds),
+    ("TransactionDrops_AllYears", all_drops),
+    ("TransactionPicks_AllYears", all_picks),
+]
+for table, rows in outputs:
+    out_file = f"data/{table}.csv"
+    write_table(pd.DataFrame(rows, columns=columns(table)), table, out_file)
+    print(f"Saved {len(rows)} rows to {out_file}")
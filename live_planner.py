@@ -0,0 +1,84 @@
+"""Pick which league-weeks a live tick actually needs to fetch.
+
+A league's score can only move while one of its starters is on the field,
+so each tick only polls leagues whose current starters include a player
+from a team whose game is in progress (per the ESPN scoreboard), plus one
+last pass for teams whose game just ended. Whenever a new game kicks off
+every league is polled once, which picks up lineups as they lock.
+"""
+from schema import read_table
+
+# ESPN abbreviations that differ from Sleeper's team codes
+TEAM_ALIASES = {"WSH": "WAS"}
+
+
+# -------------------------
+# SCOREBOARD
+# -------------------------
+def team_code(abbreviation):
+    abbreviation = (abbreviation or "").upper()
+    return TEAM_ALIASES.get(abbreviation, abbreviation)
+
+
+def teams_in_state(scoreboard, state="in"):
+    """Sleeper team codes playing in games whose ESPN state is ``state`` (pre/in/post)."""
+    teams = set()
+    for event in scoreboard.get("events", []):
+        if event.get("status", {}).get("type", {}).get("state", "").lower() != state:
+            continue
+        for competition in event.get("competitions", []):
+            for competitor in competition.get("competitors", []):
+                teams.add(team_code(competitor.get("team", {}).get("abbreviation")))
+    teams.discard("")
+    return teams
+
+
+# -------------------------
+# STARTERS -> TEAMS
+# -------------------------
+def load_player_teams(players_file="data/Players.csv"):
+    """player_id -> NFL team. Team defenses use the team code as their player id."""
+    players_df = read_table("Players", players_file)
+    players_df = players_df[players_df["team"].notna()]
+    return dict(zip(players_df["player_id"], players_df["team"].astype(str)))
+
+
+def league_teams(scores_df, player_teams):
+    """league_id -> NFL teams of its starters, from one week's Scores rows."""
+    teams = {}
+    for league_id, starters in scores_df.groupby("league_id")["starter"]:
+        teams[league_id] = {player_teams.get(p, p) for p in starters.dropna()}
+    return teams
+
+
+# -------------------------
+# PLANNER
+# -------------------------
+class LivePlanner:
+    """Remembers which teams were live on the previous tick."""
+
+    def __init__(self, player_teams):
+        self.player_teams = player_teams
+        self.live_teams = set()
+
+    def plan(self, scoreboard, league_ids, week_scores):
+        """League IDs to fetch this tick, given the week's last stored Scores rows."""
+        live = teams_in_state(scoreboard, "in")
+        kicked_off = live - self.live_teams
+        finished = self.live_teams - live
+        self.live_teams = live
+
+        starters = league_teams(week_scores, self.player_teams)
+        if kicked_off:
+            selected = list(league_ids)
+            reason = f"kickoff: {', '.join(sorted(kicked_off))}"
+        else:
+            teams = live | finished
+            # Leagues with no stored starters yet are always fetched
+            selected = [lid for lid in league_ids if lid not in starters or starters[lid] & teams]
+            reason = f"in progress: {', '.join(sorted(live)) or 'none'}"
+            if finished:
+                reason += f"; final: {', '.join(sorted(finished))}"
+
+        print(f"🎯 Polling {len(selected)} of {len(league_ids)} leagues ({reason})")
+        return selected
@@ -0,0 +1,222 @@
+"""Long-running live scoring loop for one game window.
+
+Started once per window instead of a fresh process per cron tick: pandas,
+the player label map, the league list and the Scores table are loaded once
+and kept in memory. Every ``--interval`` seconds the ESPN scoreboard is
+polled; while games are in progress the current week's matchups are
+fetched from Sleeper (only the leagues live_planner says can move) and
+the week partition is rewritten only when a score actually moved. The flat
+Scores.csv (a full rewrite, see scores_store.py) is exported from memory
+only right before a publish (optional git commit + push, optional Power BI
+refresh), which happens at most every ``--publish-every`` minutes.
+While no game is in progress but one kicks off within ``--wait-hours``
+(the cron fired before kickoff, or between the afternoon games and the
+night game) the loop keeps waiting; the idle countdown only starts once
+nothing is live or about to start, and the loop exits after
+``--idle-minutes`` of that, or after ``--max-hours``. A start with nothing
+live or scheduled soon exits straight away, so the workflow can fire every
+hour across each game window and restart a loop that has stopped.
+"""
+import argparse
+import datetime
+import subprocess
+import time
+
+import pandas as pd
+import requests
+
+import delta
+import powerbi_refresh
+from NFLgameStatus import fetch_scoreboard, game_status, next_kickoff
+from live_planner import LivePlanner, load_player_teams
+from matchup_rows import starter_rows, load_player_label_map
+from profiling import phase
+from schema import coerce, read_table, write_table
+from scores_store import (
+    CSV_PATH, STORE_DIR, TABLE, bootstrap_store, merge_partition, partition_path,
+    splice_partition, write_partition,
+)
+from sleeper_client import fetch_all
+
+# -------------------------
+# CONFIG
+# -------------------------
+PLAYERS_FILE = "data/Players.csv"
+PUBLISH_PATHS = ["data/Scores.csv", "data/LastUpdate.csv", "data/parquet/Scores", STORE_DIR, delta.HASH_DIR]
+
+
+# -------------------------
+# IN-MEMORY SCORES
+# -------------------------
+class LiveScores:
+    """Current-season leagues, player labels and the Scores table, loaded once."""
+
+    def __init__(self, year):
+        self.year = year
+        self.player_label_map = load_player_label_map(PLAYERS_FILE, year)
+        self.planner = LivePlanner(load_player_teams(PLAYERS_FILE))
+        league_df = read_table("LeagueIDs_AllYears")
+        self.league_ids = league_df.loc[league_df["Year"] == year, "LeagueID"].tolist()
+        if not self.league_ids:
+            raise ValueError(f"No leagues found for {year}")
+
+        bootstrap_store(CSV_PATH, STORE_DIR)
+        self.scores = read_table(TABLE, CSV_PATH)
+        self.partitions = {}  # week -> rows as last written
+        self.dirty = set()    # weeks written since the last export
+
+    def partition(self, week):
+        if week not in self.partitions:
+            self.partitions[week] = coerce(read_table(TABLE, partition_path(self.year, week)), TABLE).reset_index(drop=True)
+        return self.partitions[week]
+
+    def plan(self, scoreboard, week):
+        """Leagues with a starter in a game that is (or just stopped being) in progress."""
+        return self.planner.plan(scoreboard, self.league_ids, self.partition(week))
+
+    def refresh(self, week, league_ids=None):
+        """Fetch this week's matchups; write only if the partition changed. Returns True on change."""
+        league_ids = self.league_ids if league_ids is None else league_ids
+        if not league_ids:
+            return False
+        paths = [f"/league/{league_id}/matchups/{week}" for league_id in league_ids]
+        responses = fetch_all(paths, ttl=0, keep=False)  # polled every few minutes; the nightly run archives the week
+
+        rows = []
+        with phase("transform"):
+            for league_id, path in zip(league_ids, paths):
+                if responses[path] is None:
+                    print(f"⚠️ Error fetching league {league_id}, week {week}")
+                    continue
+                rows.extend(starter_rows(responses[path], self.year, league_id, week, self.player_label_map))
+        if not rows:
+            return False
+
+        current = self.partition(week)
+        merged = merge_partition(current, coerce(pd.DataFrame(rows), TABLE))
+        if merged.equals(current):
+            return False
+
+        write_partition(self.year, week, merged)
+        self.partitions[week] = merged
+        self.dirty.add(week)
+        return True
+
+    def export(self):
+        """Splice the weeks changed since the last export into Scores.csv (and its Parquet year)."""
+        if not self.dirty:
+            return
+        for week in sorted(self.dirty):
+            self.scores = splice_partition(self.scores, self.year, week, self.partitions[week])
+        write_table(self.scores, TABLE, CSV_PATH)
+        self.dirty.clear()
+
+
+# -------------------------
+# PUBLISH
+# -------------------------
+def git_commit_and_push(week):
+    subprocess.run(["git", "add", *PUBLISH_PATHS], check=False)
+    if subprocess.run(["git", "diff", "--cached", "--quiet"]).returncode == 0:
+        print("No changes to commit")
+        return
+    subprocess.run(["git", "commit", "-m", f"Auto update live scores (Week {week})"], check=False)
+    subprocess.run(["git", "push"], check=False)
+
+
+def publish(week, args):
+    """Commit / refresh Power BI for everything in the delta manifest, then start a new one."""
+    print(f"📤 Publishing Week {week} scores — {delta.summary()}")
+    if args.commit:
+        git_commit_and_push(week)
+    if args.powerbi:
+        powerbi_refresh.trigger_refresh()
+    delta.reset_manifest()
+
+
+# -------------------------
+# MAIN LOOP
+# -------------------------
+def main():
+    parser = argparse.ArgumentParser(description="Poll live scores for one game window.")
+    parser.add_argument("--week", type=int, help="NFL week (default: ESPN's current week)")
+    parser.add_argument("--interval", type=int, default=60, help="Seconds between polls")
+    parser.add_argument("--idle-minutes", type=float, default=45, help="Exit after this long with no game in progress or about to start")
+    parser.add_argument("--wait-hours", type=float, default=3, help="Keep waiting while a game kicks off within this many hours")
+    parser.add_argument("--max-hours", type=float, default=5.5, help="Hard stop (stay inside the runner's job limit)")
+    parser.add_argument("--publish-every", type=float, default=5, help="Minimum minutes between commits/Power BI refreshes")
+    parser.add_argument("--all-leagues", action="store_true", help="Poll every league each tick instead of only those with live starters")
+    parser.add_argument("--commit", action="store_true", help="git commit + push changed data")
+    parser.add_argument("--powerbi", action="store_true", help="Trigger a Power BI dataset refresh after changes")
+    args = parser.parse_args()
+
+    today = datetime.date.today()
+    year = today.year - 1 if today.month < 3 else today.year
+    live = LiveScores(year)
+    print(f"🏈 Live scoring for {year}: {len(live.league_ids)} leagues, {len(live.scores)} stored score rows")
+
+    delta.reset_manifest()
+    espn = requests.Session()
+    started = time.monotonic()
+    idle_since = None
+    was_active = was_waiting = False
+    engaged = False  # a game has been live or about to kick off
+    week = args.week
+    last_publish = float("-inf")
+
+    try:
+        while time.monotonic() - started < args.max_hours * 3600:
+            try:
+                scoreboard = fetch_scoreboard(espn)
+                status = game_status(scoreboard)
+            except Exception as e:
+                print(f"⚠️ Error fetching game status: {e}")
+                time.sleep(args.interval)
+                continue
+
+            week = args.week or status["week_number"]
+            active = status["games_active"]
+            kickoff = next_kickoff(scoreboard)
+            waiting = not active and kickoff is not None and (
+                kickoff - datetime.datetime.now(datetime.timezone.utc)).total_seconds() <= args.wait_hours * 3600
+            now = time.monotonic()
+
+            # Poll while games are live, plus once more after the last one goes final
+            if week and (active or was_active):
+                tick = time.monotonic()
+                league_ids = None if args.all_leagues else live.plan(scoreboard, week)
+                changed = live.refresh(week, league_ids)
+                print(f"{'📈 Scores changed' if changed else '⏸️ No change'} — Week {week} ({time.monotonic() - tick:.1f}s)")
+
+            if now - last_publish >= args.publish_every * 60 or not active:
+                live.export()
+                if delta.has_changes():
+                    publish(week, args)
+                    last_publish = now
+
+            # Idle time only counts once nothing is live or about to kick off
+            if waiting and not was_waiting:
+                print(f"⏳ No game in progress — waiting for the {kickoff:%a %H:%M} UTC kickoff")
+            if active or waiting:
+                idle_since = None
+                engaged = True
+            elif not engaged:
+                print("😴 No game in progress or kicking off soon — nothing to do in this window")
+                break
+            else:
+                idle_since = idle_since or now
+                if now - idle_since >= args.idle_minutes * 60:
+                    print("😴 No games in progress — ending live window")
+                    break
+            was_active, was_waiting = active, waiting
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        print("🛑 Interrupted")
+    finally:
+        live.export()
+        if delta.has_changes():
+            publish(week, args)
+
+
+if __name__ == "__main__":
+    main()
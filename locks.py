@@ -0,0 +1,52 @@
+"""File locks and atomic writes for state shared by parallel pipeline stages.
+
+pipeline.py runs stages as separate processes, and several of them update
+the same files (the delta manifest, data/LastUpdate.csv, ...). Every
+read-modify-write of such a file happens under ``locked(path)``, an
+exclusive ``flock`` on a lock file under .cache/locks/ (kept out of the
+data directories so it is never committed), and the new content is
+written with ``atomic_open`` so readers never see a half-written file.
+"""
+import contextlib
+import fcntl
+import os
+import tempfile
+
+# -------------------------
+# CONFIG
+# -------------------------
+LOCK_DIR = os.environ.get("SLEEPER_LOCK_DIR", ".cache/locks")
+
+
+def lock_path(path):
+    """``data/LastUpdate.csv`` -> ``.cache/locks/data__LastUpdate.csv.lock``."""
+    return os.path.join(LOCK_DIR, os.path.relpath(path).replace(os.sep, "__") + ".lock")
+
+
+@contextlib.contextmanager
+def locked(path):
+    """Hold an exclusive cross-process lock for ``path`` while the block runs."""
+    os.makedirs(LOCK_DIR, exist_ok=True)
+    with open(lock_path(path), "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+@contextlib.contextmanager
+def atomic_open(path, mode="w", **kwargs):
+    """Write to a temp file next to ``path`` and rename it over ``path`` on success."""
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, mode, **kwargs) as f:
+            yield f
+        os.chmod(tmp, 0o644)  # mkstemp files are private
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
@@ -0,0 +1,125 @@
+"""Row builders for Sleeper ``/league/{id}/matchups/{week}`` payloads.
+
+One matchups payload feeds two tables: the team-level rows in
+Matchups_AllYears.csv and the starter-level rows in Scores.csv. Both are
+derived here so a league-week only ever has to be fetched once.
+"""
+import os
+from collections import defaultdict
+
+from player_dim import PlayerLabels
+
+OBSERVER_IDS = [731808894699028480]  # Optional: exclude observer accounts
+REGULAR_SEASON_WEEKS = 11
+
+
+# -------------------------
+# PLAYER LABELS
+# -------------------------
+def load_player_label_map(players_file="data/Players.csv", season=None):
+    """player_id -> "First Last, POS (TEAM)" lookup used for Scores labels.
+
+    Labels come from the player dimension as of ``season`` (see player_dim.py),
+    so past starters who are now free agents or retired keep their label.
+    """
+    if not os.path.exists(players_file):
+        raise FileNotFoundError(f"Missing Players file: {players_file}")
+    return PlayerLabels(players_file).for_season(season)
+
+
+# -------------------------
+# TEAM-LEVEL ROWS (Matchups_AllYears.csv)
+# -------------------------
+def team_rows(weekly_matchups, year, league_id, league_name, week, roster_map, user_map):
+    rows = []
+
+    # Group by matchup_id to find opponents
+    matchups_by_id = defaultdict(list)
+    for m in weekly_matchups:
+        matchups_by_id[m['matchup_id']].append(m)
+
+    for matchup_id, teams in matchups_by_id.items():
+        if len(teams) != 2:
+            # Handle bye weeks / missing opponent
+            teams.append({'roster_id': None, 'points': 0, 'starters': [], 'starters_points': [], 'players_points': {}})
+
+        team1, team2 = teams
+
+        for t, opp in [(team1, team2), (team2, team1)]:
+            r_id = t['roster_id']
+            owner_id = roster_map.get(r_id)
+            if owner_id is None or owner_id in OBSERVER_IDS:
+                owner_id = 0
+                owner_name = "Vacant"
+            else:
+                owner_name = user_map.get(owner_id, "Unknown")
+
+            opp_rid = opp.get('roster_id')
+            opp_owner_id = roster_map.get(opp_rid)
+            if opp_owner_id is None or opp_owner_id in OBSERVER_IDS:
+                opp_name = "Vacant"
+            else:
+                opp_name = user_map.get(opp_owner_id, "Unknown")
+
+            points_for = t.get('points', 0)
+            points_against = opp.get('points', 0)
+
+            # Outcome logic: blank for 0-0 games
+            if points_for == 0 and points_against == 0:
+                outcome = ""
+            else:
+                outcome = "Win" if points_for > points_against else ("Loss" if points_for < points_against else "Tie")
+
+            rows.append({
+                "Year": year,
+                "LeagueID": league_id,
+                "LeagueName": league_name,
+                "Week": week,
+                "RosterID": r_id,
+                "OwnerID": owner_id,
+                "OwnerName": owner_name,
+                "OpponentRosterID": opp_rid,
+                "OpponentName": opp_name,
+                "PointsFor": points_for,
+                "PointsAgainst": points_against,
+                "Outcome": outcome,
+                "IsRegularSeason": week <= REGULAR_SEASON_WEEKS,
+                "StarterPoints": sum(t.get('starters_points', [])) if t.get('starters_points') else None,
+                "BenchPoints": points_for - sum(t.get('starters_points', [])) if t.get('starters_points') else None
+            })
+    return rows
+
+
+# -------------------------
+# STARTER-LEVEL ROWS (Scores.csv)
+# -------------------------
+def starter_rows(weekly_matchups, league_year, league_id, week, player_label_map):
+    rows = []
+    for matchup in weekly_matchups:
+        roster_id = matchup.get("roster_id", "")
+        starters = matchup.get("starters", []) or []
+        starters_points = matchup.get("starters_points", []) or []
+        player_points = matchup.get("players_points", {}) or {}
+        lookup_id = f"{league_id}{roster_id}"
+
+        for i, player_id in enumerate(starters):
+            # Prefer players_points dict for accuracy
+            points = player_points.get(str(player_id))
+            # Fall back to starters_points positional list
+            if points is None and i < len(starters_points):
+                points = starters_points[i]
+            # Clean fallback for missing/null
+            points = float(points) if points not in (None, "", "null") else 0.0
+
+            rows.append({
+                "LeagueYear": league_year,
+                "league_id": league_id,
+                "weekNum": week,
+                "roster_id": roster_id,
+                "lookupID": lookup_id,
+                "starter": str(player_id),
+                "starter_points": points,
+                "array_index": i + 1,
+                "label": player_label_map.get(str(player_id), "")
+            })
+    return rows
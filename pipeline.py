@@ -0,0 +1,247 @@
+"""Dependency-aware runner for the nightly stages.
+
+Each stage is one of the existing scripts, declared with the data files it
+reads and writes. Stages start as soon as every stage producing one of
+their inputs has finished, so everything that only needs
+LeagueIDs_AllYears.csv runs side by side. Stages that write the same file
+never overlap. Offline stages (no Sleeper calls) are skipped when the
+content of their inputs is unchanged since their last successful run. The
+run ends with per-stage timings and the critical path.
+
+    python pipeline.py                 # every default stage
+    python pipeline.py rosters users   # just these (no upstream stages)
+"""
+import argparse
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+
+# -------------------------
+# CONFIG
+# -------------------------
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+STATE_FILE = "store/pipeline_state.json"
+MAX_JOBS = int(os.environ.get("PIPELINE_JOBS", 4))
+RATE_STATE = ".cache/rate_limiter.json"  # one Sleeper rate budget for every running stage
+
+LEAGUES = "data/LeagueIDs_AllYears.csv"
+PLAYERS = "data/Players.csv"
+MATCHUPS = "data/Matchups_AllYears.csv"
+SCORES = "data/Scores.csv"
+
+
+class Stage:
+    def __init__(self, name, script, inputs=(), outputs=(), network=True, default=True):
+        self.name = name
+        self.script = script
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.network = network    # fetches from Sleeper, so always runs
+        self.default = default    # part of a plain `python pipeline.py` run
+
+
+STAGES = [
+    Stage("league_ids", "league_ids.py", outputs=[LEAGUES]),
+    Stage("players", "players.py", outputs=[PLAYERS]),
+    Stage("users", "users.py", outputs=["data/Users_AllYears.csv"]),
+    Stage("rosters", "rosters.py", [LEAGUES, PLAYERS], ["data/Rosters_Current.csv"]),
+    Stage("rosterhistory", "rosterhistory.py", [LEAGUES], ["data/Rosters_Players_AllYears.csv"]),
+    Stage("matchups", "league_matchups.py", [LEAGUES, PLAYERS], [MATCHUPS, SCORES]),
+    Stage("transactions", "league_transactions.py", [LEAGUES], [
+        "data/Transactions_AllYears.csv", "data/TransactionRosters_AllYears.csv",
+        "data/TransactionAdds_AllYears.csv", "data/TransactionDrops_AllYears.csv",
+        "data/TransactionPicks_AllYears.csv",
+    ]),
+    Stage("drafts", "league_drafts.py", [LEAGUES], ["data/Drafts_AllYears.csv", "data/DraftPicks_AllYears.csv"]),
+    # league_matchups already writes Scores; the standalone pass is opt-in
+    Stage("scores", "score_details.py", [LEAGUES, PLAYERS], [SCORES], default=False),
+    Stage("Results_RegularSeason", "Results_RegularSeason.py", [LEAGUES, MATCHUPS],
+          ["data/Results_RegularSeason.csv"], network=False),
+]
+STAGES_BY_NAME = {stage.name: stage for stage in STAGES}
+
+
+# -------------------------
+# GRAPH
+# -------------------------
+def upstream(stage, selected):
+    """Selected stages that must finish before ``stage`` starts."""
+    deps = []
+    for other in selected:
+        if other is stage:
+            continue
+        if set(other.outputs) & set(stage.inputs):
+            deps.append(other)
+        # Stages writing the same file run in declaration order
+        elif set(other.outputs) & set(stage.outputs) and STAGES.index(other) < STAGES.index(stage):
+            deps.append(other)
+    return deps
+
+
+def critical_path(selected, deps, durations):
+    """Longest chain of dependent stages by this run's durations."""
+    finish, via = {}, {}
+    for stage in selected:  # declaration order is a topological order
+        before = max(deps[stage.name], key=lambda d: finish[d.name], default=None)
+        finish[stage.name] = durations.get(stage.name, 0.0) + (finish[before.name] if before else 0.0)
+        via[stage.name] = before
+    if not finish:
+        return [], 0.0
+    last = max(selected, key=lambda s: finish[s.name])
+    path, stage = [], last
+    while stage:
+        path.append(stage)
+        stage = via[stage.name]
+    return path[::-1], finish[last.name]
+
+
+# -------------------------
+# CHANGE DETECTION
+# -------------------------
+def file_hash(path):
+    if not os.path.exists(path):
+        return None
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def load_state():
+    try:
+        with open(STATE_FILE, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_state(state):
+    os.makedirs(os.path.dirname(STATE_FILE), exist_ok=True)
+    with open(STATE_FILE, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=1, sort_keys=True)
+
+
+def input_hashes(stage):
+    return {path: file_hash(path) for path in stage.inputs}
+
+
+def can_skip(stage, state):
+    if stage.network:
+        return False
+    previous = state.get(stage.name, {}).get("inputs")
+    return previous == input_hashes(stage) and all(os.path.exists(p) for p in stage.outputs)
+
+
+# -------------------------
+# RUN
+# -------------------------
+_print_lock = threading.Lock()
+
+
+def run_stage(stage, env):
+    started = time.monotonic()
+    proc = subprocess.run([sys.executable, os.path.join(SCRIPT_DIR, stage.script)],
+                          capture_output=True, text=True, env=env)
+    elapsed = time.monotonic() - started
+    with _print_lock:
+        print(f"\n━━━ {stage.name} ({stage.script}) — {elapsed:.1f}s, exit {proc.returncode}")
+        print(proc.stdout, end="")
+        if proc.stderr:
+            print(proc.stderr, end="", file=sys.stderr)
+    return proc.returncode, elapsed
+
+
+def run(selected, jobs=MAX_JOBS, force=False, profile=False, fill_gaps=False, offline=False):
+    deps = {stage.name: upstream(stage, selected) for stage in selected}
+    durations, status = {}, {}
+
+    # Concurrent stages draw from one token bucket (see rate_limiter.py), so a
+    # long stage gets the whole budget once its siblings have finished
+    if os.path.exists(RATE_STATE):
+        os.remove(RATE_STATE)
+    env = dict(os.environ, SLEEPER_RATE_STATE=os.path.abspath(RATE_STATE))
+    if profile:
+        env["SLEEPER_PROFILE"] = "1"  # see profiling.py
+    if fill_gaps:
+        env["SLEEPER_FILL_GAPS"] = "1"  # see resilience.py
+    if offline:
+        env["SLEEPER_OFFLINE"] = "1"  # see archive.py
+
+    pending = list(selected)
+    running = {}
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        while pending or running:
+            for stage in list(pending):
+                dep_status = [status.get(d.name) for d in deps[stage.name]]
+                if any(s is None for s in dep_status):
+                    continue  # an upstream stage is still queued or running
+                pending.remove(stage)
+                if any(s == "failed" or s == "blocked" for s in dep_status):
+                    status[stage.name] = "blocked"
+                    print(f"⛔ {stage.name}: skipped, an upstream stage failed")
+                elif not force and can_skip(stage, load_state()):
+                    status[stage.name] = "skipped"
+                    print(f"⏭️ {stage.name}: inputs unchanged since last run — skipped")
+                else:
+                    print(f"▶️ {stage.name}: starting")
+                    running[pool.submit(run_stage, stage, env)] = stage
+
+            if not running:
+                continue
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                stage = running.pop(future)
+                returncode, elapsed = future.result()
+                durations[stage.name] = elapsed
+                status[stage.name] = "ok" if returncode == 0 else "failed"
+                if returncode == 0:
+                    state = load_state()
+                    state[stage.name] = {"inputs": input_hashes(stage), "seconds": round(elapsed, 2)}
+                    save_state(state)
+    return status, durations, deps
+
+
+def report(selected, status, durations, deps, wall):
+    print("\n🧾 --- PIPELINE SUMMARY ---")
+    for stage in selected:
+        seconds = f"{durations[stage.name]:7.1f}s" if stage.name in durations else "       -"
+        print(f"  {stage.name:<22} {status[stage.name]:<8} {seconds}")
+    path, length = critical_path(selected, deps, durations)
+    print(f"⏱️ Wall time {wall:.1f}s; stage time {sum(durations.values()):.1f}s")
+    print("🛤️ Critical path: " + " → ".join(f"{s.name} ({durations.get(s.name, 0.0):.1f}s)" for s in path)
+          + f" = {length:.1f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run pipeline stages in dependency order.")
+    parser.add_argument("stages", nargs="*", help=f"Stages to run (default: all but opt-in). Known: {', '.join(STAGES_BY_NAME)}")
+    parser.add_argument("--jobs", type=int, default=MAX_JOBS, help="Stages run at the same time")
+    parser.add_argument("--force", action="store_true", help="Run offline stages even if their inputs are unchanged")
+    parser.add_argument("--profile", action="store_true", help="Profile every stage (.cache/profile/)")
+    parser.add_argument("--fill-gaps", action="store_true",
+                        help="Network stages fetch only the endpoints listed in store/gaps/, the rest from cache")
+    parser.add_argument("--offline", action="store_true",
+                        help="Network stages read the raw archive (.cache/archive/) instead of Sleeper")
+    args = parser.parse_args()
+
+    names = set(args.stages) - {"all"}
+    unknown = names - set(STAGES_BY_NAME)
+    if unknown:
+        parser.error(f"unknown stage(s): {', '.join(sorted(unknown))}")
+    selected = [s for s in STAGES if (s.name in names if names else s.default)]
+
+    started = time.monotonic()
+    status, durations, deps = run(selected, args.jobs, args.force, args.profile, args.fill_gaps, args.offline)
+    report(selected, status, durations, deps, time.monotonic() - started)
+    sys.exit(1 if any(s in ("failed", "blocked") for s in status.values()) else 0)
+
+
+if __name__ == "__main__":
+    main()
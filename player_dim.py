@@ -0,0 +1,188 @@
+"""Historical player dimension: every player ever seen, with effective dates.
+
+players.py only exports players currently on an NFL team, so starters
+from past seasons who are now free agents or retired used to get an empty
+Scores label. The dimension keeps every player at the positions we track,
+keyed by player_id, with one row per version of (name, position, team):
+
+    player_id, first_name, last_name, position, team, status,
+    valid_from, valid_to, is_current
+
+A team or position change closes the current row (``valid_to``) and opens
+a new one (type-2 history); ``status`` is only updated in place. Players
+that disappear from the feed keep their last row open. Dates are ISO
+``YYYY-MM-DD``; rows known from before tracking started (seeded from the
+labels already in Scores) begin at ``BEGINNING``.
+
+It is stored as zstd Parquet in store/players/ (CSV without pyarrow) and
+``PlayerLabels`` turns it into the label a player had in a given season.
+"""
+import os
+import re
+
+import pandas as pd
+
+from locks import atomic_open
+from schema import HAVE_PARQUET, coerce, columns, empty, read_table
+
+# -------------------------
+# CONFIG
+# -------------------------
+TABLE = "PlayerDimension"
+DIM_PATH = "store/players/dimension.parquet" if HAVE_PARQUET else "store/players/dimension.csv"
+PLAYERS_FILE = "data/Players.csv"
+CHANGES_FILE = "store/players/changes.csv"
+SCORES_FILE = "data/Scores.csv"
+BEGINNING = "1970-01-01"
+TRACKED = ["first_name", "last_name", "position", "team"]  # a change opens a new version
+
+LABEL_RE = re.compile(r"^(?P<first_name>\S+) (?P<last_name>.+), (?P<position>[^,()]+) \((?P<team>[^()]*)\)$")
+
+
+def season_date(season):
+    """Reference date for labels of ``season`` (end of its fantasy playoffs)."""
+    return f"{int(season) + 1}-01-31"
+
+
+def label(df):
+    """Series of "First Last, POS (TEAM)" labels; free agents show as FA."""
+    text = {col: df[col].astype("string").fillna("") for col in TRACKED}
+    team = text["team"].mask(text["team"] == "", "FA")
+    return text["first_name"] + " " + text["last_name"] + ", " + text["position"] + " (" + team + ")"
+
+
+# -------------------------
+# LOAD / SAVE
+# -------------------------
+def load_dimension(path=DIM_PATH):
+    """The stored dimension, or an empty one."""
+    if not os.path.exists(path):
+        return empty(TABLE)
+    if path.endswith(".parquet"):
+        return coerce(pd.read_parquet(path), TABLE)
+    return read_table(TABLE, path)
+
+
+def save_dimension(dim, path=DIM_PATH):
+    dim = coerce(dim.sort_values(["player_id", "valid_from"]).reset_index(drop=True)[columns(TABLE)], TABLE)
+    if path.endswith(".parquet"):
+        with atomic_open(path, "wb") as f:
+            dim.to_parquet(f, compression="zstd", index=False)
+    else:
+        with atomic_open(path, newline="", encoding="utf-8") as f:
+            dim.to_csv(f, index=False)
+    return dim
+
+
+# -------------------------
+# TYPE-2 UPDATE
+# -------------------------
+def apply_snapshot(dim, snapshot, as_of):
+    """Merge one day's view of (some) players into the dimension.
+
+    New players get a row from ``as_of``; players whose tracked attributes
+    changed get their current row closed and a new one opened (a row that
+    only opened on ``as_of`` is replaced instead: versions are per day);
+    everyone else only has ``status`` refreshed. Players missing from
+    ``snapshot`` are left as they are.
+    """
+    snapshot = coerce(snapshot.drop_duplicates("player_id", keep="last"), "Players")
+    current = dim[dim["is_current"].fillna(False).astype(bool)]
+    merged = snapshot.merge(current, on="player_id", how="left", suffixes=("", "_cur"), indicator=True)
+
+    differs = pd.Series(False, index=merged.index)
+    for col in TRACKED:
+        old, new = merged[f"{col}_cur"].astype("string"), merged[col].astype("string")
+        differs |= ~((old == new).fillna(False) | (old.isna() & new.isna()))
+    opened = (merged["_merge"] == "left_only") | differs
+
+    status = snapshot.set_index("player_id")["status"].astype("string")
+    dim = dim.copy()
+    is_current = dim["is_current"].fillna(False).astype(bool)
+    in_snapshot = is_current & dim["player_id"].isin(status.index)
+    dim["status"] = dim["status"].astype("string")
+    dim.loc[in_snapshot, "status"] = dim.loc[in_snapshot, "player_id"].map(status)
+    closing = is_current & dim["player_id"].isin(merged.loc[opened, "player_id"])
+    dim.loc[closing, "valid_to"] = as_of
+    dim.loc[closing, "is_current"] = False
+    dim = dim[~(closing & (dim["valid_from"] == as_of))]
+
+    new_rows = merged.loc[opened, columns("Players")].assign(valid_from=as_of, valid_to=pd.NA, is_current=True)
+    if new_rows.empty:
+        return coerce(dim, TABLE)
+    return coerce(pd.concat([dim, coerce(new_rows, TABLE)], ignore_index=True), TABLE)
+
+
+def update_dimension(snapshot, as_of, path=DIM_PATH):
+    """Apply today's players feed to the stored dimension (seeding it first if missing)."""
+    dim = load_dimension(path) if os.path.exists(path) else seed_dimension()
+    before = len(dim)
+    dim = save_dimension(apply_snapshot(dim, snapshot, as_of), path)
+    print(f"🧬 Player dimension: {dim['player_id'].nunique()} players, {len(dim) - before} new versions → {path}")
+    return dim
+
+
+# -------------------------
+# SEEDING
+# -------------------------
+def labels_from_scores(scores_file=SCORES_FILE):
+    """Last label each starter had in Scores, split back into columns (players since dropped)."""
+    if not os.path.exists(scores_file):
+        return empty("Players")
+    scores = read_table("Scores", scores_file)[["LeagueYear", "starter", "label"]]
+    scores = scores[scores["label"].fillna("") != ""].sort_values("LeagueYear", kind="stable")
+    scores = scores.drop_duplicates("starter", keep="last")
+    parts = scores["label"].str.extract(LABEL_RE)
+    parts["player_id"] = scores["starter"].values
+    parts = parts.dropna(subset=["first_name"])
+    parts["team"] = parts["team"].mask(parts["team"].isin(["", "FA"]))
+    parts["status"] = pd.NA
+    return coerce(parts[columns("Players")].reset_index(drop=True), "Players")
+
+
+def seed_dimension(players_file=PLAYERS_FILE, changes_file=CHANGES_FILE, scores_file=SCORES_FILE):
+    """First build: old Scores labels, then the players change log, then Players.csv.
+
+    The log's first day is the earliest state we know, so it starts at BEGINNING.
+    """
+    dim = apply_snapshot(empty(TABLE), labels_from_scores(scores_file), BEGINNING)
+    if os.path.exists(changes_file):
+        changes = read_table("PlayerChanges", changes_file)
+        changes.loc[changes["Change"] == "removed", "team"] = pd.NA  # dropped from Players.csv: no team
+        for i, (as_of, day) in enumerate(changes.groupby("AsOf", sort=True)):
+            dim = apply_snapshot(dim, day[columns("Players")], BEGINNING if i == 0 else as_of)
+    elif os.path.exists(players_file):
+        dim = apply_snapshot(dim, read_table("Players", players_file), BEGINNING)
+    print(f"🌱 Seeded player dimension with {dim['player_id'].nunique()} players")
+    return dim
+
+
+# -------------------------
+# LABELS
+# -------------------------
+class PlayerLabels:
+    """player_id -> "First Last, POS (TEAM)" as of a season, from the dimension.
+
+    Falls back to Players.csv (today's labels) until the dimension exists.
+    """
+
+    def __init__(self, players_file=PLAYERS_FILE, dim_path=DIM_PATH):
+        if os.path.exists(dim_path):
+            self.dim = load_dimension(dim_path)
+        else:
+            self.dim = apply_snapshot(empty(TABLE), read_table("Players", players_file), BEGINNING)
+        self.dim = self.dim.sort_values(["player_id", "valid_from"])
+        self._seasons = {}
+
+    def for_season(self, season=None):
+        """Labels in effect at the end of ``season`` (None: the current rows)."""
+        if season not in self._seasons:
+            dim = self.dim
+            if season is None:
+                rows = dim[dim["is_current"].fillna(False).astype(bool)]
+            else:
+                in_effect = dim[dim["valid_from"] <= season_date(season)].groupby("player_id").tail(1)
+                earliest = dim.groupby("player_id").head(1)  # tracked only after that season
+                rows = pd.concat([in_effect, earliest[~earliest["player_id"].isin(in_effect["player_id"])]])
+            self._seasons[season] = pd.Series(label(rows).values, index=rows["player_id"].astype(str)).to_dict()
+        return self._seasons[season]
@@ -1,47 +1,122 @@
-import requests
-import csv
+from profiling import mark
+import datetime
+import json
+import os
+import sys
+import pandas as pd
+from sleeper_client import open_payload
+from schema import coerce, columns, empty, read_table, write_table
+from player_dim import DIM_PATH, update_dimension
 
-# Define the URL for fetching NFL player data
-url = "https://api.sleeper.app/v1/players/nfl"
+try:
+    import ijson
+    HAVE_IJSON = True
+except ImportError:  # streaming is optional; without it the payload is parsed whole
+    HAVE_IJSON = False
 
-# Send a GET request to the API
-response = requests.get(url)
+# -------------------------
+# CONFIG
+# -------------------------
+# Define the endpoint for fetching NFL player data
+path = "/players/nfl"
+PLAYERS_FILE = "data/Players.csv"
+CHANGES_FILE = "store/players/changes.csv"   # append-only log of added/changed/removed players
+SOURCE_FILE = "store/players/source.json"    # sha256 of the last payload turned into Players.csv
 
-if response.status_code == 200:
-    # Parse the response JSON to get the list of players
-    player_data = response.json()
+# Define the positions you're interested in
+positions_of_interest = {'QB', 'RB', 'WR', 'TE', 'K', 'DEF', 'FB'}
 
-    # Define the positions you're interested in
-    positions_of_interest = {'QB', 'RB', 'WR', 'TE', 'K', 'DEF', 'FB'}
 
-    # Create a list to store filtered player data
-    filtered_players = []
+def iter_players(f):
+    """(player_id, info) pairs, read one player at a time when ijson is available."""
+    if HAVE_IJSON:
+        return ijson.kvitems(f, "", use_float=True)
+    return json.load(f).items()
 
-    for player_id, player_info in player_data.items():
-        if (
-            'team' in player_info and player_info['team'] is not None
-            and 'position' in player_info
-            and player_info['position'] in positions_of_interest
-        ):
+
+def player_changes(old_df, new_df, as_of):
+    """Rows of added, changed and removed players between two Players tables."""
+    merged = old_df.merge(new_df, on="player_id", how="outer", suffixes=("_old", ""), indicator=True)
+    fields = [c for c in columns("Players") if c != "player_id"]
+    differs = pd.Series(False, index=merged.index)
+    for col in fields:
+        old, new = merged[f"{col}_old"].astype("string"), merged[col].astype("string")
+        differs |= ~((old == new).fillna(False) | (old.isna() & new.isna()))
+
+    change = pd.Series(pd.NA, index=merged.index, dtype="object")
+    change[merged["_merge"] == "right_only"] = "added"
+    change[(merged["_merge"] == "both") & differs] = "changed"
+    change[merged["_merge"] == "left_only"] = "removed"
+    for col in fields:  # removed players keep their last known attributes
+        merged[col] = merged[col].astype("object").where(merged["_merge"] != "left_only", merged[f"{col}_old"].astype("object"))
+
+    merged["AsOf"], merged["Change"] = as_of, change
+    changes = merged[change.notna()].sort_values(["Change", "player_id"])
+    return coerce(changes[columns("PlayerChanges")].reset_index(drop=True), "PlayerChanges")
+
+
+def load_source():
+    try:
+        with open(SOURCE_FILE, encoding="utf-8") as f:
+            return json.load(f).get("sha256")
+    except (OSError, ValueError):
+        return None
+
+
+# Stream the payload from the shared (rate-limited, ETag-revalidated) client.
+# It changes daily and is several MB, so it is not kept in the raw archive:
+# its history lives in the change log and the player dimension instead.
+with open_payload(path, keep=False) as (payload, digest):
+    if payload is None:
+        print(f"❌ Error: Unable to fetch player data from {path}")
+        sys.exit(1)  # a failed stage: pipeline.py blocks the stages that read Players.csv
+
+    if digest == load_source() and os.path.exists(PLAYERS_FILE) and os.path.exists(DIM_PATH):
+        print("⏭️ Player payload unchanged since the last run — nothing to do")
+        raise SystemExit
+
+    mark("transform")
+    # Keep only players at the positions of interest while reading; free
+    # agents and retired players go to the player dimension only
+    seen_players = []
+    for player_id, player_info in iter_players(payload):
+        if player_info.get('position') in positions_of_interest:
             player_entry = {
                 'player_id': player_id,
                 'first_name': player_info.get('first_name', ''),
                 'last_name': player_info.get('last_name', ''),
                 'position': player_info.get('position', ''),
                 'status': player_info.get('status', ''),  # Player status (e.g., Active, Injured)
-                'team': player_info.get('team', '')
+                'team': player_info.get('team')
             }
-            filtered_players.append(player_entry)
-
-    # Always overwrite the same file in the repo
-    with open("data/Players.csv", "w", newline="", encoding="utf-8") as csv_file:
-        csv_writer = csv.DictWriter(
-            csv_file,
-            fieldnames=['player_id', 'first_name', 'last_name', 'position', 'status', 'team']
-        )
-        csv_writer.writeheader()
-        csv_writer.writerows(filtered_players)
-
-    print("✅ Player data has been exported to data/players.csv")
-else:
-    print(f"❌ Error: Unable to fetch player data. Status code: {response.status_code}")
+            seen_players.append(player_entry)
+
+seen_df = coerce(pd.DataFrame(seen_players, columns=columns("Players")), "Players")
+players_df = seen_df[seen_df["team"].notna()].reset_index(drop=True)
+
+as_of = datetime.datetime.now(datetime.timezone.utc).date().isoformat()
+
+# Every player ever seen, with team/position history (see player_dim.py);
+# a first build is seeded from the change log as it stood before today
+update_dimension(seen_df, as_of)
+
+# -------------------------
+# DELTA (added / changed / removed since the last Players.csv)
+# -------------------------
+# Before the log exists, every current player is logged as added
+old_df = read_table("Players", PLAYERS_FILE) if os.path.exists(CHANGES_FILE) else empty("Players")
+changes = player_changes(old_df, players_df, as_of)
+if len(changes):
+    os.makedirs(os.path.dirname(CHANGES_FILE), exist_ok=True)
+    changes.to_csv(CHANGES_FILE, mode="a", header=not os.path.exists(CHANGES_FILE), index=False)
+counts = changes["Change"].value_counts()
+print(f"🔁 Players delta: {counts.get('added', 0)} added, {counts.get('changed', 0)} changed, "
+      f"{counts.get('removed', 0)} removed → {CHANGES_FILE}")
+
+# Players.csv is only rewritten when its content changed (see delta.py)
+write_table(players_df, "Players", PLAYERS_FILE)
+os.makedirs(os.path.dirname(SOURCE_FILE), exist_ok=True)
+with open(SOURCE_FILE, "w", encoding="utf-8") as f:
+    json.dump({"sha256": digest, "as_of": as_of}, f)
+
+print(f"✅ Player data has been exported to {PLAYERS_FILE}")
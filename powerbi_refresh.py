@@ -0,0 +1,70 @@
+"""Queue a Power BI dataset refresh (service principal credentials from env).
+
+Same flow as the workflow's curl step: client-credentials token, then POST
+to the dataset's refreshes endpoint, waiting out 429s.
+"""
+import os
+import sys
+import time
+
+import requests
+
+# -------------------------
+# CONFIG
+# -------------------------
+MAX_RETRIES = 3
+RATE_LIMIT_WAIT = 120  # seconds
+ENV_VARS = ["TENANT_ID", "CLIENT_ID", "CLIENT_SECRET", "WORKSPACE_ID", "DATASET_ID"]
+
+
+def configured():
+    return all(os.environ.get(name) for name in ENV_VARS)
+
+
+def get_token(tenant_id, client_id, client_secret):
+    resp = requests.post(
+        f"https://login.microsoftonline.com/{tenant_id}/oauth2/v2.0/token",
+        data={
+            "grant_type": "client_credentials",
+            "client_id": client_id,
+            "client_secret": client_secret,
+            "scope": "https://analysis.windows.net/powerbi/api/.default",
+        },
+        timeout=30,
+    )
+    return resp.json().get("access_token")
+
+
+def trigger_refresh():
+    """Queue one dataset refresh. Returns True once Power BI accepts it."""
+    if not configured():
+        print("⚠️ Power BI credentials not set — skipping dataset refresh")
+        return False
+
+    env = {name: os.environ[name] for name in ENV_VARS}
+    print("🔐 Requesting Power BI access token...")
+    token = get_token(env["TENANT_ID"], env["CLIENT_ID"], env["CLIENT_SECRET"])
+    if not token:
+        print("❌ Failed to obtain Power BI access token")
+        return False
+
+    print("✅ Access token received — triggering dataset refresh...")
+    refresh_url = f"https://api.powerbi.com/v1.0/myorg/groups/{env['WORKSPACE_ID']}/datasets/{env['DATASET_ID']}/refreshes"
+    for attempt in range(1, MAX_RETRIES + 1):
+        resp = requests.post(refresh_url, json={}, headers={"Authorization": f"Bearer {token}"}, timeout=30)
+        print(f"Attempt {attempt}: HTTP {resp.status_code}")
+        if resp.status_code == 202:
+            print("🎉 Refresh successfully queued.")
+            return True
+        if resp.status_code == 429:
+            print(f"⏳ Rate-limited. Waiting {RATE_LIMIT_WAIT} seconds before retry...")
+            time.sleep(RATE_LIMIT_WAIT)
+            continue
+        print(f"⚠️ Unexpected status {resp.status_code}")
+        print(resp.text)
+        return False
+    return False
+
+
+if __name__ == "__main__":
+    sys.exit(0 if trigger_refresh() else 1)
@@ -0,0 +1,165 @@
+"""``--profile`` for every entry point: cProfile, tracemalloc and phase timings.
+
+Any script that imports this module (directly, or through sleeper_client /
+schema / scores_store) accepts ``--profile``; the flag is removed from
+sys.argv before the script's own argparse sees it. SLEEPER_PROFILE=1 does
+the same for scripts started by pipeline.py or benchmark.py. At exit the
+run leaves three files under .cache/profile/:
+
+    <script>-<stamp>.prof          cProfile stats (pstats / snakeviz)
+    <script>-<stamp>-alloc.txt     tracemalloc top allocations and peak
+    <script>-<stamp>-phases.json   wall time per phase
+
+Phases are load, fetch, transform, merge and write. The shared helpers
+declare their own (read_table is load, fetch_all is fetch, write_table is
+write, merge_scores is merge); flat scripts call ``mark("transform")``
+before their row-building loops, and functions use ``phase(...)`` as a
+decorator or ``with`` block. Time is charged to the innermost open phase,
+so nested phases are never counted twice; anything outside one is "other".
+"""
+import atexit
+import contextlib
+import cProfile
+import datetime
+import io
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+
+# -------------------------
+# CONFIG
+# -------------------------
+PROFILE_DIR = os.environ.get("SLEEPER_PROFILE_DIR", ".cache/profile")
+PHASES = ("load", "fetch", "transform", "merge", "write")
+TOP_FUNCTIONS = 25
+TOP_ALLOCATIONS = 25
+
+ENABLED = "--profile" in sys.argv or os.environ.get("SLEEPER_PROFILE", "").lower() in ("1", "on", "true", "yes")
+if "--profile" in sys.argv:
+    sys.argv = [arg for arg in sys.argv if arg != "--profile"]
+
+
+# -------------------------
+# PHASES
+# -------------------------
+_totals = {}
+_stack = []  # [name, started] of the open phases, innermost last
+_base = []   # [name, started] of the script-level phase set by mark()
+_started = time.perf_counter()
+
+
+def _charge(entry, now):
+    _totals[entry[0]] = _totals.get(entry[0], 0.0) + now - entry[1]
+    entry[1] = now
+
+
+def _current():
+    return _stack[-1] if _stack else (_base[0] if _base else None)
+
+
+def mark(name):
+    """Script-level phase from here until the next mark (``None`` ends it)."""
+    if threading.current_thread() is not threading.main_thread():
+        return
+    now = time.perf_counter()
+    if _base and not _stack:
+        _charge(_base[0], now)
+    _base[:] = [[name, now]] if name else []
+
+
+@contextlib.contextmanager
+def phase(name):
+    """Charge the wall time of the block to ``name`` (minus any nested phase)."""
+    if threading.current_thread() is not threading.main_thread():
+        yield
+        return
+    now = time.perf_counter()
+    outer = _current()
+    if outer:
+        _charge(outer, now)
+    _stack.append([name, now])
+    try:
+        yield
+    finally:
+        now = time.perf_counter()
+        _charge(_stack.pop(), now)
+        outer = _current()
+        if outer:
+            outer[1] = now
+
+
+def phase_times():
+    """Seconds per phase so far, with the unattributed remainder as "other"."""
+    now = time.perf_counter()
+    current = _current()
+    if current:
+        _charge(current, now)
+    elapsed = now - _started
+    times = {name: round(_totals.get(name, 0.0), 3) for name in PHASES}
+    times.update({name: round(t, 3) for name, t in _totals.items() if name not in times})
+    times["other"] = round(max(0.0, elapsed - sum(_totals.values())), 3)
+    times["total"] = round(elapsed, 3)
+    return times
+
+
+# -------------------------
+# PROFILER
+# -------------------------
+_profiler = None
+
+
+def start():
+    global _profiler
+    if _profiler is not None:
+        return
+    tracemalloc.start()
+    _profiler = cProfile.Profile()
+    _profiler.enable()
+    atexit.register(_write_at_exit)
+
+
+def _write_at_exit():
+    _profiler.disable()
+    snapshot = tracemalloc.take_snapshot()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    name = os.path.splitext(os.path.basename(sys.argv[0]))[0].lstrip("-") or "python"
+    stamp = datetime.datetime.now().strftime("%Y%m%dT%H%M%S")
+    base = os.path.join(PROFILE_DIR, f"{name}-{stamp}")
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+
+    _profiler.dump_stats(base + ".prof")
+
+    snapshot = snapshot.filter_traces([tracemalloc.Filter(False, tracemalloc.__file__)])
+    top = snapshot.statistics("lineno")[:TOP_ALLOCATIONS]
+    with open(base + "-alloc.txt", "w", encoding="utf-8") as f:
+        f.write(f"peak {peak / 2**20:.1f} MiB, at exit {current / 2**20:.1f} MiB\n\n")
+        for stat in top:
+            f.write(f"{stat.size / 2**20:9.2f} MiB {stat.count:9d} blocks  {stat.traceback}\n")
+
+    times = phase_times()
+    with open(base + "-phases.json", "w", encoding="utf-8") as f:
+        json.dump({"script": name, "argv": sys.argv[1:], "peak_mib": round(peak / 2**20, 1), "phases": times}, f, indent=1)
+
+    print(f"\n🔬 --- PROFILE ({name}) ---")
+    for phase_name, seconds in times.items():
+        if phase_name != "total" and seconds:
+            print(f"  {phase_name:<10} {seconds:8.2f}s {seconds / times['total']:6.1%}")
+    print(f"  {'total':<10} {times['total']:8.2f}s   peak traced memory {peak / 2**20:.1f} MiB")
+
+    out = io.StringIO()
+    pstats.Stats(_profiler, stream=out).sort_stats("cumulative").print_stats(TOP_FUNCTIONS)
+    print("\n".join(out.getvalue().splitlines()[-TOP_FUNCTIONS - 2:]))
+    print("  top allocations:")
+    for stat in top[:5]:
+        print(f"  {stat.size / 2**20:8.2f} MiB  {stat.traceback}")
+    print(f"💾 Profile written to {base}.prof, {base}-alloc.txt, {base}-phases.json")
+
+
+if ENABLED:
+    start()
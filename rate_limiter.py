@@ -0,0 +1,136 @@
+"""Adaptive token-bucket rate limiter shared by every Sleeper fetch.
+
+Each request takes one token; tokens refill at ``rate`` per second up to
+``burst``. When the API pushes back (429 or 5xx) the rate is halved and,
+if the response carries ``Retry-After``, the whole bucket pauses for that
+long. Every successful response then nudges the rate back up towards the
+configured ceiling (additive increase, multiplicative decrease), so a run
+goes as fast as Sleeper allows without hammering it during Sunday peaks.
+
+When pipeline.py runs stages in parallel it sets SLEEPER_RATE_STATE, and
+every stage's ``SharedTokenBucket`` draws from one bucket kept in that
+file: together they stay under the ceiling, and a stage left running on
+its own gets the whole budget back.
+"""
+import contextlib
+import json
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+from locks import atomic_open, locked
+
+# -------------------------
+# CONFIG
+# -------------------------
+RATE = float(os.environ.get("SLEEPER_RATE", "12"))     # requests per second (ceiling)
+BURST = int(os.environ.get("SLEEPER_BURST", "20"))     # tokens available at once
+MIN_RATE = 0.5                                         # floor after repeated backoffs
+RECOVERY = 0.1                                         # req/s regained per successful response
+SHARED_STATE = os.environ.get("SLEEPER_RATE_STATE")   # bucket file shared by parallel stages
+
+
+def parse_retry_after(value):
+    """Seconds to wait from a ``Retry-After`` header (delta-seconds or HTTP date)."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+class AdaptiveTokenBucket:
+    def __init__(self, rate=RATE, burst=BURST, min_rate=MIN_RATE, recovery=RECOVERY):
+        self.max_rate = rate
+        self.rate = rate
+        self.burst = burst
+        self.min_rate = min_rate
+        self.recovery = recovery
+
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = threading.Lock()
+
+        self.throttled_seconds = 0.0
+        self.backoffs = 0
+
+    def _state(self):
+        """Guard for reading and changing the bucket (tokens, rate, pause)."""
+        return self._lock
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + max(0.0, now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self):
+        """Block until a token is available; returns the seconds spent waiting."""
+        with self._state():
+            now = time.monotonic()
+            self._refill(now)
+            self.tokens -= 1  # reserve now; a negative balance is paid off by waiting
+            wait = max(self.paused_until - now, -self.tokens / self.rate if self.tokens < 0 else 0.0)
+            self.throttled_seconds += wait
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def on_response(self, status, retry_after=None):
+        """Adapt the rate to a response status (and its ``Retry-After`` header)."""
+        with self._state():
+            now = time.monotonic()
+            if status == 429 or status >= 500:
+                self._refill(now)
+                self.rate = max(self.min_rate, self.rate / 2)
+                self.backoffs += 1
+                delay = parse_retry_after(retry_after)
+                if delay:
+                    self.paused_until = max(self.paused_until, now + delay)
+                    self.tokens = min(self.tokens, 0.0)
+            elif self.rate < self.max_rate:
+                self._refill(now)
+                self.rate = min(self.max_rate, self.rate + self.recovery)
+
+    def summary(self):
+        return (f"throttled {self.throttled_seconds:.1f}s across workers, {self.backoffs} backoffs, "
+                f"rate {self.rate:.1f}/{self.max_rate:.1f} req/s")
+
+
+class SharedTokenBucket(AdaptiveTokenBucket):
+    """``AdaptiveTokenBucket`` whose tokens, rate and pause live in a file shared by processes.
+
+    Every acquire / response loads the state under a file lock, updates it
+    and writes it back (time.monotonic is system-wide, so timestamps agree
+    across processes). Throttle and backoff counts stay per process.
+    """
+    SHARED = ("tokens", "updated", "rate", "paused_until")
+
+    def __init__(self, state_path, **kwargs):
+        super().__init__(**kwargs)
+        self.state_path = state_path
+
+    @contextlib.contextmanager
+    def _state(self):
+        with self._lock, locked(self.state_path):
+            try:
+                with open(self.state_path, encoding="utf-8") as f:
+                    state = json.load(f)
+                for key in self.SHARED:
+                    setattr(self, key, float(state[key]))
+            except (OSError, ValueError, KeyError):
+                pass  # first stage in: start from a full bucket
+            yield
+            with atomic_open(self.state_path, encoding="utf-8") as f:
+                json.dump({key: getattr(self, key) for key in self.SHARED}, f)
+
+
+def make_limiter():
+    """The shared bucket when running under pipeline.py, else a per-process one."""
+    return SharedTokenBucket(SHARED_STATE) if SHARED_STATE else AdaptiveTokenBucket()
@@ -0,0 +1,231 @@
+"""Local stand-in for api.sleeper.app and the ESPN scoreboard.
+
+Serves recorded JSON fixtures so every fetch script can run offline and
+deterministically:
+
+    fixtures/sleeper/<path>.json   <- GET /v1/<path>   (SLEEPER_BASE_URL=http://127.0.0.1:8799/v1)
+    fixtures/espn/apis/<path>.json <- GET /apis/<path> (ESPN_BASE_URL=http://127.0.0.1:8799)
+
+e.g. ``/v1/league/123/matchups/4`` -> fixtures/sleeper/league/123/matchups/4.json.
+Responses carry an ETag and honour If-None-Match. Latency, rate limiting
+(429 + Retry-After) and 5xx error injection are configurable, and with
+``--record`` a missing fixture is fetched from the real API and saved.
+``GET /__stats`` returns request/byte counters (``?reset=1`` zeroes them).
+Point SLEEPER_CACHE_DIR somewhere else (or set SLEEPER_CACHE=0) while
+replaying so responses cached from the real API are not served instead.
+
+    python replay_server.py --fixtures fixtures --latency-ms 40 --rate 10 --error-rate 0.01
+"""
+import argparse
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import requests
+
+# -------------------------
+# CONFIG
+# -------------------------
+FIXTURES_DIR = "fixtures"
+PORT = 8799
+UPSTREAMS = {
+    "sleeper": ("/v1/", "https://api.sleeper.app/v1/"),
+    "espn": ("/apis/", "https://site.api.espn.com/apis/"),
+}
+
+
+class ReplayConfig:
+    def __init__(self, fixtures_dir=FIXTURES_DIR, latency_ms=0.0, jitter_ms=0.0, rate=0.0, burst=10,
+                 error_rate=0.0, record=False, seed=0):
+        self.fixtures_dir = fixtures_dir
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.rate = rate              # requests/second before 429s; 0 = unlimited
+        self.burst = burst
+        self.error_rate = error_rate  # fraction of requests answered with a 5xx
+        self.record = record
+        self.random = random.Random(seed)
+
+
+# -------------------------
+# SERVER STATE
+# -------------------------
+class ReplayState:
+    """Counters plus the token bucket that decides when to answer 429."""
+
+    def __init__(self, config):
+        self.config = config
+        self.lock = threading.Lock()
+        self.tokens = float(config.burst)
+        self.updated = time.monotonic()
+        self.reset()
+
+    def reset(self):
+        self.stats = {"requests": 0, "bytes": 0, "not_modified": 0, "throttled": 0, "errors": 0, "missing": 0}
+
+    def count(self, key, n=1):
+        with self.lock:
+            self.stats[key] += n
+
+    def take_token(self):
+        """False (with seconds to wait) when the simulated rate limit is exceeded."""
+        if not self.config.rate:
+            return True, 0.0
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.config.burst, self.tokens + (now - self.updated) * self.config.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True, 0.0
+            return False, (1 - self.tokens) / self.config.rate
+
+    def inject_error(self):
+        with self.lock:
+            return self.config.error_rate and self.config.random.random() < self.config.error_rate
+
+    def delay(self):
+        with self.lock:
+            jitter = self.config.random.uniform(-self.config.jitter_ms, self.config.jitter_ms)
+        return max(0.0, self.config.latency_ms + jitter) / 1000
+
+
+# -------------------------
+# FIXTURES
+# -------------------------
+def fixture_path(fixtures_dir, url_path):
+    """(source, file) for a request path, or (None, None) if it is not an API path."""
+    for source, (prefix, _) in UPSTREAMS.items():
+        if url_path.startswith(prefix):
+            rel = url_path[len(prefix):].strip("/")
+            if source == "espn":
+                rel = "apis/" + rel
+            return source, os.path.join(fixtures_dir, source, *rel.split("/")) + ".json"
+    return None, None
+
+
+def record_fixture(source, url_path, path):
+    prefix, upstream = UPSTREAMS[source]
+    resp = requests.get(upstream + url_path[len(prefix):].lstrip("/"), timeout=30)
+    if resp.status_code != 200:
+        return None
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(resp.content)
+    print(f"📼 recorded {url_path}")
+    return resp.content
+
+
+# -------------------------
+# HANDLER
+# -------------------------
+class ReplayHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real APIs
+    state = None                   # set by make_server
+
+    def log_message(self, *args):
+        pass
+
+    def send_json(self, status, body=b"", headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+        self.state.count("bytes", len(body))
+
+    def do_GET(self):
+        state = self.state
+        url = urlsplit(self.path)
+        if url.path == "/__stats":
+            if parse_qs(url.query).get("reset"):
+                state.reset()
+            return self.send_json(200, json.dumps(state.stats).encode())
+
+        state.count("requests")
+        time.sleep(state.delay())
+
+        allowed, wait = state.take_token()
+        if not allowed:
+            state.count("throttled")
+            return self.send_json(429, b'{"message":"Too Many Requests"}', {"Retry-After": f"{max(1, round(wait))}"})
+        if state.inject_error():
+            state.count("errors")
+            return self.send_json(503, b'{"message":"Service Unavailable"}')
+
+        source, path = fixture_path(state.config.fixtures_dir, url.path)
+        body = None
+        if path and os.path.exists(path):
+            with open(path, "rb") as f:
+                body = f.read()
+        elif path and state.config.record:
+            body = record_fixture(source, url.path, path)
+        if body is None:
+            state.count("missing")
+            return self.send_json(404, b'{"message":"Not Found"}')
+
+        etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+        if self.headers.get("If-None-Match") == etag:
+            state.count("not_modified")
+            return self.send_json(304, headers={"ETag": etag})
+        self.send_json(200, body, {"ETag": etag})
+
+
+# -------------------------
+# ENTRY POINTS
+# -------------------------
+def make_server(config, host="127.0.0.1", port=PORT):
+    handler = type("BoundReplayHandler", (ReplayHandler,), {"state": ReplayState(config)})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def start_server(config, host="127.0.0.1", port=0):
+    """Serve in a background thread; returns (server, base_url). ``port=0`` picks a free port."""
+    server = make_server(config, host, port)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+def fetch_stats(base_url, reset=False):
+    resp = requests.get(f"{base_url}/__stats" + ("?reset=1" if reset else ""), timeout=5)
+    return resp.json()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded Sleeper/ESPN responses locally.")
+    parser.add_argument("--fixtures", default=FIXTURES_DIR, help="Fixture root (sleeper/ and espn/ inside)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Added to every response")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="± uniform jitter on the latency")
+    parser.add_argument("--rate", type=float, default=0.0, help="Requests/second before 429s (0 = unlimited)")
+    parser.add_argument("--burst", type=int, default=10, help="Token bucket size for --rate")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with 503")
+    parser.add_argument("--record", action="store_true", help="Fetch and save fixtures that are missing")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for jitter and error injection")
+    args = parser.parse_args()
+
+    config = ReplayConfig(args.fixtures, args.latency_ms, args.jitter_ms, args.rate, args.burst,
+                          args.error_rate, args.record, args.seed)
+    server = make_server(config, args.host, args.port)
+    base = f"http://{args.host}:{server.server_address[1]}"
+    print(f"📼 Replaying {args.fixtures} on {base}")
+    print(f"   SLEEPER_BASE_URL={base}/v1  ESPN_BASE_URL={base}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
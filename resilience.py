@@ -0,0 +1,159 @@
+"""Retry backoff, circuit breaker and the persisted gap list for Sleeper fetches.
+
+* ``backoff_delay`` — exponential backoff with full jitter between retries
+  of a 429/5xx/connection failure, so concurrent workers do not retry in
+  lockstep.
+* ``CircuitBreaker`` — after ``threshold`` consecutive calls fail even
+  after their retries, the circuit opens and further calls fail fast
+  (no request sent) for ``cooldown`` seconds. Then a single trial call is
+  let through: success closes the circuit, failure reopens it for twice
+  as long (up to ``max_cooldown``).
+* ``GapLog`` — endpoints that still failed with a transient error are kept
+  in store/gaps/<script>.json until a later run fetches them successfully.
+  ``--fill-gaps`` runs fetch only those and take everything else from the
+  response cache.
+"""
+import datetime
+import json
+import os
+import random
+import sys
+import threading
+import time
+
+from instrumentation import endpoint
+
+# -------------------------
+# CONFIG
+# -------------------------
+BACKOFF_BASE = float(os.environ.get("SLEEPER_BACKOFF_BASE", "0.5"))   # seconds before the first retry (mean)
+BACKOFF_MAX = float(os.environ.get("SLEEPER_BACKOFF_MAX", "30"))      # cap on a single wait
+BREAKER_THRESHOLD = int(os.environ.get("SLEEPER_BREAKER_THRESHOLD", "8"))
+BREAKER_COOLDOWN = float(os.environ.get("SLEEPER_BREAKER_COOLDOWN", "30"))
+BREAKER_MAX_COOLDOWN = 300.0
+GAP_DIR = os.environ.get("SLEEPER_GAP_DIR", "store/gaps")
+
+
+def is_transient(status):
+    """True for failures worth retrying (and re-pulling later): no response, 429 or 5xx."""
+    return status is None or status == 429 or status >= 500
+
+
+def backoff_delay(attempt, base=BACKOFF_BASE, cap=BACKOFF_MAX):
+    """Seconds to wait before retry number ``attempt`` (1, 2, ...): full jitter."""
+    return random.uniform(0, min(cap, 2 * base * 2 ** (attempt - 1)))
+
+
+# -------------------------
+# CIRCUIT BREAKER
+# -------------------------
+class CircuitOpenError(Exception):
+    """Raised instead of sending a request while the circuit is open."""
+
+
+class CircuitBreaker:
+    def __init__(self, threshold=BREAKER_THRESHOLD, cooldown=BREAKER_COOLDOWN, max_cooldown=BREAKER_MAX_COOLDOWN):
+        self.threshold = threshold
+        self.base_cooldown = cooldown
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+
+        self.failures = 0          # consecutive failed calls
+        self.opened_at = None      # monotonic time the circuit opened, None when closed
+        self.trial = False         # a half-open trial call is in flight
+        self.opens = 0
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        return "half-open" if self.trial else "open"
+
+    def check(self):
+        """Return if a call may go ahead; raise CircuitOpenError if not."""
+        with self._lock:
+            if self.opened_at is None:
+                return
+            remaining = self.opened_at + self.cooldown - time.monotonic()
+            if remaining <= 0 and not self.trial:
+                self.trial = True  # half-open: this call is the probe
+                return
+            raise CircuitOpenError(f"circuit open for another {max(0.0, remaining):.0f}s "
+                                   f"after {self.failures} consecutive failures")
+
+    def record(self, ok):
+        """Outcome of a call that was allowed through."""
+        with self._lock:
+            if ok:
+                if self.opened_at is not None:
+                    print("🔌 Sleeper is answering again — circuit closed")
+                self.failures = 0
+                self.opened_at = None
+                self.trial = False
+                self.cooldown = self.base_cooldown
+                return
+            self.failures += 1
+            if self.trial:
+                self.cooldown = min(self.max_cooldown, self.cooldown * 2)
+                self._open()
+            elif self.opened_at is None and self.failures >= self.threshold:
+                self._open()
+
+    def _open(self):
+        self.opened_at = time.monotonic()
+        self.trial = False
+        self.opens += 1
+        print(f"⛔ {self.failures} consecutive Sleeper failures — circuit open for {self.cooldown:.0f}s")
+
+    def summary(self):
+        return f"circuit {self.state}, opened {self.opens}x"
+
+
+# -------------------------
+# GAPS
+# -------------------------
+class GapLog:
+    """Endpoints of one script that failed transiently and still need fetching."""
+
+    def __init__(self, name=None, gap_dir=GAP_DIR):
+        name = name or os.path.splitext(os.path.basename(sys.argv[0]))[0].lstrip("-") or "python"
+        self.path = os.path.join(gap_dir, f"{name}.json")
+        self.entries = self.load()
+
+    def load(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def save(self):
+        if not self.entries:
+            if os.path.exists(self.path):
+                os.remove(self.path)
+            return
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump(self.entries, f, indent=1, sort_keys=True)
+
+    def paths(self):
+        return set(self.entries)
+
+    def update(self, calls):
+        """Add transient failures and drop endpoints that now succeeded (or failed for good)."""
+        now = datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds")
+        before = dict(self.entries)
+        for call in calls:
+            path = call["path"]
+            if call["error"] and is_transient(call["status"]):
+                template, league_id, week = endpoint(path)
+                entry = self.entries.get(path, {"first_failed": now, "runs": 0})
+                entry.update(endpoint=template, league_id=league_id, week=week, status=call["status"],
+                             error=call["error"], last_failed=now, runs=entry["runs"] + 1)
+                self.entries[path] = entry
+            else:
+                self.entries.pop(path, None)
+        if self.entries != before:
+            self.save()
+        return len(before.keys() - self.entries.keys())
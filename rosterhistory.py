@@ -1,11 +1,21 @@
+from profiling import mark
 import pandas as pd
-from sleeper_wrapper import League
+from sleeper_client import fetch_all
+from schema import read_table, write_table
 
 # Load league IDs
-league_df = pd.read_csv("data/LeagueIDs_AllYears.csv")
+league_df = read_table("LeagueIDs_AllYears")
 
 all_players = []
 
+# Fetch rosters and users for every league in one fan-out
+responses = fetch_all(
+    path
+    for league_id in league_df['LeagueID']
+    for path in (f"/league/{league_id}/rosters", f"/league/{league_id}/users")
+)
+
+mark("transform")
 for idx, row in league_df.iterrows():
     league_id = row['LeagueID']
     year = row['Year']
@@ -13,13 +23,10 @@ for idx, row in league_df.iterrows():
 
     print(f"Processing {league_name} ({year})")
 
-    league_api = League(league_id)
-
-    try:
-        rosters = league_api.get_rosters()
-        users = league_api.get_users()
-    except Exception as e:
-        print(f"  ERROR fetching rosters/users for {league_id}: {e}")
+    rosters = responses[f"/league/{league_id}/rosters"]
+    users = responses[f"/league/{league_id}/users"]
+    if rosters is None or users is None:
+        print(f"  ERROR fetching rosters/users for {league_id}")
         continue
 
     # Map user_id -> display_name
@@ -47,5 +54,5 @@ df = pd.DataFrame(all_players)
 
 # Save CSV
 out_file = "data/Rosters_Players_AllYears.csv"
-df.to_csv(out_file, index=False)
+df = write_table(df, "Rosters_Players_AllYears", out_file)
 print(f"Saved {len(df)} player rows to {out_file}")
@@ -1,9 +1,11 @@
+from profiling import mark
 import pandas as pd
-from sleeper_wrapper import League
 from datetime import datetime
+from sleeper_client import fetch_all
+from schema import read_table, write_table
 
 # --- Load league IDs ---
-league_df = pd.read_csv("data/LeagueIDs_AllYears.csv")
+league_df = read_table("LeagueIDs_AllYears")
 
 # --- Detect current year (or hardcode if needed) ---
 current_year = datetime.now().year
@@ -12,9 +14,10 @@ current_year = datetime.now().year
 current_leagues = league_df[league_df['Year'] == current_year]
 
 # --- Load player data for enrichment ---
-players_df = pd.read_csv("data/Players.csv")
+players_df = read_table("Players")
 
 # Create lookup dictionary for quick reference
+mark("transform")
 player_lookup = {
     str(row["player_id"]): {
         "FullName": f"{row.get('first_name', '')} {row.get('last_name', '')}".strip(),
@@ -26,20 +29,24 @@ player_lookup = {
 
 all_players = []
 
-# --- Loop through current leagues and fetch rosters ---
+# --- Fetch rosters and users for every current league in one fan-out ---
+responses = fetch_all(
+    path
+    for league_id in current_leagues["LeagueID"]
+    for path in (f"/league/{league_id}/rosters", f"/league/{league_id}/users")
+)
+
+# --- Loop through current leagues and build roster rows ---
 for idx, row in current_leagues.iterrows():
     league_id = row["LeagueID"]
     league_name = row["LeagueName"]
 
     print(f"Processing current roster for {league_name}")
 
-    league_api = League(league_id)
-
-    try:
-        rosters = league_api.get_rosters()
-        users = league_api.get_users()
-    except Exception as e:
-        print(f"  ERROR fetching rosters/users for {league_id}: {e}")
+    rosters = responses[f"/league/{league_id}/rosters"]
+    users = responses[f"/league/{league_id}/users"]
+    if rosters is None or users is None:
+        print(f"  ERROR fetching rosters/users for {league_id}")
         continue
 
     # Map user_id -> display_name
@@ -76,5 +83,5 @@ df = pd.DataFrame(all_players)
 
 # --- Save CSV ---
 out_file = "data/Rosters_Current.csv"
-df.to_csv(out_file, index=False)
+df = write_table(df, "Rosters_Current", out_file)
 print(f"✅ Saved {len(df)} player rows (with player details) to {out_file}")
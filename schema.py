@@ -0,0 +1,284 @@
+"""Canonical column types for every table the pipeline reads and writes.
+
+Every stage reads its inputs with ``read_table`` and writes its outputs with
+``write_table``, so IDs are always native int64 (Sleeper snowflakes fit),
+weeks/indexes are small ints, points are floats and repeated names are
+categoricals. Keys therefore never round-trip through ``"123.0"`` strings,
+and dedupes/merges compare integers instead of regex-cleaned text.
+
+The large tables are also written as zstd-compressed Parquet datasets
+partitioned by year under data/parquet/<Table>/ (when pyarrow is
+installed), and ``read_table`` prefers those over re-parsing the CSV.
+``write_table`` skips tables whose content did not change (see delta.py).
+"""
+import os
+import shutil
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as pa_dataset
+    HAVE_PARQUET = True
+except ImportError:  # Parquet output is optional; CSV is always written
+    HAVE_PARQUET = False
+
+import delta
+from hooks import run_post_write
+from profiling import phase
+
+# -------------------------
+# CONFIG
+# -------------------------
+DATA_DIR = "data"
+PARQUET_DIR = os.path.join(DATA_DIR, "parquet")
+
+# -------------------------
+# COLUMN TYPES
+# -------------------------
+ID = "Int64"          # Sleeper snowflake IDs (league, owner, draft, transaction)
+YEAR = "Int16"
+SMALL = "Int8"        # weeks, array indexes, rounds, divisions
+COUNT = "Int32"       # roster ids, picks, wins/losses, integer point totals
+POINTS = "float64"
+NAME = "category"     # league/owner/team names and other low-cardinality text
+TEXT = "string"       # free text and player ids (team DEF ids are not numeric)
+FLAG = "boolean"
+
+TABLES = {
+    "LeagueIDs_AllYears": {
+        "Year": YEAR, "LeagueID": ID, "LeagueName": NAME,
+        "Division1": NAME, "Division2": NAME, "Status": NAME,
+    },
+    "Players": {
+        "player_id": TEXT, "first_name": TEXT, "last_name": TEXT,
+        "position": NAME, "status": NAME, "team": NAME,
+    },
+    "PlayerChanges": {
+        "AsOf": TEXT, "Change": NAME, "player_id": TEXT, "first_name": TEXT,
+        "last_name": TEXT, "position": NAME, "status": NAME, "team": NAME,
+    },
+    "PlayerDimension": {
+        "player_id": TEXT, "first_name": TEXT, "last_name": TEXT, "position": NAME,
+        "team": NAME, "status": NAME, "valid_from": TEXT, "valid_to": TEXT, "is_current": FLAG,
+    },
+    "Rosters_Current": {
+        "Year": YEAR, "LeagueID": ID, "LeagueName": NAME, "RosterID": COUNT,
+        "OwnerID": ID, "OwnerName": NAME, "PlayerID": TEXT,
+        "FullName": TEXT, "Position": NAME, "Team": NAME,
+    },
+    "Rosters_Players_AllYears": {
+        "Year": YEAR, "LeagueID": ID, "LeagueName": NAME, "RosterID": COUNT,
+        "OwnerID": ID, "OwnerName": NAME, "PlayerID": TEXT,
+    },
+    "Users_AllYears": {
+        "Year": YEAR, "LeagueID": ID, "LeagueName": NAME, "RosterID": COUNT,
+        "OwnerID": ID, "OwnerName": NAME, "Division": SMALL, "DivisionName": NAME,
+        "Wins": COUNT, "Losses": COUNT, "PointsFor": COUNT, "PointsAgainst": COUNT,
+    },
+    "Matchups_AllYears": {
+        "Year": YEAR, "LeagueID": ID, "LeagueName": NAME, "Week": SMALL,
+        "RosterID": COUNT, "OwnerID": ID, "OwnerName": NAME,
+        "OpponentRosterID": COUNT, "OpponentName": NAME,
+        "PointsFor": POINTS, "PointsAgainst": POINTS, "Outcome": NAME,
+        "IsRegularSeason": FLAG, "StarterPoints": POINTS, "BenchPoints": POINTS,
+    },
+    "Scores": {
+        "LeagueYear": YEAR, "league_id": ID, "weekNum": SMALL, "roster_id": COUNT,
+        "lookupID": TEXT, "starter": TEXT, "starter_points": POINTS,
+        "array_index": SMALL, "label": TEXT,
+    },
+    "Transactions_AllYears": {
+        "Year": YEAR, "LeagueID": ID, "LeagueName": NAME, "Week": SMALL,
+        "TransactionID": ID, "Type": NAME, "Status": NAME, "Created": ID,
+    },
+    # Long tables keyed by TransactionID, one row per roster/add/drop/traded pick
+    "TransactionRosters_AllYears": {
+        "Year": YEAR, "TransactionID": ID, "RosterID": COUNT, "OwnerID": ID,
+    },
+    "TransactionAdds_AllYears": {
+        "Year": YEAR, "TransactionID": ID, "PlayerID": TEXT, "RosterID": COUNT,
+    },
+    "TransactionDrops_AllYears": {
+        "Year": YEAR, "TransactionID": ID, "PlayerID": TEXT, "RosterID": COUNT,
+    },
+    "TransactionPicks_AllYears": {
+        "Year": YEAR, "TransactionID": ID, "PickSeason": YEAR, "Round": SMALL,
+        "RosterID": COUNT, "PreviousOwnerRosterID": COUNT, "OwnerRosterID": COUNT,
+    },
+    "Drafts_AllYears": {
+        "LeagueID": ID, "LeagueName": NAME, "DraftID": ID, "Status": NAME,
+        "Type": NAME, "Season": YEAR, "Rounds": SMALL, "Teams": SMALL,
+    },
+    "DraftPicks_AllYears": {
+        "LeagueID": ID, "LeagueName": NAME, "DraftID": ID, "Round": SMALL,
+        "Pick_No": COUNT, "OverallPick": COUNT, "Picked_By": ID, "RosterID": COUNT,
+        "PlayerID": TEXT, "FirstName": TEXT, "LastName": TEXT, "Team": NAME,
+        "Position": NAME, "Status": NAME, "YearsExp": SMALL,
+    },
+    "Results_RegularSeason": {
+        "Year": YEAR, "LeagueID": ID, "LeagueName": NAME, "OwnerID": ID,
+        "OwnerName": NAME, "RosterID": COUNT, "Week": SMALL,
+        "Wins": COUNT, "Losses": COUNT, "Ties": COUNT,
+        "PointsFor": POINTS, "PointsAgainst": POINTS, "GamesPlayed": COUNT,
+        "WinPct": POINTS, "PointDiff": POINTS, "AvgPointsFor": POINTS,
+        "AvgPointsAgainst": POINTS, "PlayoffScore": POINTS, "PlayoffRank": COUNT,
+    },
+}
+
+
+# Tables also written as Parquet, and the column each one is partitioned by
+PARQUET_PARTITIONS = {
+    "Matchups_AllYears": "Year",
+    "Transactions_AllYears": "Year",
+    "TransactionRosters_AllYears": "Year",
+    "TransactionAdds_AllYears": "Year",
+    "TransactionDrops_AllYears": "Year",
+    "TransactionPicks_AllYears": "Year",
+    "Rosters_Players_AllYears": "Year",
+    "Results_RegularSeason": "Year",
+    "Scores": "LeagueYear",
+}
+
+
+def table_path(table):
+    return os.path.join(DATA_DIR, f"{table}.csv")
+
+
+def parquet_path(table):
+    return os.path.join(PARQUET_DIR, table)
+
+
+def columns(table):
+    return list(TABLES[table])
+
+
+# -------------------------
+# COERCE / READ / WRITE
+# -------------------------
+def coerce(df, table):
+    """Cast every known column of ``df`` to its canonical type."""
+    for col, dtype in TABLES[table].items():
+        if col not in df.columns or str(df[col].dtype) == dtype:
+            continue
+        if dtype in (ID, YEAR, SMALL, COUNT):
+            values = df[col]
+            if values.dtype == object or str(values.dtype).startswith(("string", "str")):
+                # parse the digits exactly: via float64, 19-digit snowflake IDs get rounded
+                values = values.astype("string").str.strip().replace("", pd.NA)
+            elif dtype == ID and values.dtype.kind == "f" and (values.abs() > 2**53).any():
+                # ints + None in dict rows become float64, which has already rounded the IDs
+                raise TypeError(f"{table}.{col} arrived as float64 and lost ID digits; build it from strings or Int64")
+            df[col] = values.astype(dtype)
+        else:
+            df[col] = df[col].astype(dtype)
+    return df
+
+
+def empty(table):
+    return coerce(pd.DataFrame(columns=columns(table)), table)
+
+
+def read_parquet(table, years=None):
+    """Read a table's Parquet dataset, optionally only the given year partitions."""
+    part_col = PARQUET_PARTITIONS[table]
+    filters = [(part_col, "in", [int(y) for y in years])] if years is not None else None
+    partitioning = pa_dataset.partitioning(pa.schema([(part_col, pa.int16())]), flavor="hive")
+    df = pd.read_parquet(parquet_path(table), filters=filters, partitioning=partitioning)
+    return coerce(df[[c for c in columns(table) if c in df.columns]], table)
+
+
+@phase("load")
+def read_table(table, path=None, years=None):
+    """Read a table with its canonical dtypes (an empty frame if the file is missing/empty).
+
+    The default location prefers the Parquet dataset when one exists;
+    ``years`` limits a Parquet read to those partitions.
+    """
+    if path is None and HAVE_PARQUET and table in PARQUET_PARTITIONS and os.path.isdir(parquet_path(table)):
+        return read_parquet(table, years)
+
+    path = path or table_path(table)
+    try:
+        df = pd.read_csv(path, dtype=TABLES[table])
+    except (FileNotFoundError, pd.errors.EmptyDataError):
+        return empty(table)
+    if years is not None and table in PARQUET_PARTITIONS:
+        df = df[df[PARQUET_PARTITIONS[table]].isin([int(y) for y in years])]
+    return df
+
+
+def changed_years(df, table, changed):
+    """Years touched by the delta keys ("2025/<league>/<week>"), or None to rewrite every year."""
+    if delta.partition_columns(df)[:1] != [PARQUET_PARTITIONS[table]]:
+        return None
+    years = {key.split("/")[0] for key in changed}
+    if not years or not all(year.isdigit() for year in years):
+        return None  # a schema change ("__columns__") or a missing year
+    return {int(year) for year in years}
+
+
+def write_parquet(df, table, years=None):
+    """Replace a table's year-partitioned Parquet dataset, or only its ``years`` partitions."""
+    target = parquet_path(table)
+    if df.empty:  # nothing to partition; readers fall back to the (empty) CSV
+        shutil.rmtree(target, ignore_errors=True)
+        return
+    if not os.path.isdir(target):
+        years = None
+    # A categorical column carries the whole table's dictionary into every
+    # partition, so one new name would rewrite every year; as plain strings
+    # each file only holds its own year's values
+    partition = PARQUET_PARTITIONS[table]
+    df = df.astype({col: "string" for col, dtype in df.dtypes.items()
+                    if isinstance(dtype, pd.CategoricalDtype) and col != partition})
+    if years is not None:
+        df = df[df[partition].isin(years)]
+    staging = f"{target}.tmp"
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(staging)
+    if not df.empty:
+        df.to_parquet(
+            staging,
+            partition_cols=[partition],
+            compression="zstd",
+            index=False,
+            # stable file names so unchanged partitions are byte-identical between runs
+            basename_template="part-{i}.parquet",
+        )
+    if years is None:
+        shutil.rmtree(target, ignore_errors=True)
+        os.replace(staging, target)
+        return
+    # Swap in just the changed years; a year no longer in the table is dropped
+    for year in sorted(years):
+        name = f"{partition}={year}"
+        shutil.rmtree(os.path.join(target, name), ignore_errors=True)
+        if os.path.isdir(os.path.join(staging, name)):
+            os.replace(os.path.join(staging, name), os.path.join(target, name))
+    shutil.rmtree(staging)
+
+
+@phase("write")
+def write_table(df, table, path=None):
+    """Write a table with its canonical dtypes and run the post-write hooks.
+
+    Nothing is written (and no hook runs) when no partition's content hash
+    changed since the last write; changed partitions go to the delta manifest.
+    """
+    path = path or table_path(table)
+    df = coerce(df, table)
+    parquet = HAVE_PARQUET and table in PARQUET_PARTITIONS and path == table_path(table)
+
+    changed, hashes = delta.diff(path, df)
+    if not changed and os.path.exists(path) and (not parquet or df.empty or os.path.isdir(parquet_path(table))):
+        print(f"⏸️ {os.path.basename(path)} unchanged — not rewritten")
+        return df
+
+    df.to_csv(path, index=False)
+    if parquet:
+        write_parquet(df, table, changed_years(df, table, changed))
+    delta.save_hashes(path, hashes)
+    delta.record(path, changed)
+    run_post_write(path, df)
+    return df
@@ -1,8 +1,12 @@
-import pandas as pd
-import requests
+from profiling import mark
 import datetime
 import os
 import argparse
+from sleeper_client import fetch_all, WEEKS
+from sleeper_cache import DEFAULT_TTL
+from matchup_rows import starter_rows, load_player_label_map
+from scores_store import merge_scores
+from schema import read_table
 
 # -------------------------
 # CONFIG
@@ -30,17 +34,7 @@ if args.week:
 # -------------------------
 # LOAD PLAYERS DATA
 # -------------------------
-if not os.path.exists(PLAYERS_FILE):
-    raise FileNotFoundError(f"Missing Players file: {PLAYERS_FILE}")
-
-players_df = pd.read_csv(PLAYERS_FILE, dtype=str)
-players_df["label"] = (
-    players_df["first_name"].fillna("") + " " +
-    players_df["last_name"].fillna("") + ", " +
-    players_df["position"].fillna("") + " (" +
-    players_df["team"].fillna("") + ")"
-)
-player_label_map = pd.Series(players_df.label.values, index=players_df.player_id).to_dict()
+player_label_map = load_player_label_map(PLAYERS_FILE, CURRENT_YEAR)
 
 # -------------------------
 # LOAD LEAGUE IDs
@@ -48,91 +42,44 @@ player_label_map = pd.Series(players_df.label.values, index=players_df.player_id
 if not os.path.exists(LEAGUE_FILE):
     raise FileNotFoundError(f"Missing LeagueID file: {LEAGUE_FILE}")
 
-league_df = pd.read_csv(LEAGUE_FILE, dtype=str)
-
-# -------------------------
-# LOAD EXISTING SCORES
-# -------------------------
-if os.path.exists(CSV_PATH):
-    try:
-        existing_df = pd.read_csv(CSV_PATH, dtype=str)
-        print(f"📂 Loaded existing data: {len(existing_df)} rows")
-    except pd.errors.EmptyDataError:
-        print(f"⚠️ {CSV_PATH} exists but is empty. Starting fresh.")
-        existing_df = pd.DataFrame()
-else:
-    existing_df = pd.DataFrame()
+league_df = read_table("LeagueIDs_AllYears", LEAGUE_FILE)
 
 # -------------------------
-# HELPER: Normalize Key Columns
-# -------------------------
-def normalize_keys(df):
-    if df.empty:
-        return df
-    for col in ["LeagueYear", "league_id", "roster_id", "weekNum", "array_index"]:
-        if col in df.columns:
-            df[col] = df[col].astype(str).str.strip().str.replace(r"\.0$", "", regex=True)
-    return df
-
+# FUNCTION TO BUILD SCORES FROM FETCHED MATCHUPS
 # -------------------------
-# FUNCTION TO FETCH SCORES (fixed for correct point source)
-# -------------------------
-def get_weekly_scores(league_id, league_year, week=None):
+def get_weekly_scores(responses, league_id, league_year, weeks_to_pull):
     results = []
-    weeks_to_pull = [week] if week else range(1, 19)
 
     for week_num in weeks_to_pull:
-        url = f"https://api.sleeper.app/v1/league/{league_id}/matchups/{week_num}"
-        try:
-            resp = requests.get(url, timeout=10)
-            resp.raise_for_status()
-        except Exception as e:
-            print(f"⚠️ Error fetching league {league_id}, week {week_num}: {e}")
+        matchups = responses[f"/league/{league_id}/matchups/{week_num}"]
+        if matchups is None:
+            print(f"⚠️ Error fetching league {league_id}, week {week_num}")
             continue
 
-        matchups = resp.json() or []
+        matchups = matchups or []
         print(f"  Week {week_num}: {len(matchups)} matchups")
-
-        for matchup in matchups:
-            roster_id = matchup.get("roster_id", "")
-            starters = matchup.get("starters", []) or []
-            starters_points = matchup.get("starters_points", []) or []
-            player_points = matchup.get("players_points", {}) or {}
-            lookup_id = f"{league_id}{roster_id}"
-
-            for i, player_id in enumerate(starters):
-                # Prefer players_points dict for accuracy
-                points = player_points.get(str(player_id))
-                # Fall back to starters_points positional list
-                if points is None and i < len(starters_points):
-                    points = starters_points[i]
-                # Clean fallback for missing/null
-                points = float(points) if points not in (None, "", "null") else 0.0
-
-                results.append({
-                    "LeagueYear": league_year,
-                    "league_id": league_id,
-                    "weekNum": week_num,
-                    "roster_id": roster_id,
-                    "lookupID": lookup_id,
-                    "starter": str(player_id),
-                    "starter_points": points,
-                    "array_index": i + 1,
-                    "label": player_label_map.get(str(player_id), "")
-                })
+        results.extend(starter_rows(matchups, league_year, league_id, week_num, player_label_map))
     return results
 
 # -------------------------
 # FETCH DATA FOR CURRENT YEAR ONLY
 # -------------------------
-current_leagues = league_df.loc[league_df["Year"].astype(int) == CURRENT_YEAR, "LeagueID"].tolist()
+current_leagues = league_df.loc[league_df["Year"] == CURRENT_YEAR, "LeagueID"].tolist()
 if not current_leagues:
     raise ValueError(f"No leagues found for {CURRENT_YEAR} in {LEAGUE_FILE}")
 
+weeks_to_pull = [args.week] if args.week else WEEKS
+responses = fetch_all(
+    (f"/league/{league_id}/matchups/{week_num}" for league_id in current_leagues for week_num in weeks_to_pull),
+    # Live refreshes always revalidate; the full-season pass can reuse recent responses
+    ttl=0 if args.week else DEFAULT_TTL,
+)
+
+mark("transform")
 all_data = []
 for league_id in current_leagues:
     print(f"➡️ Fetching scores for league {league_id}")
-    league_scores = get_weekly_scores(league_id, league_year=CURRENT_YEAR, week=args.week)
+    league_scores = get_weekly_scores(responses, league_id, CURRENT_YEAR, weeks_to_pull)
     print(f"   -> {len(league_scores)} rows fetched")
     all_data.extend(league_scores)
 
@@ -140,52 +87,12 @@ if not all_data:
     print("⚠️ No new data fetched. Exiting without changes.")
     exit()
 
-new_df = pd.DataFrame(all_data)
-new_df["starter_points"] = pd.to_numeric(new_df["starter_points"], errors="coerce").fillna(0)
-
 # -------------------------
-# NORMALIZE BEFORE MERGE
+# UPSERT CHANGED LEAGUE-WEEKS (exports Scores.csv only on change)
 # -------------------------
-new_df = normalize_keys(new_df)
-if not existing_df.empty:
-    existing_df = normalize_keys(existing_df)
+changed = merge_scores(all_data, CSV_PATH)
 
-# -------------------------
-# MERGE & DEDUPLICATE BY KEY
-# -------------------------
-combined_df = pd.concat([existing_df, new_df], ignore_index=True)
-combined_df.drop_duplicates(
-    subset=["league_id", "roster_id", "weekNum", "array_index"],
-    keep="last",
-    inplace=True
-)
-
-# -------------------------
-# FINAL CLEANUP — remove exact full-row duplicates
-# -------------------------
-before = len(combined_df)
-combined_df = combined_df.drop_duplicates(keep="last").reset_index(drop=True)
-after = len(combined_df)
-print(f"🧹 Final cleanup removed {before - after:,} exact duplicates")
-
-# -------------------------
-# SORT & SAVE
-# -------------------------
-combined_df["array_index"] = combined_df["array_index"].astype(int)
-combined_df.sort_values(
-    by=["LeagueYear", "league_id", "roster_id", "weekNum", "array_index"],
-    inplace=True
-)
-combined_df.to_csv(CSV_PATH, index=False)
-
-print(f"\n✅ Scores.csv updated for {CURRENT_YEAR}")
-print(f"📊 Total rows after update: {len(combined_df)}")
-
-# -------------------------
-# UPDATE TRACKER
-# -------------------------
-try:
-    os.system("python update_tracker.py")
-    print("🕒 LastUpdate.csv refreshed successfully.")
-except Exception as e:
-    print(f"⚠️ Could not update LastUpdate.csv: {e}")
+if changed:
+    print(f"\n✅ Scores.csv updated for {CURRENT_YEAR}")
+else:
+    print(f"\n✅ Scores for {CURRENT_YEAR} unchanged — Scores.csv left as is")
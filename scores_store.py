@@ -0,0 +1,143 @@
+"""Year/week-partitioned storage for starter-level Scores rows.
+
+Rows live in ``store/scores/<year>/week_<NN>.csv``, keyed on
+(league_id, roster_id, weekNum, array_index) and typed by the ``Scores``
+schema, so merges compare native integers. Upserting a league-week only
+reads and rewrites that one partition, and a partition whose content did
+not change is not rewritten at all. The flat data/Scores.csv that Power BI
+consumes is exported only when at least one partition changed: the last
+export (its year-partitioned Parquet copy, a fast read) gets just the
+changed weeks spliced in, and only their years' Parquet files are
+rewritten. The flat CSV itself stays one file, rewritten in full, because
+that single file is what the Power BI dataset is bound to.
+"""
+import glob
+import os
+
+import pandas as pd
+
+from profiling import phase
+from schema import coerce, columns, read_table, table_path, write_table
+
+# -------------------------
+# CONFIG
+# -------------------------
+TABLE = "Scores"
+CSV_PATH = "data/Scores.csv"
+STORE_DIR = "store/scores"
+KEY_COLUMNS = ["league_id", "roster_id", "weekNum", "array_index"]
+SORT_COLUMNS = ["LeagueYear", "league_id", "roster_id", "weekNum", "array_index"]
+COLUMNS = columns(TABLE)
+
+
+# -------------------------
+# PARTITIONS
+# -------------------------
+def partition_path(year, week, store_dir=STORE_DIR):
+    return os.path.join(store_dir, str(year), f"week_{int(week):02d}.csv")
+
+
+def _write_if_changed(df, path):
+    """Write ``df`` to ``path`` unless the file already holds exactly this content."""
+    text = df.to_csv(index=False)
+    if os.path.exists(path):
+        with open(path, encoding="utf-8", newline="") as f:
+            if f.read() == text:
+                return False
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        f.write(text)
+    return True
+
+
+@phase("write")
+def write_partition(year, week, df, store_dir=STORE_DIR):
+    """Write one year/week partition unless it already holds exactly these rows."""
+    return _write_if_changed(df, partition_path(year, week, store_dir))
+
+
+@phase("merge")
+def merge_partition(existing_df, new_df):
+    """``existing_df`` with the rows of every league in ``new_df`` replaced."""
+    keep_df = existing_df[~existing_df["league_id"].isin(new_df["league_id"].unique())]
+    merged_df = pd.concat([keep_df, new_df[COLUMNS]], ignore_index=True)
+    merged_df = coerce(merged_df, TABLE).drop_duplicates(subset=KEY_COLUMNS, keep="last")
+    return merged_df.sort_values(by=SORT_COLUMNS).reset_index(drop=True)
+
+
+def upsert_partition(year, week, new_df, store_dir=STORE_DIR):
+    """Replace the rows of every league in ``new_df`` within one year/week partition."""
+    merged_df = merge_partition(read_table(TABLE, partition_path(year, week, store_dir)), new_df)
+    return write_partition(year, week, merged_df, store_dir)
+
+
+def bootstrap_store(csv_path=CSV_PATH, store_dir=STORE_DIR):
+    """One-time split of an existing flat Scores.csv into year/week partitions."""
+    if glob.glob(os.path.join(store_dir, "*", "week_*.csv")) or not os.path.exists(csv_path):
+        return
+    existing_df = read_table(TABLE, csv_path)
+    if existing_df.empty:
+        return
+    print(f"📦 Bootstrapping {store_dir} from {csv_path} ({len(existing_df)} rows)")
+    for (year, week), part in existing_df.groupby(["LeagueYear", "weekNum"]):
+        upsert_partition(year, week, part, store_dir)
+
+
+# -------------------------
+# EXPORT
+# -------------------------
+def export_csv(csv_path=CSV_PATH, store_dir=STORE_DIR, changed=None):
+    """Export the flat Scores.csv: the last export with the ``changed`` (year, week) partitions
+    swapped in, or (``changed=None`` or no previous export) a rebuild from every partition.
+    """
+    if changed is not None and os.path.exists(csv_path):
+        # the default location reads the Parquet copy when there is one
+        last_df = read_table(TABLE, None if csv_path == table_path(TABLE) else csv_path)
+        touched = pd.MultiIndex.from_arrays([last_df["LeagueYear"], last_df["weekNum"]]).isin(list(changed))
+        parts = [last_df[~touched]] + [read_table(TABLE, partition_path(year, week, store_dir))
+                                       for year, week in sorted(changed)]
+        combined_df = coerce(pd.concat(parts, ignore_index=True), TABLE).sort_values(by=SORT_COLUMNS)
+        return write_table(combined_df, TABLE, csv_path)
+
+    parts = [read_table(TABLE, p) for p in sorted(glob.glob(os.path.join(store_dir, "*", "week_*.csv")))]
+    combined_df = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(columns=COLUMNS)
+    combined_df = coerce(combined_df, TABLE).sort_values(by=SORT_COLUMNS)
+    return write_table(combined_df, TABLE, csv_path)
+
+
+@phase("merge")
+def splice_partition(scores_df, year, week, part_df):
+    """Swap one year/week partition into an in-memory copy of the full table."""
+    in_partition = (scores_df["LeagueYear"] == year) & (scores_df["weekNum"] == week)
+    combined_df = pd.concat([scores_df[~in_partition], part_df], ignore_index=True)
+    return coerce(combined_df, TABLE).sort_values(by=SORT_COLUMNS)
+
+
+# -------------------------
+# UPSERT
+# -------------------------
+def upsert_rows(rows, store_dir=STORE_DIR):
+    """Upsert starter rows into their year/week partitions; returns the partitions that changed."""
+    new_df = coerce(pd.DataFrame(rows), TABLE)
+
+    changed = []
+    partitions = new_df.groupby(["LeagueYear", "weekNum"])
+    for (year, week), part in partitions:
+        if upsert_partition(year, week, part, store_dir):
+            changed.append((int(year), int(week)))
+    print(f"🧩 Scores store: {len(changed)} of {partitions.ngroups} year/week partitions changed")
+    return changed
+
+
+@phase("merge")
+def merge_scores(rows, csv_path=CSV_PATH, store_dir=STORE_DIR):
+    """Upsert new starter rows by league-week; export Scores.csv only if something changed.
+
+    Returns the list of (year, week) partitions that changed.
+    """
+    bootstrap_store(csv_path, store_dir)
+    changed = upsert_rows(rows, store_dir)
+    if changed or not os.path.exists(csv_path):
+        combined_df = export_csv(csv_path, store_dir, changed)
+        print(f"💾 Exported {len(combined_df)} rows to {csv_path}")
+    return changed
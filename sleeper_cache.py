@@ -0,0 +1,231 @@
+"""Persistent on-disk cache for Sleeper API responses.
+
+Response bodies are stored content-addressed under ``objects/`` (keyed by
+the SHA-256 of the body, so the many identical ``[]`` weeks share one
+file). Each request path gets a small ref file under
+``refs/<league_id>/`` pointing at its body, along with the validators
+needed to revalidate it.
+
+Freshness policy:
+  * refs marked immutable (leagues whose Sleeper status is ``complete``,
+    finished drafts) are served forever without touching the network;
+  * everything else is fresh for ``ttl`` seconds, after which it is
+    revalidated with ``If-None-Match`` / ``If-Modified-Since``.
+
+When a ref moves to a new body, its old object is deleted by ``collect``
+unless another ref still points at it, so payloads that change every day
+(``/players/nfl``) do not pile up in the cache.
+
+    python sleeper_cache.py --gc    # delete every object no ref points at (and stale *.tmp)
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+import tempfile
+import time
+
+from locks import atomic_open
+
+# -------------------------
+# CONFIG
+# -------------------------
+CACHE_DIR = os.environ.get("SLEEPER_CACHE_DIR", ".cache/sleeper")
+DEFAULT_TTL = int(os.environ.get("SLEEPER_CACHE_TTL", "3600"))  # current season, seconds
+ENABLED = os.environ.get("SLEEPER_CACHE", "on").lower() not in ("0", "off", "false", "no")
+
+LEAGUE_RE = re.compile(r"^/league/(\d+)/")
+
+
+class ResponseCache:
+    def __init__(self, cache_dir=CACHE_DIR):
+        self.cache_dir = cache_dir
+        self._replaced = set()  # objects a ref stopped pointing at; see collect()
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+
+    # -------------------------
+    # LAYOUT
+    # -------------------------
+    def _ref_path(self, path):
+        match = LEAGUE_RE.match(path)
+        bucket = match.group(1) if match else "global"
+        slug = path.strip("/").replace("/", "_")
+        return os.path.join(self.cache_dir, "refs", bucket, f"{slug}.json")
+
+    def _object_path(self, digest):
+        return os.path.join(self.cache_dir, "objects", digest[:2], f"{digest}.json")
+
+    # -------------------------
+    # READ
+    # -------------------------
+    def lookup(self, path, body=True):
+        """Return the ref dict for ``path`` (with its body under ``"body"``), or None.
+
+        ``body=False`` leaves large bodies on disk; open ``object_path(ref)`` instead.
+        """
+        try:
+            with open(self._ref_path(path), encoding="utf-8") as f:
+                ref = json.load(f)
+            if body:
+                with open(self._object_path(ref["object"]), "rb") as f:
+                    ref["body"] = f.read()
+            elif not os.path.exists(self._object_path(ref["object"])):
+                return None
+        except (OSError, ValueError, KeyError):
+            return None
+        return ref
+
+    def object_path(self, ref):
+        return self._object_path(ref["object"])
+
+    @staticmethod
+    def is_fresh(ref, ttl=DEFAULT_TTL):
+        if ref.get("immutable"):
+            return True
+        return time.time() - ref.get("fetched_at", 0) < ttl
+
+    @staticmethod
+    def validators(ref):
+        """Conditional-request headers for a stale ref."""
+        headers = {}
+        if ref and ref.get("etag"):
+            headers["If-None-Match"] = ref["etag"]
+        if ref and ref.get("last_modified"):
+            headers["If-Modified-Since"] = ref["last_modified"]
+        return headers
+
+    # -------------------------
+    # WRITE
+    # -------------------------
+    def store(self, path, body, headers, immutable=False):
+        digest = hashlib.sha256(body).hexdigest()
+        obj_path = self._object_path(digest)
+        if not os.path.exists(obj_path):
+            with atomic_open(obj_path, "wb") as f:
+                f.write(body)
+        self._store_ref(path, digest, headers, immutable)
+
+    def store_stream(self, path, chunks, headers, immutable=False):
+        """Like ``store`` for a body arriving in chunks; it never sits in memory whole.
+
+        Returns the stored ref.
+        """
+        tmp_dir = os.path.join(self.cache_dir, "objects")
+        os.makedirs(tmp_dir, exist_ok=True)
+        sha = hashlib.sha256()
+        fd, tmp = tempfile.mkstemp(dir=tmp_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                for chunk in chunks:
+                    sha.update(chunk)
+                    f.write(chunk)
+            digest = sha.hexdigest()
+            obj_path = self._object_path(digest)
+            os.makedirs(os.path.dirname(obj_path), exist_ok=True)
+            os.replace(tmp, obj_path)
+        except BaseException:  # e.g. the connection dropped mid-body: keep no partial file
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+        return self._store_ref(path, digest, headers, immutable)
+
+    def _store_ref(self, path, digest, headers, immutable):
+        old = self.lookup(path, body=False)
+        if old and old["object"] != digest:
+            self._replaced.add(old["object"])
+        ref = {
+            "path": path,
+            "object": digest,
+            "fetched_at": time.time(),
+            "immutable": bool(immutable),
+            "etag": headers.get("ETag"),
+            "last_modified": headers.get("Last-Modified"),
+        }
+        with atomic_open(self._ref_path(path), encoding="utf-8") as f:
+            json.dump(ref, f)
+        return ref
+
+    def touch(self, path, ref, immutable=False):
+        """Mark a revalidated (304) ref as fresh again."""
+        ref = {k: v for k, v in ref.items() if k != "body"}
+        ref["fetched_at"] = time.time()
+        ref["immutable"] = ref.get("immutable") or bool(immutable)
+        with atomic_open(self._ref_path(path), encoding="utf-8") as f:
+            json.dump(ref, f)
+
+    # -------------------------
+    # GARBAGE COLLECTION
+    # -------------------------
+    def referenced(self):
+        """Digests of every object some ref points at."""
+        digests = set()
+        for root, _, files in os.walk(os.path.join(self.cache_dir, "refs")):
+            for name in files:
+                try:
+                    with open(os.path.join(root, name), encoding="utf-8") as f:
+                        digests.add(json.load(f)["object"])
+                except (OSError, ValueError, KeyError):
+                    continue
+        return digests
+
+    def collect(self, candidates=None):
+        """Delete the candidate objects (default: the ones refs moved away from) no ref points at.
+
+        Shared bodies such as ``[]`` stay as long as any ref uses them.
+        A ref whose object disappears is simply a cache miss. Returns the
+        number of objects deleted.
+        """
+        if candidates is None:
+            candidates, self._replaced = self._replaced, set()
+        if not candidates:
+            return 0
+        removed = 0
+        for digest in set(candidates) - self.referenced():
+            try:
+                os.remove(self._object_path(digest))
+                removed += 1
+            except OSError:
+                continue
+        return removed
+
+    def remove_temp(self, max_age=3600):
+        """Delete ``*.tmp`` files older than ``max_age`` seconds (left by killed runs)."""
+        removed, cutoff = 0, time.time() - max_age
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    if name.endswith(".tmp") and os.path.getmtime(path) < cutoff:
+                        os.remove(path)
+                        removed += 1
+                except OSError:
+                    continue
+        return removed
+
+    def objects(self):
+        """Digests of every stored object."""
+        digests = set()
+        for root, _, files in os.walk(os.path.join(self.cache_dir, "objects")):
+            digests.update(name[:-5] for name in files if name.endswith(".json"))
+        return digests
+
+    def summary(self):
+        return f"{self.hits} cached, {self.revalidated} revalidated, {self.misses} downloaded"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sleeper response cache maintenance.")
+    parser.add_argument("--gc", action="store_true", help="Delete every object no ref points at, and stale temp files")
+    parser.add_argument("--dir", default=CACHE_DIR)
+    args = parser.parse_args()
+
+    if args.gc:
+        cache = ResponseCache(args.dir)
+        print(f"🧹 {cache.collect(cache.objects())} unreferenced objects and "
+              f"{cache.remove_temp()} stale temp files deleted from {args.dir}")
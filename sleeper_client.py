@@ -0,0 +1,387 @@
+"""Shared asyncio client for the Sleeper API.
+
+Fetch scripts build the full list of endpoint paths they need up front
+(one per league, or one per league x week) and hand it to ``fetch_all``,
+which fans the requests out concurrently over one keep-alive connection
+pool instead of walking leagues and weeks one at a time.
+
+Responses go through the on-disk ``ResponseCache`` (see sleeper_cache.py):
+leagues whose Sleeper status is ``complete`` are never refetched, and the
+current season is revalidated once its TTL runs out. Every request that
+does go to the network first takes a token from the shared
+``AdaptiveTokenBucket`` (see rate_limiter.py). Transient failures (429,
+5xx, connection errors) are retried with jittered exponential backoff
+behind a circuit breaker; endpoints that still fail are saved as gaps for
+a later ``--fill-gaps`` run (see resilience.py). Every response body is
+also appended to the raw archive under .cache/archive/ (see archive.py);
+with ``--offline`` every path is served from that archive and nothing goes
+to the network, so derived tables can be rebuilt locally. Every call is recorded
+(endpoint, league, week, status, latency, size, retries, cache outcome)
+for the run report written at exit (see instrumentation.py).
+"""
+import asyncio
+import contextlib
+import csv
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import sleeper_cache
+from archive import ENABLED as ARCHIVE_ENABLED, Archive
+from instrumentation import get_recorder
+from profiling import phase
+from rate_limiter import make_limiter
+from resilience import CircuitBreaker, CircuitOpenError, GapLog, backoff_delay, is_transient
+
+# -------------------------
+# CONFIG
+# -------------------------
+# Point at a local replay_server.py with SLEEPER_BASE_URL=http://127.0.0.1:8799/v1
+BASE_URL = os.environ.get("SLEEPER_BASE_URL", "https://api.sleeper.app/v1")
+MAX_CONCURRENCY = int(os.environ.get("SLEEPER_MAX_CONCURRENCY", "16"))
+TIMEOUT = 30
+MAX_ATTEMPTS = int(os.environ.get("SLEEPER_MAX_ATTEMPTS", "5"))  # per request, for 429/5xx/connection errors
+WEEKS = range(1, 19)  # NFL weeks 1–18
+LEAGUE_FILE = "data/LeagueIDs_AllYears.csv"
+
+# --fill-gaps: fetch only the endpoints this script failed on last time,
+# everything else comes from the response cache however old it is
+FILL_GAPS = "--fill-gaps" in sys.argv or os.environ.get("SLEEPER_FILL_GAPS", "").lower() in ("1", "on", "true", "yes")
+if "--fill-gaps" in sys.argv:
+    sys.argv = [arg for arg in sys.argv if arg != "--fill-gaps"]
+
+# --offline: serve every path from the raw archive, never touch the network
+OFFLINE = "--offline" in sys.argv or os.environ.get("SLEEPER_OFFLINE", "").lower() in ("1", "on", "true", "yes")
+if "--offline" in sys.argv:
+    sys.argv = [arg for arg in sys.argv if arg != "--offline"]
+
+
+def load_closed_leagues(league_file=LEAGUE_FILE):
+    """League IDs whose Sleeper status is ``complete`` (their data never changes)."""
+    try:
+        with open(league_file, newline="", encoding="utf-8") as f:
+            return {row["LeagueID"] for row in csv.DictReader(f) if row.get("Status") == "complete"}
+    except OSError:
+        return set()
+
+
+class SleeperClient:
+    """Bounded-concurrency GET client sharing one pooled ``requests.Session``."""
+
+    def __init__(self, base_url=BASE_URL, max_concurrency=MAX_CONCURRENCY, timeout=TIMEOUT,
+                 cache=None, closed_leagues=None, limiter=None, recorder=None, breaker=None, gaps=None,
+                 fill_gaps=FILL_GAPS, archive=None, offline=OFFLINE):
+        self.base_url = base_url.rstrip("/")
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.cache = cache if cache is not None else (
+            sleeper_cache.ResponseCache() if sleeper_cache.ENABLED else None
+        )
+        self.closed_leagues = closed_leagues if closed_leagues is not None else load_closed_leagues()
+        self.limiter = limiter if limiter is not None else make_limiter()
+        self.recorder = recorder if recorder is not None else get_recorder()
+        self.breaker = breaker if breaker is not None else CircuitBreaker()
+        self.gaps = gaps if gaps is not None else GapLog()
+        self.fill_gaps = fill_gaps
+        self.offline = offline
+        self.archive = archive if archive is not None else (
+            Archive() if ARCHIVE_ENABLED or offline else None
+        )
+        self._archiving = False
+        self._lock = threading.Lock()
+
+        self.session = requests.Session()
+        self.session.headers.update({"User-Agent": "NCAA180-Sleeper/1.0"})
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max_concurrency)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def url(self, path):
+        """Resolve an endpoint path (``/league/{id}/rosters``) to a full URL."""
+        if path.startswith(("http://", "https://")):
+            return path
+        return f"{self.base_url}{path}"
+
+    def is_immutable(self, path):
+        match = sleeper_cache.LEAGUE_RE.match(path)
+        return bool(match) and match.group(1) in self.closed_leagues
+
+    def _count(self, attr):
+        with self._lock:
+            setattr(self.cache, attr, getattr(self.cache, attr) + 1)
+
+    def _keep(self, path, body):
+        if self._archiving:
+            self.archive.add(path, body)
+
+    def _get(self, path, ttl, immutable, call):
+        """Fetch one path, filling ``call`` (status, latency, retries, ...) as it goes."""
+        if self.offline:
+            data, size = self.archive.read(path)
+            call.update(status=200, cache="archive", size=size)
+            return data
+
+        immutable = immutable or self.is_immutable(path)
+        ref = self.cache.lookup(path) if self.cache else None
+        if ref and self.cache.is_fresh(ref, ttl):
+            self._count("hits")
+            call.update(status=200, cache="hit", size=len(ref["body"]))
+            self._keep(path, ref["body"])
+            return json.loads(ref["body"])
+
+        resp = self._request(path, self.cache.validators(ref) if self.cache else {}, call)
+        if resp.status_code == 304 and ref:
+            self.cache.touch(path, ref, immutable)
+            self._count("revalidated")
+            call.update(cache="revalidated", size=len(ref["body"]))
+            self._keep(path, ref["body"])
+            return json.loads(ref["body"])
+
+        call["size"] = len(resp.content)
+        resp.raise_for_status()
+        data = resp.json()
+        self._keep(path, resp.content)
+        if self.cache:
+            self.cache.store(path, resp.content, resp.headers, immutable)
+            self._count("misses")
+            call["cache"] = "miss"
+        return data
+
+    def _request(self, path, headers, call, stream=False):
+        """GET with retries, backoff and the circuit breaker; returns the final response."""
+        resp = error = None
+        for attempt in range(MAX_ATTEMPTS):
+            self.breaker.check()
+            if attempt:
+                delay = backoff_delay(attempt)
+                call["wait"] += delay
+                time.sleep(delay)
+            call["wait"] += self.limiter.acquire()
+            call["retries"] = attempt
+            sent = time.monotonic()
+            try:
+                resp = self.session.get(self.url(path), headers=headers, timeout=self.timeout, stream=stream)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                resp, error = None, e
+            call["latency"] += time.monotonic() - sent
+            if resp is None:
+                continue
+            call["status"] = resp.status_code
+            self.limiter.on_response(resp.status_code, resp.headers.get("Retry-After"))
+            if not is_transient(resp.status_code):
+                break
+
+        self.breaker.record(resp is not None and not is_transient(resp.status_code))
+        if resp is None:
+            raise error
+        return resp
+
+    async def get(self, path, semaphore, executor, ttl=sleeper_cache.DEFAULT_TTL, immutable=False):
+        """Fetch one path; returns the decoded JSON, or None if the call failed."""
+        async with semaphore:
+            loop = asyncio.get_running_loop()
+            call = {"status": None, "latency": 0.0, "wait": 0.0, "size": 0, "retries": 0, "cache": "off"}
+            try:
+                data = await loop.run_in_executor(executor, self._get, path, ttl, immutable, call)
+            except Exception as e:
+                if not isinstance(e, CircuitOpenError):  # those are summarised once per batch
+                    print(f"⚠️ Error fetching {path}: {e}")
+                self.recorder.record(path, error=f"{type(e).__name__}: {e}", **call)
+                return None
+            self.recorder.record(path, **call)
+            return data
+
+    async def gather(self, paths, ttls, immutable):
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+            return await asyncio.gather(*(
+                self.get(p, semaphore, executor, ttl, p in immutable) for p, ttl in zip(paths, ttls)
+            ))
+
+    @phase("fetch")
+    def fetch_all(self, paths, ttl=sleeper_cache.DEFAULT_TTL, immutable=(), keep=True):
+        """Fetch every path concurrently and return ``{path: json_or_None}``.
+
+        ``ttl`` bounds how stale a cached current-season response may be
+        (0 always revalidates); paths in ``immutable`` are cached forever
+        on top of those belonging to completed leagues. With ``fill_gaps``
+        only paths in the gap list go to the network. ``keep=False`` leaves
+        the responses out of the raw archive.
+        """
+        paths = list(dict.fromkeys(paths))
+        if not paths:
+            return {}
+        if self.offline:
+            return self.fetch_archived(paths)
+        ttls = [ttl] * len(paths)
+        if self.fill_gaps:
+            pending = self.gaps.paths()
+            ttls = [0 if p in pending else float("inf") for p in paths]
+            print(f"🩹 Filling {sum(p in pending for p in paths)} gap(s); the other endpoints come from the cache"
+                  + ("" if self.cache else " (cache disabled — they are fetched too)"))
+        print(f"🌐 Fetching {len(paths)} endpoints ({self.max_concurrency} concurrent)")
+        if self.cache:
+            self.cache.reset_stats()
+        first_call = len(self.recorder.calls)
+        self._archiving = keep and self.archive is not None
+        try:
+            results = asyncio.run(self.gather(paths, ttls, set(immutable)))
+        finally:
+            self._archiving = False
+        if self.cache:
+            print(f"   cache: {self.cache.summary()}; {self.cache.collect()} replaced objects deleted")
+        if keep and self.archive is not None:
+            print(f"   archive: {self.archive.flush()} new or changed responses")
+        print(f"   rate limiter: {self.limiter.summary()}; {self.breaker.summary()}")
+        calls = self.recorder.calls[first_call:]
+        p50, p95 = self.recorder.latency_summary(calls)
+        errors = sum(1 for c in calls if c["error"])
+        print(f"   latency: p50 {p50} ms, p95 {p95} ms; {errors} failed")
+
+        filled = self.gaps.update(calls)
+        if filled:
+            print(f"   🩹 {filled} gap(s) filled")
+        if self.gaps.entries:
+            print(f"   🕳️ {len(self.gaps.entries)} endpoint(s) still failing — listed in {self.gaps.path}; "
+                  f"rerun with --fill-gaps to fetch only those")
+        return dict(zip(paths, results))
+
+    def fetch_archived(self, paths):
+        """Offline ``fetch_all``: every path from the archive, sequentially (no network)."""
+        print(f"🗄️ Reading {len(paths)} endpoints from the archive (offline)")
+        results = {}
+        for path in paths:
+            call = {"status": None, "latency": 0.0, "wait": 0.0, "size": 0, "retries": 0, "cache": "archive"}
+            try:
+                results[path] = self._get(path, 0, False, call)
+                self.recorder.record(path, **call)
+            except KeyError as e:
+                results[path] = None
+                self.recorder.record(path, error=f"{type(e).__name__}: {e}", **call)
+        missing = sum(1 for v in results.values() if v is None)
+        if missing:
+            print(f"   ⚠️ {missing} endpoint(s) not archived — fetch them online once to add them")
+        return results
+
+    # -------------------------
+    # LARGE PAYLOADS
+    # -------------------------
+    def _get_file(self, path, ttl, call, keep=True):
+        """Fetch one path to a file; returns ``(file path, sha256, is_temporary)``."""
+        ref = self.cache.lookup(path, body=False) if self.cache else None
+        if self.offline:
+            try:
+                data, size = self.archive.read(path)
+            except KeyError:
+                if not ref:
+                    raise
+                ttl = float("inf")  # not archived (keep=False): the last cached copy
+            else:
+                call.update(status=200, cache="archive", size=size)
+                return spool((json.dumps(data).encode("utf-8"),))
+
+        if ref and self.cache.is_fresh(ref, ttl):
+            self._count("hits")
+            call.update(status=200, cache="hit")
+            body_path, digest, temporary = self.cache.object_path(ref), ref["object"], False
+        else:
+            resp = self._request(path, self.cache.validators(ref) if self.cache else {}, call, stream=True)
+            with resp:
+                if resp.status_code == 304 and ref:
+                    self.cache.touch(path, ref)
+                    self._count("revalidated")
+                    call["cache"] = "revalidated"
+                    body_path, digest, temporary = self.cache.object_path(ref), ref["object"], False
+                else:
+                    resp.raise_for_status()
+                    chunks = resp.iter_content(chunk_size=1 << 16)
+                    if self.cache:
+                        ref = self.cache.store_stream(path, chunks, resp.headers)
+                        self.cache.collect()  # the previous version of the payload
+                        self._count("misses")
+                        call["cache"] = "miss"
+                        body_path, digest, temporary = self.cache.object_path(ref), ref["object"], False
+                    else:
+                        body_path, digest, temporary = spool(chunks)
+
+        call["size"] = os.path.getsize(body_path)
+        if keep and self.archive is not None and not self.offline:
+            self.archive.add_file(path, body_path, digest)
+            self.archive.flush()
+        return body_path, digest, temporary
+
+    @contextlib.contextmanager
+    def open_payload(self, path, ttl=sleeper_cache.DEFAULT_TTL, keep=True):
+        """Fetch one large payload without holding it in memory.
+
+        Yields ``(binary file, sha256)`` for streaming parsers, or
+        ``(None, None)`` if the call failed. The body goes straight to the
+        response cache (revalidated with its ETag, so an unchanged payload
+        is not downloaded again) or, with the cache off, a temporary file.
+        ``keep=False`` leaves it out of the raw archive; offline, such a
+        payload is read from the cache instead.
+        """
+        call = {"status": None, "latency": 0.0, "wait": 0.0, "size": 0, "retries": 0, "cache": "off"}
+        if self.cache:
+            self.cache.reset_stats()
+        try:
+            with phase("fetch"):
+                body_path, digest, temporary = self._get_file(path, ttl, call, keep)
+        except Exception as e:
+            print(f"⚠️ Error fetching {path}: {e}")
+            record = self.recorder.record(path, error=f"{type(e).__name__}: {e}", **call)
+            if not self.offline:
+                self.gaps.update([record])
+            yield None, None
+            return
+
+        record = self.recorder.record(path, **call)
+        if not self.offline:
+            self.gaps.update([record])
+        print(f"🌐 {path}: {call['size'] / 2**20:.1f} MiB ({call['cache']})")
+        try:
+            with open(body_path, "rb") as f:
+                yield f, digest
+        finally:
+            if temporary:
+                os.remove(body_path)
+
+
+def spool(chunks):
+    """Write chunks to a temporary file; returns ``(path, sha256, True)``."""
+    sha = hashlib.sha256()
+    fd, tmp = tempfile.mkstemp(suffix=".json")
+    with os.fdopen(fd, "wb") as f:
+        for chunk in chunks:
+            sha.update(chunk)
+            f.write(chunk)
+    return tmp, sha.hexdigest(), True
+
+
+# -------------------------
+# MODULE-LEVEL CLIENT
+# -------------------------
+_client = None
+
+
+def get_client():
+    global _client
+    if _client is None:
+        _client = SleeperClient()
+    return _client
+
+
+def fetch_all(paths, ttl=sleeper_cache.DEFAULT_TTL, immutable=(), keep=True):
+    return get_client().fetch_all(paths, ttl=ttl, immutable=immutable, keep=keep)
+
+
+def open_payload(path, ttl=sleeper_cache.DEFAULT_TTL, keep=True):
+    return get_client().open_payload(path, ttl=ttl, keep=keep)
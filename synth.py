@@ -0,0 +1,204 @@
+"""Synthetic league history at a multiple of today's size.
+
+Every league in data/ is cloned ``scale`` times per season, and ``--years``
+extra seasons are added before the first one (copies of the first season's
+leagues, with the same owners). Clones get fresh league, draft,
+transaction and owner IDs and jittered scores, with PointsAgainst and
+Outcome recomputed from the opponent, so every derived table stays
+internally consistent. Players and the reference tables are shared.
+
+The result is a data/ directory in the shape the stages write, and a
+fixture tree built from it (fixtures.py) that replay_server.py serves as
+Sleeper payloads; benchmark.py --scale uses both.
+
+    python synth.py --scale 10 --years 4 --out .cache/synth/x10y4
+"""
+import argparse
+import ast
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+from fixtures import build_fixtures
+
+# -------------------------
+# CONFIG
+# -------------------------
+DATA_DIR = "data"
+SYNTH_DIR = ".cache/synth"
+SECONDS_PER_YEAR = 365 * 24 * 3600
+POINTS_JITTER = 0.12  # relative standard deviation of cloned scores
+
+# Tables that get cloned per league; everything else in data/ is copied as is
+CLONED_TABLES = [
+    "LeagueIDs_AllYears", "Users_AllYears", "Rosters_Players_AllYears", "Rosters_Current",
+    "Matchups_AllYears", "Transactions_AllYears", "TransactionRosters_AllYears",
+    "TransactionAdds_AllYears", "TransactionDrops_AllYears", "TransactionPicks_AllYears",
+    "Drafts_AllYears", "DraftPicks_AllYears",
+]
+# Generated after the fact by the stages themselves
+SKIPPED_TABLES = ["Results_RegularSeason", "Scores", "LastUpdate"]
+
+ID_KINDS = {"LeagueID": 1, "DraftID": 2, "TransactionID": 3, "OwnerID": 4}
+ID_ALIASES = {"Picked_By": "OwnerID"}
+
+
+def synth_dir(scale, years):
+    return os.path.join(SYNTH_DIR, f"x{scale}y{years}")
+
+
+# -------------------------
+# VARIANTS
+# -------------------------
+class Variant:
+    """One copy of (part of) the league history: ``copy`` of ``year_shift`` seasons earlier."""
+
+    def __init__(self, number, copy, year_shift):
+        self.number = number        # 0 is the original data
+        self.copy = copy            # owners are shared between variants with the same copy
+        self.year_shift = year_shift
+
+    def id_base(self, column):
+        kind = ID_ALIASES.get(column, column)
+        number = self.copy if kind == "OwnerID" else self.number
+        return 8 * 10**18 + ID_KINDS[kind] * 10**16 + number * 10**10
+
+
+def variants(scale, years):
+    """Older seasons first so every table stays in chronological order.
+
+    The current seasons' first copy is the original data, untouched.
+    """
+    out = []
+    for shift in range(years, 0, -1):
+        out += [(copy, shift) for copy in range(scale)]
+    out += [(copy, 0) for copy in range(scale)]
+    return [Variant(0 if (copy, shift) == (0, 0) else n, copy, shift) for n, (copy, shift) in enumerate(out, start=1)]
+
+
+def id_index(frames):
+    """Original ID -> small integer, shared by every table so clones stay joinable."""
+    index = {}
+    for column in ID_KINDS:
+        columns = [column] + [alias for alias, target in ID_ALIASES.items() if target == column]
+        values = sorted({v for df in frames.values() for c in columns if c in df for v in df[c] if v})
+        index[column] = {v: i for i, v in enumerate(values)}
+    return index
+
+
+def map_owner_list(value, variant, index):
+    try:
+        ids = ast.literal_eval(value) if value else []
+    except (ValueError, SyntaxError):
+        return value
+    base = variant.id_base("OwnerID")
+    return repr([str(base + index[str(v)]) if str(v) in index else v for v in ids])
+
+
+# -------------------------
+# CLONING
+# -------------------------
+def clone(df, table, variant, index, rng):
+    if variant.number == 0:
+        return df
+    df = df.copy()
+    for column in list(ID_KINDS) + list(ID_ALIASES):
+        if column in df:
+            positions = df[column].map(index[ID_ALIASES.get(column, column)]).astype("Int64")
+            new = (positions + variant.id_base(column)).astype(str)
+            df[column] = new.where(positions.notna(), df[column])
+    if "OwnerIDs" in df:
+        df["OwnerIDs"] = df["OwnerIDs"].map(lambda v: map_owner_list(v, variant, index["OwnerID"]))
+    if variant.copy:
+        suffix = f" #{variant.copy + 1}"
+        for column in ("LeagueName", "OwnerName", "OpponentName"):
+            if column in df:
+                df[column] = df[column] + suffix
+    if variant.year_shift:
+        for column in ("Year", "Season", "PickSeason"):
+            if column in df:
+                shifted = pd.to_numeric(df[column], errors="coerce") - variant.year_shift
+                df[column] = shifted.astype("Int64").astype(str).where(shifted.notna(), df[column])
+        if "Created" in df:
+            created = pd.to_numeric(df["Created"], errors="coerce") - variant.year_shift * SECONDS_PER_YEAR * 1000
+            df["Created"] = created.astype("Int64").astype(str).where(created.notna(), df["Created"])
+    if table == "Matchups_AllYears":
+        df = jitter_matchups(df, rng)
+    return df
+
+
+def jitter_matchups(df, rng):
+    """Scale each team-week's score and rederive the opponent side."""
+    factor = np.clip(rng.normal(1.0, POINTS_JITTER, len(df)), 0.5, 1.5)
+    points = (pd.to_numeric(df["PointsFor"], errors="coerce") * factor).round(2)
+    for column in ("StarterPoints", "BenchPoints"):
+        df[column] = (pd.to_numeric(df[column], errors="coerce") * factor).round(2).astype(str)
+    df["PointsFor"] = points.astype(str)
+
+    lookup = pd.Series(points.values, index=pd.MultiIndex.from_arrays([df["LeagueID"], df["Week"], df["RosterID"]]))
+    lookup = lookup[~lookup.index.duplicated()]
+    opponent = pd.MultiIndex.from_arrays([df["LeagueID"], df["Week"], df["OpponentRosterID"]])
+    against = pd.Series(lookup.reindex(opponent).values, index=df.index)
+    df["PointsAgainst"] = against.round(2).astype(str)
+    df["Outcome"] = np.select([points > against, points < against], ["Win", "Loss"], "Tie")
+    return df
+
+
+def read_data(data_dir, name):
+    return pd.read_csv(os.path.join(data_dir, f"{name}.csv"), dtype=str, keep_default_na=False)
+
+
+# -------------------------
+# GENERATE
+# -------------------------
+def synthesize(scale=10, years=0, data_dir=DATA_DIR, out_dir=None, seed=0, fixtures=True):
+    """Write the scaled data/ (and fixtures/) under ``out_dir``; returns the data directory."""
+    out_dir = out_dir or synth_dir(scale, years)
+    out_data = os.path.join(out_dir, "data")
+    shutil.rmtree(out_dir, ignore_errors=True)
+    os.makedirs(out_data)
+    rng = np.random.default_rng(seed)
+
+    frames = {name: read_data(data_dir, name) for name in CLONED_TABLES
+              if os.path.exists(os.path.join(data_dir, f"{name}.csv"))}
+    index = id_index(frames)
+    leagues = frames["LeagueIDs_AllYears"]
+    years_col = pd.to_numeric(leagues["Year"])
+    first_season = set(leagues.loc[years_col == years_col.min(), "LeagueID"])
+
+    print(f"🧪 Synthesizing {scale}× leagues, +{years} seasons into {out_dir}")
+    for name, df in frames.items():
+        path = os.path.join(out_data, f"{name}.csv")
+        df.iloc[:0].to_csv(path, index=False)
+        earliest = df[df["LeagueID"].isin(first_season)]
+        rows = 0
+        for variant in variants(scale, years):
+            cloned = clone(earliest if variant.year_shift else df, name, variant, index, rng)
+            cloned.to_csv(path, mode="a", header=False, index=False)
+            rows += len(cloned)
+        print(f"  {name}: {len(df)} → {rows} rows")
+
+    for name in os.listdir(data_dir):
+        table = os.path.splitext(name)[0]
+        if name.endswith(".csv") and table not in frames and table not in SKIPPED_TABLES:
+            shutil.copy2(os.path.join(data_dir, name), os.path.join(out_data, name))
+
+    if fixtures:
+        count = build_fixtures(out_data, os.path.join(out_dir, "fixtures"))
+        print(f"📼 Wrote {count} fixtures")
+    return out_data
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate league history at a multiple of today's size.")
+    parser.add_argument("--scale", type=int, default=10, help="Copies of every league per season")
+    parser.add_argument("--years", type=int, default=0, help="Extra seasons before the first one")
+    parser.add_argument("--data", default=DATA_DIR)
+    parser.add_argument("--out", help=f"Output directory (default: {SYNTH_DIR}/x<scale>y<years>)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-fixtures", action="store_true", help="Only write the CSVs")
+    args = parser.parse_args()
+
+    synthesize(args.scale, args.years, args.data, args.out, args.seed, not args.no_fixtures)
@@ -1,6 +1,9 @@
 import os
+import subprocess
+import time
 import pandas as pd
 from datetime import datetime, timezone, timedelta
+from locks import atomic_open, locked
 
 # -------------------------
 # CONFIG
@@ -21,25 +24,67 @@ def to_eastern(ts):
     return eastern_time.strftime("%Y-%m-%d %H:%M:%S")
 
 # -------------------------
-# MAIN: Collect file info
+# HELPER: When a file's content last changed
 # -------------------------
-rows = []
-for root, _, files in os.walk(DATA_DIR):
-    for fname in files:
-        fpath = os.path.join(root, fname)
-        try:
-            ts = os.path.getmtime(fpath)
-            rows.append({
-                "FileName": fname,
-                "LastModified": to_eastern(ts)
-            })
-        except Exception as e:
-            print(f"⚠️ Could not read {fpath}: {e}")
+def last_changed(path):
+    """Last commit touching ``path``; mtimes reset on every checkout, so they are only a fallback."""
+    try:
+        out = subprocess.run(["git", "log", "-1", "--format=%ct", "--", path],
+                             capture_output=True, text=True, check=True).stdout.strip()
+        if out:
+            return int(out)
+    except (OSError, subprocess.CalledProcessError):
+        pass
+    return os.path.getmtime(path)
 
 # -------------------------
-# SAVE TO CSV
+# POST-WRITE HOOK: Stamp one file in place
 # -------------------------
-df = pd.DataFrame(rows).sort_values(by="FileName")
-df.to_csv(OUT_FILE, index=False)
+def stamp_last_update(path, df=None):
+    """Record ``path`` as changed just now, without walking data/ or reading mtimes.
+
+    ``write_table`` only calls this when the content actually changed.
+    """
+    fname = os.path.basename(path)
+    if fname == os.path.basename(OUT_FILE):
+        return
+
+    # Parallel stages stamp the same file: read-modify-write under a lock
+    with locked(OUT_FILE):
+        if os.path.exists(OUT_FILE):
+            last_df = pd.read_csv(OUT_FILE)
+            last_df = last_df[last_df["FileName"] != fname]
+        else:
+            last_df = pd.DataFrame(columns=["FileName", "LastModified"])
+
+        row = pd.DataFrame([{"FileName": fname, "LastModified": to_eastern(time.time())}])
+        last_df = pd.concat([last_df, row], ignore_index=True).sort_values(by="FileName")
+        with atomic_open(OUT_FILE, newline="", encoding="utf-8") as f:
+            last_df.to_csv(f, index=False)
+    print(f"🕒 LastUpdate.csv: {fname} stamped")
+
+# -------------------------
+# MAIN: Collect file info
+# -------------------------
+if __name__ == "__main__":
+    rows = []
+    for root, dirs, files in os.walk(DATA_DIR):
+        dirs[:] = [d for d in dirs if d != "parquet"]  # columnar copies of the CSVs
+        for fname in files:
+            fpath = os.path.join(root, fname)
+            try:
+                ts = last_changed(fpath)
+                rows.append({
+                    "FileName": fname,
+                    "LastModified": to_eastern(ts)
+                })
+            except Exception as e:
+                print(f"⚠️ Could not read {fpath}: {e}")
+
+    # -------------------------
+    # SAVE TO CSV
+    # -------------------------
+    df = pd.DataFrame(rows).sort_values(by="FileName")
+    df.to_csv(OUT_FILE, index=False)
 
-print(f"✅ Saved {len(df)} file entries to {OUT_FILE}")
+    print(f"✅ Saved {len(df)} file entries to {OUT_FILE}")
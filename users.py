@@ -1,32 +1,46 @@
+from profiling import mark
 import pandas as pd
-from sleeper_wrapper import League, User
 import datetime
+import os
+from sleeper_client import fetch_all
+from schema import write_table
 
 # NCAA Ranks user ID
 user_id = 731808894699028480
 
 # Automatically include all years from 2020 through the current year
-start_year = 2020
+start_year = int(os.environ.get("SLEEPER_START_YEAR", 2020))
 current_year = datetime.datetime.now().year
 years = list(range(start_year, current_year + 1))
 
 
 all_rosters = []
 
+# Get all leagues for this user, every year at once
+league_responses = fetch_all(f"/user/{user_id}/leagues/nfl/{year}" for year in years)
+leagues_by_year = {year: league_responses[f"/user/{user_id}/leagues/nfl/{year}"] or [] for year in years}
+
+# Pull rosters and users for every league in one fan-out
+responses = fetch_all(
+    path
+    for leagues in leagues_by_year.values()
+    for league in leagues
+    for path in (f"/league/{league['league_id']}/rosters", f"/league/{league['league_id']}/users")
+)
+
+mark("transform")
 for year in years:
-    # Get all leagues for this user/year
-    leagues = User(user_id).get_all_leagues("nfl", year)
-    for league in leagues:
+    for league in leagues_by_year[year]:
         league_id = league["league_id"]
         league_name = league.get("name")
         division1 = league.get("metadata", {}).get("division_1")
         division2 = league.get("metadata", {}).get("division_2")
 
-        league_api = League(league_id)
-
-        # Pull rosters and users
-        rosters = league_api.get_rosters()
-        users = league_api.get_users()
+        rosters = responses[f"/league/{league_id}/rosters"]
+        users = responses[f"/league/{league_id}/users"]
+        if rosters is None or users is None:
+            print(f"  ERROR fetching rosters/users for {league_id}")
+            continue
 
         # Map user_id -> display_name
         user_map = {u["user_id"]: u["display_name"] for u in users}
@@ -63,5 +77,5 @@ df = pd.DataFrame(all_rosters)
 
 # Save CSV
 out_file = "data/Users_AllYears.csv"
-df.to_csv(out_file, index=False)
+df = write_table(df, "Users_AllYears", out_file)
 print(f"Saved {len(df)} roster rows to {out_file}")
@@ -0,0 +1,126 @@
+"""Round-trip check: replay the fetch stages and compare their IDs with data/.
+
+fixtures.py rebuilds every Sleeper response from the committed data/ CSVs,
+so a stage replayed against those fixtures must write the same keys back:
+the same league, owner, draft and transaction IDs, seasons and weeks.
+Each stage runs in a scratch copy of data/ (its own outputs removed) and
+every output table that also exists in the reference directory is
+compared on its key columns, as a multiset of rows. Names and points are
+not compared; the fixtures only approximate some of them.
+
+    python verify.py                     # every default stage
+    python verify.py users rosterhistory
+"""
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+import pandas as pd
+
+from fixtures import build_fixtures
+from pipeline import SCRIPT_DIR, STAGES, STAGES_BY_NAME
+from replay_server import ReplayConfig, start_server
+from schema import ID, SMALL, TABLES, YEAR, read_table
+
+# -------------------------
+# CONFIG
+# -------------------------
+DATA_DIR = "data"
+FIXTURES_DIR = ".cache/fixtures"
+KEY_TYPES = (ID, YEAR, SMALL)   # IDs, seasons, weeks / rounds
+EXAMPLES = 5
+
+
+# -------------------------
+# COMPARE
+# -------------------------
+def key_columns(table):
+    return [col for col, dtype in TABLES[table].items() if dtype in KEY_TYPES]
+
+
+def key_counts(df, cols):
+    """How often each key row occurs (IDs as exact strings, missing as <NA>)."""
+    keys = pd.DataFrame({col: df[col].astype("string").fillna("<NA>") for col in cols})
+    return keys.value_counts()
+
+
+def compare_table(table, reference_path, output_path):
+    """``(mismatched rows, examples)`` between two files of ``table`` on its key columns."""
+    cols = key_columns(table)
+    if not cols:
+        return 0, []
+    if not os.path.exists(output_path):
+        return len(read_table(table, reference_path)), [f"{os.path.basename(output_path)} was not written"]
+    expected = key_counts(read_table(table, reference_path), cols)
+    actual = key_counts(read_table(table, output_path), cols)
+    diff = expected.sub(actual, fill_value=0)
+    diff = diff[diff != 0]
+    examples = [f"{'missing' if n > 0 else 'unexpected'} {dict(zip(cols, key))}" for key, n in diff.head(EXAMPLES).items()]
+    return int(diff.abs().sum()), examples
+
+
+def compare_stage(stage, reference_dir, output_dir):
+    """``{table: (mismatched rows, examples)}`` for every output with a reference CSV."""
+    results = {}
+    for path in stage.outputs:
+        name = os.path.basename(path)
+        table = os.path.splitext(name)[0]
+        reference = os.path.join(reference_dir, name)
+        if table in TABLES and os.path.exists(reference):
+            results[table] = compare_table(table, reference, os.path.join(output_dir, name))
+    return results
+
+
+# -------------------------
+# ROUND TRIP
+# -------------------------
+def roundtrip(selected, data_dir=DATA_DIR, fixtures_dir=FIXTURES_DIR):
+    """Replay ``selected`` stages against fixtures built from ``data_dir``; returns the mismatched row count."""
+    if not os.path.isdir(fixtures_dir):
+        print(f"📼 Built {build_fixtures(data_dir, fixtures_dir)} fixtures in {fixtures_dir}")
+    workdir = tempfile.mkdtemp(prefix="verify-")
+    os.makedirs(os.path.join(workdir, "data"))
+    outputs = {os.path.basename(p) for stage in selected for p in stage.outputs}
+    for name in os.listdir(data_dir):
+        if name.endswith(".csv") and name not in outputs:
+            shutil.copy2(os.path.join(data_dir, name), os.path.join(workdir, "data", name))
+
+    server, base_url = start_server(ReplayConfig(fixtures_dir))
+    env = dict(os.environ, SLEEPER_BASE_URL=f"{base_url}/v1", ESPN_BASE_URL=base_url, SLEEPER_RATE="1000",
+               SLEEPER_CACHE="0", SLEEPER_ARCHIVE="0", SLEEPER_LOCK_DIR=os.path.join(workdir, ".cache", "locks"),
+               DELTA_MANIFEST=os.path.join(workdir, ".cache", "delta_manifest.json"))
+    mismatched = 0
+    try:
+        for stage in selected:
+            proc = subprocess.run([sys.executable, os.path.join(SCRIPT_DIR, stage.script)], cwd=workdir, env=env,
+                                  capture_output=True, text=True)
+            if proc.returncode != 0:
+                print(f"❌ {stage.name}: exit {proc.returncode}\n{proc.stdout[-2000:]}{proc.stderr[-2000:]}")
+                mismatched += 1
+                continue
+            for table, (count, examples) in compare_stage(stage, data_dir, os.path.join(workdir, "data")).items():
+                print(f"{'✅' if not count else '❌'} {stage.name:<22} {table:<32} {count} mismatched key rows")
+                for example in examples:
+                    print(f"      {example}")
+                mismatched += count
+    finally:
+        server.shutdown()
+        shutil.rmtree(workdir, ignore_errors=True)
+    return mismatched
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay fetch stages and compare their key columns with data/.")
+    parser.add_argument("stages", nargs="*", help=f"Stages to check (default: every default stage). Known: {', '.join(STAGES_BY_NAME)}")
+    parser.add_argument("--data", default=DATA_DIR, help="Reference CSVs the fixtures are built from")
+    parser.add_argument("--fixtures", default=FIXTURES_DIR, help="Fixture directory (built if missing)")
+    args = parser.parse_args()
+
+    unknown = set(args.stages) - set(STAGES_BY_NAME)
+    if unknown:
+        parser.error(f"unknown stage(s): {', '.join(sorted(unknown))}")
+    selected = [s for s in STAGES if s.name in args.stages or (not args.stages and s.default)]
+    sys.exit(1 if roundtrip(selected, args.data, args.fixtures) else 0)